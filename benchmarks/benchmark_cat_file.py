@@ -0,0 +1,43 @@
+"""Measure the latency of reading many commit messages one at a time, comparing a pipelined, long-lived
+`git cat-file --batch` process with starting a `git` process for each commit.
+
+Usage: python -m benchmarks.benchmark_cat_file [--commits N]
+"""
+
+import argparse
+import tempfile
+import time
+
+from benchmarks.repositories import generate_repository
+from check_semantic_version.cat_file import CatFile, parse_commit
+from check_semantic_version.git import run_git
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as repository_path:
+        generate_repository(repository_path, args.commits)
+        shas = run_git(["rev-list", "HEAD"], repository_path).split()
+        print(f"Reading {len(shas)} commit messages:")
+
+        start = time.perf_counter()
+
+        for sha in shas:
+            run_git(["log", "-1", "--format=%B", sha], repository_path)
+
+        print(f"  One process per commit: {time.perf_counter() - start:.3f} s")
+
+        start = time.perf_counter()
+
+        with CatFile(repository_path) as cat_file:
+            for git_object in cat_file.read_many(shas):
+                parse_commit(git_object.sha, git_object.content)
+
+        print(f"  Pipelined cat-file process: {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
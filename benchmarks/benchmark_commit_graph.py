@@ -0,0 +1,78 @@
+"""Measure the latency of finding the last version tag reachable from HEAD in a synthetic repository with many merges
+and several higher version tags on unmerged branches, with and without a commit-graph, for each git backend. With a
+commit-graph, ancestry is resolved in-process using its generation numbers to prune the walks; without one, each
+candidate tag is checked with `git merge-base --is-ancestor` (or a plain walk of the commits with the Python backend).
+
+Usage: python -m benchmarks.benchmark_commit_graph [--commits N] [--unmerged-tags N]
+"""
+
+import argparse
+import tempfile
+import time
+
+from benchmarks.repositories import generate_repository
+from check_semantic_version.git import run_git
+from check_semantic_version.object_store import ObjectStore
+from check_semantic_version.tag_index import TagIndex
+
+
+def measure(repository_path, description):
+    """Print how long it takes to find the last reachable version tag with each git backend.
+
+    :param str repository_path: the path to the repository
+    :param str description: a description of the repository's state
+    :return None:
+    """
+    print(f"  {description}:")
+
+    for backend in ("git", "python"):
+        start = time.perf_counter()
+
+        if backend == "python":
+            with ObjectStore(repository_path) as object_store:
+                tag = TagIndex(repository_path, use_cache=False, object_store=object_store).get_last_reachable_tag()
+        else:
+            tag = TagIndex(repository_path, use_cache=False).get_last_reachable_tag()
+
+        print(f"    {backend}: {time.perf_counter() - start:.3f} s ({tag.name})")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=20_000)
+    parser.add_argument("--unmerged-tags", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as repository_path:
+        generate_repository(repository_path, args.commits, tags={0: "0.1.0", args.commits // 2: "0.2.0"}, merge_every=5)
+
+        # Release candidates built from unmerged branches have higher versions than the last release, so they have to
+        # be ruled out before the last reachable version tag is found.
+        for index in range(args.unmerged_tags):
+            fork_point = f"HEAD~{(index + 1) * 7}"
+            sha = run_git(
+                [
+                    "-c",
+                    "user.name=Benchmark",
+                    "-c",
+                    "user.email=benchmark@example.com",
+                    "commit-tree",
+                    f"{fork_point}^{{tree}}",
+                    "-p",
+                    fork_point,
+                    "-m",
+                    "FEA: Unmerged feature",
+                ],
+                repository_path,
+            ).strip()
+
+            run_git(["tag", f"1.{index}.0", sha], repository_path)
+
+        print(f"{args.commits} commits (a merge every 5), {args.unmerged_tags} version tags on unmerged branches:")
+        measure(repository_path, "Without a commit-graph")
+        run_git(["commit-graph", "write", "--reachable"], repository_path)
+        measure(repository_path, "With a commit-graph")
+
+
+if __name__ == "__main__":
+    main()
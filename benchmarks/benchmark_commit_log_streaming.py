@@ -0,0 +1,91 @@
+"""Measure the latency and peak Python memory use of calculating the expected version of a synthetic repository with a
+long history, comparing the streaming, early-terminating commit scan with loading the whole commit log at once (as the
+calculation used to). Repositories with the last version tag at the start of the history (the worst case for the scan)
+and near HEAD (the common case) are both measured.
+
+Usage: python -m benchmarks.benchmark_commit_log_streaming [--commits N]
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.repositories import generate_repository
+from check_semantic_version.configuration import Configuration
+from check_semantic_version.expected_version import Version, _get_highest_action, get_expected_version
+from check_semantic_version.git import run_git
+from check_semantic_version.rules import CommitMessageRules
+
+
+def measure(function):
+    """Run a function twice, measuring its duration and then (separately, as tracing slows it down) its peak Python
+    memory use.
+
+    :param callable function: the function to run
+    :return (float, int): the function's duration in seconds and its peak memory use in bytes
+    """
+    start = time.perf_counter()
+    function()
+    duration = time.perf_counter() - start
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak
+
+
+def get_expected_version_from_whole_log(configuration, repository_path):
+    """Calculate the expected version by listing every reachable tag and loading every commit message since the last
+    version tag into memory at once.
+
+    :param check_semantic_version.configuration.Configuration configuration: a generated configuration
+    :param str repository_path: the path to the repository
+    :return str: the expected version
+    """
+    tags = run_git(["tag", "--merged", "HEAD"], repository_path).splitlines()
+    versions = {tag: Version.from_tag(tag) for tag in tags if Version.from_tag(tag)}
+    last_tag = max(versions, key=versions.get)
+    messages = run_git(["log", "-z", "--format=%B", f"{last_tag}..HEAD"], repository_path).split("\0")[:-1]
+
+    action = _get_highest_action(messages, CommitMessageRules(configuration.commit_message_actions))
+    action = action or configuration.when_no_valid_commit_messages
+
+    return str(versions[last_tag].increment(action))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=100_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    configuration = Configuration(version_source_type="setup.py")
+    configuration.generate()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        for description, tag_index in (
+            ("last version tag on the first commit", 0),
+            ("last version tag 10 commits before HEAD", args.commits - 11),
+        ):
+            repository_path = os.path.join(temporary_directory, str(tag_index))
+            generate_repository(repository_path, args.commits, tags={0: "0.1.0", tag_index: "0.2.0"})
+            print(f"{args.commits} commits, {description}:")
+
+            for name, function in (
+                (
+                    "Streaming scan",
+                    lambda: get_expected_version(configuration, repository_path=repository_path, use_checkpoint=False),
+                ),
+                ("Whole log", lambda: get_expected_version_from_whole_log(configuration, repository_path)),
+            ):
+                duration, peak = measure(function)
+                print(f"  {name}: {duration:.2f} s, peak Python memory {peak / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
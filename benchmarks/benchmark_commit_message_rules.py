@@ -0,0 +1,66 @@
+"""Compare matching commit messages against a compiled rule set with searching for each pattern separately, for a
+release branch's worth of commits and a configuration with dozens of custom patterns.
+
+Usage: python -m benchmarks.benchmark_commit_message_rules [--commits N] [--custom-patterns N]
+"""
+
+import argparse
+import itertools
+import re
+import timeit
+
+from benchmarks.repositories import DEFAULT_MESSAGES
+from check_semantic_version.configuration import Configuration
+from check_semantic_version.rules import ACTION_PRECEDENCE, CommitMessageRules
+
+
+def get_action_naively(message, actions):
+    """Get the highest-precedence action matching a commit message by searching for each pattern separately.
+
+    :param str message: the commit message
+    :param list(tuple(re.Pattern, str)) actions: the compiled patterns and their actions
+    :return str|None:
+    """
+    action = None
+
+    for pattern, pattern_action in actions:
+        if pattern.search(message) and (
+            action is None or ACTION_PRECEDENCE[pattern_action] > ACTION_PRECEDENCE[action]
+        ):
+            action = pattern_action
+
+    return action
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=5000)
+    parser.add_argument("--custom-patterns", type=int, default=40)
+    args = parser.parse_args()
+
+    configuration = Configuration(version_source_type="setup.py")
+    configuration.generate()
+
+    custom_actions = [
+        {"pattern": f"TYPE{index}(\\(.+\\))?:", "action": ["IncrementPatch", "IncrementMinor"][index % 2]}
+        for index in range(args.custom_patterns)
+    ]
+
+    rules = CommitMessageRules(configuration.commit_message_actions + custom_actions)
+    naive_actions = [(re.compile(pattern), action) for pattern, action in rules.actions]
+
+    body = "\n\nA longer description of the change that spans a few lines of text and mentions some-file.py.\n" * 3
+    messages = [message + body for message in itertools.islice(itertools.cycle(DEFAULT_MESSAGES), args.commits)]
+
+    print(f"{args.commits} commits, {len(rules.actions)} patterns:")
+
+    for name, function in (
+        ("Compiled rules", lambda: [rules.get_action(message) for message in messages]),
+        ("Each pattern separately", lambda: [get_action_naively(message, naive_actions) for message in messages]),
+    ):
+        duration = min(timeit.repeat(function, number=1, repeat=5))
+        print(f"  {name}: {duration * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Measure the latency of calculating the expected version of a synthetic repository with each git backend: running
+the `git` binary, or reading the repository's files directly in Python without starting any processes.
+
+Usage: python -m benchmarks.benchmark_git_backends [--commits N]
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+
+from benchmarks.repositories import generate_repository
+from check_semantic_version.configuration import Configuration
+from check_semantic_version.expected_version import get_expected_version
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=10_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    configuration = Configuration(version_source_type="setup.py")
+    configuration.generate()
+
+    with tempfile.TemporaryDirectory() as repository_path:
+        generate_repository(repository_path, args.commits, tags={0: "0.1.0", args.commits - 51: "0.2.0"})
+        print(f"{args.commits} commits, last version tag 50 commits before HEAD:")
+
+        for backend in ("git", "python"):
+            start = time.perf_counter()
+
+            version = get_expected_version(
+                configuration,
+                repository_path=repository_path,
+                use_checkpoint=False,
+                backend=backend,
+            )
+
+            print(f"  {backend}: {time.perf_counter() - start:.3f} s ({version})")
+
+
+if __name__ == "__main__":
+    main()
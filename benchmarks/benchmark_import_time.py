@@ -0,0 +1,77 @@
+"""Measure how long the CLI takes to import with `python -X importtime` and fail if it's over a budget or if any of the
+modules that should only be imported when they're needed are imported at start-up. Each measurement is made in a new
+interpreter and the fastest is compared with the budget to reduce noise from other processes.
+
+Usage: python -m benchmarks.benchmark_import_time [--budget MILLISECONDS] [--repeats N]
+"""
+
+import argparse
+import subprocess
+import sys
+
+MODULE = "check_semantic_version.cli"
+
+# These are slow to import and only needed by some commands, so they mustn't be imported at start-up.
+DEFERRED_MODULES = (
+    "pyhocon",
+    "importlib.metadata",
+    "multiprocessing",
+    "check_semantic_version.audit",
+    "check_semantic_version.fleet",
+)
+
+
+def measure_import_time(module):
+    """Import the module in a new interpreter with `-X importtime`.
+
+    :param str module: the name of the module to import
+    :return (int, dict(str, int)): the cumulative import time of the module and the self import time of every module imported, in microseconds
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    self_times = {}
+    cumulative_time = None
+
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_time, cumulative, name = line.removeprefix("import time:").split("|")
+        self_times[name.strip()] = int(self_time)
+
+        if name.strip() == module:
+            cumulative_time = int(cumulative)
+
+    return cumulative_time, self_times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=float, default=150, help="The start-up budget in milliseconds.")
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    measurements = [measure_import_time(MODULE) for _ in range(args.repeats)]
+    cumulative_time, self_times = min(measurements, key=lambda measurement: measurement[0])
+
+    print(f"Importing {MODULE} took {cumulative_time / 1000:.1f} ms (budget {args.budget:.0f} ms). Slowest modules:")
+
+    for name, self_time in sorted(self_times.items(), key=lambda item: item[1], reverse=True)[:10]:
+        print(f"  {name}: {self_time / 1000:.1f} ms")
+
+    failures = [f"{name} is imported at start-up." for name in DEFERRED_MODULES if name in self_times]
+
+    if cumulative_time / 1000 > args.budget:
+        failures.append(f"The import time is over the budget of {args.budget:.0f} ms.")
+
+    if failures:
+        sys.exit("\n".join(failures))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Compare the per-check latency of reading a `pyproject.toml` version in-process against running `poetry version`.
+
+Usage: python benchmarks/benchmark_pyproject_toml_version.py [PATH_TO_PYPROJECT_TOML] [--repeat N]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import timeit
+
+from check_semantic_version.check_semantic_version import _get_current_version
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PATH = os.path.join(REPOSITORY_ROOT, "tests", "test_package", "pyproject.toml")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    path = os.path.abspath(args.path)
+
+    in_process = timeit.timeit(
+        lambda: _get_current_version(path, version_source_type="pyproject.toml"),
+        number=args.repeat,
+    )
+
+    print(f"In-process (tomllib): {in_process / args.repeat * 1000:.2f} ms per check")
+
+    if not shutil.which("poetry"):
+        print("Poetry isn't installed - skipping the subprocess measurement.")
+        return
+
+    command = ["poetry", "version", "-s", f"--directory={os.path.dirname(path)}"]
+    poetry = timeit.timeit(lambda: subprocess.run(command, capture_output=True, check=True), number=args.repeat)
+    print(f"Subprocess (poetry version): {poetry / args.repeat * 1000:.2f} ms per check")
+    print(f"Speed-up: {poetry / in_process:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
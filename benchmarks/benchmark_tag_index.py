@@ -0,0 +1,64 @@
+"""Measure the latency of finding the last version tag reachable from HEAD in a synthetic repository with many tags,
+comparing the tag index (with and without its cache) with listing the reachable tags with `git tag --merged` and
+parsing them all.
+
+Usage: python -m benchmarks.benchmark_tag_index [--commits N] [--tags N]
+"""
+
+import argparse
+import tempfile
+import time
+from unittest.mock import patch
+
+from benchmarks.repositories import generate_repository
+from check_semantic_version.git import run_git
+from check_semantic_version.tag_index import TagIndex
+from check_semantic_version.version import Version
+
+
+def get_last_reachable_tag_from_merged_tags(repository_path):
+    """Find the last version tag reachable from HEAD by listing and parsing every reachable tag.
+
+    :param str repository_path: the path to the repository
+    :return str: the name of the tag
+    """
+    tags = run_git(["tag", "--merged", "HEAD"], repository_path).splitlines()
+    versions = {tag: Version.from_tag(tag, "v") for tag in tags if Version.from_tag(tag, "v")}
+    return max(versions, key=versions.get)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=50_000)
+    parser.add_argument("--tags", type=int, default=10_000)
+    args = parser.parse_args()
+
+    # Every other tag is a non-version (e.g. nightly build) tag.
+    step = args.commits // args.tags
+    tags = {}
+
+    for number, index in enumerate(range(0, args.commits, step)):
+        tags[index] = f"v{number // 100}.{number % 100}.0" if number % 2 else f"nightly-{number}"
+
+    with tempfile.TemporaryDirectory() as repository_path:
+        generate_repository(repository_path, args.commits, tags=tags)
+        print(f"{args.commits} commits, {len(tags)} tags:")
+
+        # The refs were only just written, so the index wouldn't otherwise be cached.
+        with patch("check_semantic_version.tag_index.RACY_REFS_INTERVAL", 0):
+            for name, function in (
+                ("git tag --merged", lambda: get_last_reachable_tag_from_merged_tags(repository_path)),
+                (
+                    "Tag index (uncached)",
+                    lambda: TagIndex(repository_path, "v", use_cache=False).get_last_reachable_tag().name,
+                ),
+                ("Tag index (building cache)", lambda: TagIndex(repository_path, "v").get_last_reachable_tag().name),
+                ("Tag index (cached)", lambda: TagIndex(repository_path, "v").get_last_reachable_tag().name),
+            ):
+                start = time.perf_counter()
+                tag = function()
+                print(f"  {name}: {time.perf_counter() - start:.3f} s ({tag})")
+
+
+if __name__ == "__main__":
+    main()
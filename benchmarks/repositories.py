@@ -0,0 +1,86 @@
+import itertools
+import os
+import subprocess
+
+DEFAULT_MESSAGES = (
+    "FIX: Fix a bug",
+    "REF: Tidy up a module",
+    "FEA: Add a feature",
+    "DOC: Update the documentation",
+    "TST: Add a test",
+)
+
+COMMITTER = "Benchmark <benchmark@example.com>"
+START_TIMESTAMP = 1_600_000_000
+
+
+def generate_repository(path, number_of_commits, tags=(), messages=DEFAULT_MESSAGES, merge_every=0):
+    """Generate a git repository with a history of empty commits on a `main` branch. `git fast-import` is used so that
+    histories with hundreds of thousands of commits can be generated in seconds. The history is linear unless
+    `merge_every` is given.
+
+    :param str path: the path to create the repository at
+    :param int number_of_commits: the number of commits to create
+    :param dict(int, str) tags: a mapping of (zero-indexed) commit numbers to the names of tags to put on them
+    :param iter(str) messages: the commit messages to cycle through
+    :param int merge_every: if non-zero, make every `merge_every`th commit a merge of a side branch with a single commit
+        forked from the commit `merge_every` commits earlier
+    :return None:
+    """
+    os.makedirs(path, exist_ok=True)
+    subprocess.run(["git", "init", "--quiet", "--initial-branch=main", path], check=True)
+
+    tags = dict(tags)
+
+    process = subprocess.Popen(["git", "fast-import", "--quiet"], cwd=path, stdin=subprocess.PIPE)
+
+    # The marks of the side branch commits come after those of the main branch commits.
+    side_mark = number_of_commits
+
+    for index, message in zip(range(number_of_commits), itertools.cycle(messages)):
+        encoded_message = message.encode()
+        lines = []
+        merge = merge_every and index >= merge_every and index % merge_every == 0
+
+        if merge:
+            side_mark += 1
+
+            lines.extend(
+                [
+                    b"commit refs/heads/side",
+                    b"mark :%d" % side_mark,
+                    b"committer %s %d +0000" % (COMMITTER.encode(), START_TIMESTAMP + index),
+                    b"data %d" % len(encoded_message),
+                    encoded_message,
+                    b"from :%d" % (index + 1 - merge_every),
+                    b"",
+                ]
+            )
+
+        lines.extend(
+            [
+                b"commit refs/heads/main",
+                b"mark :%d" % (index + 1),
+                b"committer %s %d +0000" % (COMMITTER.encode(), START_TIMESTAMP + index),
+                b"data %d" % len(encoded_message),
+                encoded_message,
+            ]
+        )
+
+        if index > 0:
+            lines.append(b"from :%d" % index)
+
+        if merge:
+            lines.append(b"merge :%d" % side_mark)
+
+        if index in tags:
+            lines.extend([b"", b"reset refs/tags/%s" % tags[index].encode(), b"from :%d" % (index + 1)])
+
+        process.stdin.write(b"\n".join(lines) + b"\n\n")
+
+    process.stdin.close()
+
+    if process.wait():
+        raise subprocess.CalledProcessError(process.returncode, "git fast-import")
+
+    subprocess.run(["git", "checkout", "--quiet", "main"], cwd=path, check=True)
@@ -0,0 +1,271 @@
+"""Time `check_versions_match` end-to-end for each type of version source file in synthetic repositories of
+configurable size, save the results as a JSON baseline, and compare later runs against it. Each check is timed cold
+(with the tag index and commit scan checkpoints removed first) and warm (straight after another check), keeping the
+fastest of the repeats as it's the least affected by noise from other processes. The peak memory allocated by Python
+during a cold check is measured with `tracemalloc` (taking the median of the repeats, as it varies slightly with how
+the concurrent lookups interleave). Memory used by `git` subprocesses isn't included.
+
+When comparing, the exit code is 1 if any latency or the peak memory of any scenario has regressed by more than the
+given fraction of its baseline value. Scenarios missing from either run are reported but don't fail the comparison.
+
+Usage: python -m benchmarks.suite [--commits N [N ...]] [--tags N] [--merge-every N] [--messages MIX]
+    [--version-sources TYPE [TYPE ...]] [--repeats N] [--save PATH] [--compare PATH] [--latency-threshold FRACTION]
+    [--memory-threshold FRACTION]
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.repositories import DEFAULT_MESSAGES, generate_repository
+from check_semantic_version.check_semantic_version import check_versions_match
+from check_semantic_version.configuration import Configuration
+from check_semantic_version.expected_version import get_expected_version
+from check_semantic_version.extractors import EXTRACTORS
+from check_semantic_version.git import run_git
+from check_semantic_version.tag_index import CACHE_DIRECTORY_NAME
+
+BASELINE_FORMAT_VERSION = 1
+
+LATENCY_METRICS = ("cold_latency", "warm_latency")
+MEMORY_METRICS = ("peak_memory",)
+
+# Latency changes smaller than this are treated as noise whatever their relative size.
+MINIMUM_LATENCY_CHANGE = 0.01
+
+MESSAGE_MIXES = {
+    "conventional": DEFAULT_MESSAGES,
+    "mixed": DEFAULT_MESSAGES
+    + (
+        "Merge pull request #1 from octue/feature",
+        "wip",
+        "FEA!: Remove a deprecated option",
+        "Bump the version",
+    ),
+    "unmatched": ("wip", "Update things", "Merge pull request #1 from octue/feature"),
+}
+
+
+def create_scenario(repository_path, version_source_type, number_of_commits, number_of_tags, merge_every, messages):
+    """Generate a repository with version tags spread evenly through its history and write an (uncommitted) version
+    source file containing the expected version, so the check passes.
+
+    :param str repository_path: the path to create the repository at
+    :param str version_source_type: the type of version source file to write
+    :param int number_of_commits: the number of commits on the main branch
+    :param int number_of_tags: the number of version tags
+    :param int merge_every: if non-zero, make every `merge_every`th commit a merge
+    :param tuple(str) messages: the commit messages to cycle through
+    :return None:
+    """
+    tags = {
+        index * number_of_commits // number_of_tags: f"0.{index + 1}.0"
+        for index in range(min(number_of_tags, number_of_commits))
+    }
+
+    generate_repository(repository_path, number_of_commits, tags=tags, messages=messages, merge_every=merge_every)
+
+    configuration = Configuration(version_source_type=version_source_type)
+    configuration.generate()
+    version = get_expected_version(configuration, repository_path=repository_path, use_checkpoint=False)
+
+    path, template = EXTRACTORS[version_source_type].example_file
+    os.makedirs(os.path.dirname(os.path.join(repository_path, path)), exist_ok=True)
+
+    with open(os.path.join(repository_path, path), "w") as f:
+        f.write(template.format(version=version))
+
+
+def measure_scenario(repository_path, version_source_type, repeats):
+    """Measure the fastest cold and warm latencies of checking the version source file in the repository and the
+    median peak memory allocated by Python during a cold check.
+
+    :param str repository_path: the path to the repository
+    :param str version_source_type: the type of the version source file written by `create_scenario`
+    :param int repeats: the number of times to time each kind of check
+    :raise RuntimeError: if the check doesn't pass
+    :return dict: the measurements
+    """
+    cache_directory = os.path.join(
+        run_git(["rev-parse", "--path-format=absolute", "--git-common-dir"], repository_path).strip(),
+        CACHE_DIRECTORY_NAME,
+    )
+
+    path = EXTRACTORS[version_source_type].example_file[0]
+
+    def check(cold):
+        if cold:
+            shutil.rmtree(cache_directory, ignore_errors=True)
+
+        with contextlib.redirect_stdout(open(os.devnull, "w")) as devnull:
+            with devnull:
+                start = time.perf_counter()
+                passed = check_versions_match(path, repository_path=repository_path)
+                duration = time.perf_counter() - start
+
+        if not passed:
+            raise RuntimeError(f"The check of {path!r} in {repository_path!r} failed.")
+
+        return duration
+
+    cold_latencies = [check(cold=True) for _ in range(repeats)]
+    warm_latencies = [check(cold=False) for _ in range(repeats)]
+
+    peak_memories = []
+
+    for _ in range(repeats):
+        tracemalloc.start()
+
+        try:
+            check(cold=True)
+            peak_memories.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "cold_latency": min(cold_latencies),
+        "warm_latency": min(warm_latencies),
+        "peak_memory": statistics.median(peak_memories),
+    }
+
+
+def compare(results, baseline, latency_threshold, memory_threshold):
+    """Compare results with a baseline, printing each metric's change and any regressions.
+
+    :param dict results: the results of this run
+    :param dict baseline: the baseline results
+    :param float latency_threshold: the fraction a latency can increase by before it's a regression
+    :param float memory_threshold: the fraction the peak memory can increase by before it's a regression
+    :return list(str): descriptions of the regressions
+    """
+    regressions = []
+
+    for name in sorted(set(results) | set(baseline)):
+        if name not in results or name not in baseline:
+            print(f"{name}: only in the {'baseline' if name in baseline else 'current run'}; skipping.")
+            continue
+
+        for metric in LATENCY_METRICS + MEMORY_METRICS:
+            current = results[name][metric]
+            previous = baseline[name][metric]
+            change = (current - previous) / previous if previous else 0.0
+            print(f"{name} {metric}: {_format(metric, previous)} -> {_format(metric, current)} ({change:+.1%})")
+
+            if metric in LATENCY_METRICS:
+                regressed = change > latency_threshold and current - previous > MINIMUM_LATENCY_CHANGE
+            else:
+                regressed = change > memory_threshold
+
+            if regressed:
+                regressions.append(f"{name} {metric} regressed by {change:.1%}")
+
+    return regressions
+
+
+def _format(metric, value):
+    """Format a measurement for printing.
+
+    :param str metric: the name of the metric
+    :param float|int value: the measurement
+    :return str:
+    """
+    if metric in MEMORY_METRICS:
+        return f"{value / 1024:.0f} KiB"
+
+    return f"{value * 1000:.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--tags", type=int, default=20)
+    parser.add_argument("--merge-every", type=int, default=10)
+    parser.add_argument("--messages", choices=MESSAGE_MIXES, default="mixed")
+    parser.add_argument("--version-sources", nargs="+", choices=EXTRACTORS, default=None)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--save", default=None, help="The path to save the results to as a JSON baseline.")
+    parser.add_argument("--compare", default=None, help="The path of a JSON baseline to compare the results with.")
+    parser.add_argument("--latency-threshold", type=float, default=0.25)
+    parser.add_argument("--memory-threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    missing_example_files = [name for name, extractor in EXTRACTORS.items() if extractor.example_file is None]
+
+    if missing_example_files:
+        parser.error(f"These extractors have no example file to benchmark: {missing_example_files!r}.")
+
+    # The warnings about `mkver.conf` files not being found would be logged for every check.
+    logging.disable(logging.WARNING)
+    results = {}
+
+    for number_of_commits in args.commits:
+        for version_source_type in args.version_sources or EXTRACTORS:
+            # Every parameter affecting the measurements is in the name so only like scenarios are compared.
+            name = (
+                f"{version_source_type}-{number_of_commits}-commits-{args.tags}-tags-merge-every-{args.merge_every}-"
+                f"{args.messages}-messages"
+            )
+
+            with tempfile.TemporaryDirectory() as repository_path:
+                create_scenario(
+                    repository_path,
+                    version_source_type,
+                    number_of_commits,
+                    args.tags,
+                    args.merge_every,
+                    MESSAGE_MIXES[args.messages],
+                )
+
+                results[name] = measure_scenario(repository_path, version_source_type, args.repeats)
+
+            print(
+                f"{name}: cold {_format('cold_latency', results[name]['cold_latency'])}, warm "
+                f"{_format('warm_latency', results[name]['warm_latency'])}, peak memory "
+                f"{_format('peak_memory', results[name]['peak_memory'])}"
+            )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "format_version": BASELINE_FORMAT_VERSION,
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "parameters": {
+                        "tags": args.tags,
+                        "merge_every": args.merge_every,
+                        "repeats": args.repeats,
+                    },
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        if baseline.get("format_version") != BASELINE_FORMAT_VERSION:
+            sys.exit(f"The baseline {args.compare!r} has an unsupported format.")
+
+        regressions = compare(results, baseline["results"], args.latency_threshold, args.memory_threshold)
+
+        if regressions:
+            print("\n".join(["Regressions:", *regressions]))
+            sys.exit(1)
+
+        print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
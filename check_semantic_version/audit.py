@@ -0,0 +1,291 @@
+import csv
+import heapq
+import io
+import json
+import logging
+import os
+import tarfile
+import tempfile
+from typing import NamedTuple
+
+from check_semantic_version.check_semantic_version import _get_current_version
+from check_semantic_version.exceptions import CalledProcessError
+from check_semantic_version.expected_version import _get_higher_action
+from check_semantic_version.extractors import get_extractor
+from check_semantic_version.git import iter_commits_oldest_first, run_git
+from check_semantic_version.rules import CommitMessageRules
+from check_semantic_version.tag_index import Tag
+from check_semantic_version.version import Version
+
+logger = logging.getLogger(__name__)
+
+AUDIT_REPORT_FORMATS = ("csv", "jsonl")
+
+# Flags used to paint commits while walking back from a merge commit's parents.
+_REACHABLE_FROM_PARENTS = 1
+_REACHABLE_FROM_TAG = 2
+
+
+class AuditRecord(NamedTuple):
+    """The audit of a single commit. The expected version is calculated from the commits before it and its own message,
+    ignoring any version tags on the commit itself, so it's the version a release at the commit should have had. For
+    commits with version tags, the version in the version source file at the commit is read and compared too.
+    """
+
+    commit: str
+    version_tags: tuple
+    last_version_tag: str
+    action: str
+    expected_version: str
+    file_version: str = None
+    agrees: bool = None
+
+
+class _CommitState(NamedTuple):
+    """The state carried forward from a commit to its children."""
+
+    generation: int
+    parents: tuple
+    action: str
+    last_tag: Tag
+    action_since_last_tag: str
+
+
+def audit_history(configuration, version_source_path, repository_path=".", revision="HEAD"):
+    """Audit the version of every commit in the revision's history in a single pass. The commits are walked oldest
+    first in topological order and each commit's last version tag and highest-precedence action since it are carried
+    forward from its parents, so the history is only read once however long it is. Where a merge joins histories with
+    different last version tags, the merged commits since the higher one are found by walking back through the
+    commits already seen in descending order of generation.
+
+    For each commit with version tags, the version in the version source file at the commit is read (statically, without
+    executing any code) and the commit is flagged if its highest version tag disagrees with either the expected
+    version or the version source file.
+
+    :param check_semantic_version.configuration.Configuration configuration: a generated configuration
+    :param str version_source_path: the path of the version source file relative to the repository root
+    :param str repository_path: the path to the git repository
+    :param str revision: the revision to audit the history of
+    :raise ValueError: if a commit message matches a pattern with the "Fail" action
+    :return iter(AuditRecord): the audit of each commit, oldest first
+    """
+    rules = CommitMessageRules(configuration.commit_message_actions)
+    states = {}
+
+    for commit in iter_commits_oldest_first(revision, repository_path):
+        parents = tuple(parent for parent in commit.parents if parent in states)
+        action = rules.get_action(commit.message)
+        last_tag, action_since_last_tag = _get_state_from_parents(parents, states)
+        action_since_last_tag = _get_higher_action(action_since_last_tag, action)
+
+        # The commit itself is always a commit since the last version tag, so there's always an increment.
+        applied_action = action_since_last_tag or configuration.when_no_valid_commit_messages
+        base_version = last_tag.version if last_tag else Version(0, 0, 0)
+        expected_version = base_version.increment(applied_action)
+
+        version_tags = sorted(
+            (
+                Tag(version=version, name=name, commit=commit.sha)
+                for name in commit.tags
+                if (version := Version.from_tag(name, configuration.tag_prefix))
+            ),
+            reverse=True,
+        )
+
+        record = AuditRecord(
+            commit=commit.sha,
+            version_tags=tuple(tag.name for tag in version_tags),
+            last_version_tag=last_tag.name if last_tag else None,
+            action=applied_action,
+            expected_version=str(expected_version),
+        )
+
+        if version_tags:
+            released_tag = version_tags[0]
+            file_version = _read_version_at(commit.sha, version_source_path, configuration, repository_path)
+
+            record = record._replace(
+                file_version=file_version,
+                agrees=released_tag.version == expected_version and file_version == str(released_tag.version),
+            )
+
+            # The highest version tag reachable from a commit is its last version tag, even if it's lower than one of
+            # the parents' last version tags.
+            if not last_tag or released_tag.version >= last_tag.version:
+                last_tag = released_tag
+                action_since_last_tag = None
+
+        states[commit.sha] = _CommitState(
+            generation=1 + max((states[parent].generation for parent in parents), default=0),
+            parents=parents,
+            action=action,
+            last_tag=last_tag,
+            action_since_last_tag=action_since_last_tag,
+        )
+
+        yield record
+
+
+def write_audit_report(records, f, output_format="csv"):
+    """Write audit records to a file as they're produced, as CSV (with a header row) or JSON Lines. In CSV reports, a
+    commit's version tags are separated by spaces and empty fields are left blank.
+
+    :param iter(AuditRecord) records: the audit records
+    :param io.TextIOBase f: the file to write the report to
+    :param str output_format: one of "csv" or "jsonl"
+    :raise ValueError: if the output format isn't supported
+    :return dict: the number of commits audited, the number with version tags, and the number of those that disagree
+    """
+    if output_format not in AUDIT_REPORT_FORMATS:
+        raise ValueError(f"Unsupported audit report format {output_format!r}; options are {AUDIT_REPORT_FORMATS!r}.")
+
+    summary = {"commits": 0, "tagged_commits": 0, "disagreements": 0}
+
+    if output_format == "csv":
+        writer = csv.writer(f)
+        writer.writerow(AuditRecord._fields)
+
+    for record in records:
+        summary["commits"] += 1
+
+        if record.version_tags:
+            summary["tagged_commits"] += 1
+            summary["disagreements"] += not record.agrees
+
+        if output_format == "csv":
+            row = record._replace(version_tags=" ".join(record.version_tags))
+            writer.writerow(["" if value is None else value for value in row])
+        else:
+            f.write(json.dumps(record._asdict()) + "\n")
+
+    return summary
+
+
+def _get_state_from_parents(parents, states):
+    """Get a commit's last version tag and the highest-precedence action of the commits since it (excluding the commit
+    itself) from the states of its parents. If all the parents have the same last version tag, their actions are
+    combined; otherwise, the commits reachable from the parents but not from the highest last version tag are walked.
+
+    :param tuple(str) parents: the shas of the commit's parents that have been audited
+    :param dict(str, _CommitState) states: the states of the commits audited so far
+    :return (check_semantic_version.tag_index.Tag|None, str|None): the last version tag and the action since it
+    """
+    parent_states = [states[parent] for parent in parents]
+    last_tags = {state.last_tag for state in parent_states}
+    last_tag = max(last_tags, key=lambda tag: tag.version if tag else Version(-1, 0, 0), default=None)
+
+    if len(last_tags) <= 1:
+        action = None
+
+        for state in parent_states:
+            action = _get_higher_action(action, state.action_since_last_tag)
+
+        return last_tag, action
+
+    return last_tag, _get_highest_action_since(parents, last_tag.commit, states)
+
+
+def _get_highest_action_since(parents, tag_commit, states):
+    """Get the highest-precedence action of the commits reachable from the parents but not from the tag's commit. The
+    commits are walked in descending order of generation, painting them by which of the two they're reachable from, so
+    a commit is never visited before its children and the walk stops as soon as only commits reachable from the tag's
+    commit are left.
+
+    :param tuple(str) parents: the shas of the commits to walk back from
+    :param str tag_commit: the sha of the commit to exclude the ancestors of
+    :param dict(str, _CommitState) states: the states of the commits audited so far
+    :return str|None: the action, or `None` if no commit messages match a pattern
+    """
+    flags = {}
+    queue = []
+    action = None
+
+    # The number of queued commits only reachable from the parents. The walk can stop when there aren't any left.
+    number_only_reachable_from_parents = 0
+
+    def paint(sha, flag):
+        nonlocal number_only_reachable_from_parents
+
+        if sha not in states:
+            return
+
+        old_flags = flags.get(sha, 0)
+        new_flags = old_flags | flag
+
+        if new_flags == old_flags:
+            return
+
+        flags[sha] = new_flags
+
+        if not old_flags:
+            heapq.heappush(queue, (-states[sha].generation, sha))
+
+        if new_flags == _REACHABLE_FROM_PARENTS:
+            number_only_reachable_from_parents += 1
+        elif old_flags == _REACHABLE_FROM_PARENTS:
+            number_only_reachable_from_parents -= 1
+
+    for parent in parents:
+        paint(parent, _REACHABLE_FROM_PARENTS)
+
+    paint(tag_commit, _REACHABLE_FROM_TAG)
+
+    while number_only_reachable_from_parents:
+        _, sha = heapq.heappop(queue)
+
+        if flags[sha] == _REACHABLE_FROM_PARENTS:
+            number_only_reachable_from_parents -= 1
+            action = _get_higher_action(action, states[sha].action)
+
+        for parent in states[sha].parents:
+            paint(parent, flags[sha])
+
+    return action
+
+
+def _read_version_at(commit, version_source_path, configuration, repository_path):
+    """Read the version in the version source file at a commit with the same extractors as the check, without executing
+    any code. The file is extracted with `git archive` into a temporary directory along with, for version source files
+    that can import their versions (e.g. `setup.py` files), the Python modules in and below its directory so they can be
+    resolved.
+
+    :param str commit: the sha of the commit
+    :param str version_source_path: the path of the version source file relative to the repository root
+    :param check_semantic_version.configuration.Configuration configuration: the generated configuration
+    :param str repository_path: the path to the git repository
+    :return str|None: the version, or `None` if the file doesn't exist at the commit or its version can't be read
+    """
+    pathspecs = [version_source_path]
+
+    if get_extractor(configuration.version_source_type).reads_python_modules:
+        directory = os.path.dirname(version_source_path)
+
+        # `git archive` fails if any pathspec matches nothing, so only the modules that exist at the commit are given.
+        # The tree is listed recursively so modules in packages (e.g. `package/__init__.py`) are included.
+        paths = run_git(
+            ["ls-tree", "-r", "--name-only", "--full-name", commit, "--", f"{directory}/" if directory else "."],
+            repository_path,
+        ).splitlines()
+
+        pathspecs.extend(path for path in paths if path.endswith(".py") and path != version_source_path)
+
+    try:
+        archive = run_git(["archive", "--format=tar", commit, "--", *pathspecs], repository_path, decode=False)
+    except CalledProcessError:
+        logger.warning("%r doesn't exist at %s.", version_source_path, commit)
+        return None
+
+    with tempfile.TemporaryDirectory() as directory:
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            # Extraction filters were added in Python 3.12 and backported to later patch releases of earlier versions.
+            tar.extractall(directory, **({"filter": "data"} if hasattr(tarfile, "data_filter") else {}))
+
+        try:
+            return _get_current_version(
+                os.path.join(directory, version_source_path),
+                configuration.version_source_type,
+                execute=False,
+            )
+        except Exception as e:
+            logger.warning("Couldn't read the version in %r at %s: %r", version_source_path, commit, e)
+            return None
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Bump this if the format or meaning of cached results changes so old entries are ignored.
+CACHE_FORMAT_VERSION = "v2"
+
+DEFAULT_MAX_CACHE_SIZE = 1024 * 1024
+
+
+class ResultCache:
+    """A content-addressed, size-bounded on-disk cache of check results. Each result is stored as a small JSON file at
+    `<directory>/v2/<first two characters of key>/<key>.json`, so the whole directory can be saved and restored between
+    CI runs (e.g. with `actions/cache`). When the cache grows beyond its maximum size, the least recently used entries
+    are evicted. Reading an entry counts as using it.
+
+    :param str directory: the path to the cache directory (it's created if it doesn't exist)
+    :param int max_size: the maximum total size of the cache entries in bytes
+    :return None:
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_CACHE_SIZE):
+        self.directory = os.path.join(os.path.abspath(directory), CACHE_FORMAT_VERSION)
+        self.max_size = max_size
+
+    def get(self, key):
+        """Get the result stored under the key, marking it as recently used.
+
+        :param str key: the key of the result
+        :return dict|None: the result, or `None` if there isn't one (or it's unreadable)
+        """
+        path = self._get_path(key)
+
+        try:
+            with open(path) as f:
+                result = json.load(f)
+
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable cache entry %r.", path)
+            return None
+
+        return result
+
+    def set(self, key, result):
+        """Store a result under the key, evicting the least recently used entries if the cache is too big. The entry
+        is written atomically so concurrent runs sharing the cache never see a partial entry. Failures (e.g. a
+        read-only cache directory) are ignored as caching is only an optimisation.
+
+        :param str key: the key of the result
+        :param dict result: the JSON-serialisable result
+        :return None:
+        """
+        path = self._get_path(key)
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+                json.dump(result, f)
+
+            os.replace(f.name, path)
+            self._evict()
+        except OSError as e:
+            logger.debug("Couldn't save result to %r: %s", path, e)
+
+    def _get_path(self, key):
+        """Get the path of the file an entry is stored in.
+
+        :param str key: the key of the entry
+        :return str:
+        """
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _evict(self):
+        """Delete the least recently used entries until the cache is no bigger than its maximum size.
+
+        :return None:
+        """
+        entries = []
+
+        for subdirectory in os.scandir(self.directory):
+            if not subdirectory.is_dir():
+                continue
+
+            for entry in os.scandir(subdirectory.path):
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_size = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            total_size -= size
+
+
+def get_cache_key(*parts):
+    """Get a cache key by hashing the given parts together.
+
+    :param str|bytes parts: the parts that together determine the cached result
+    :return str: a hexadecimal SHA-256 digest
+    """
+    digest = hashlib.sha256()
+
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf8")
+
+        # Prefix each part with its length so different splits of the same bytes give different keys.
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+
+    return digest.hexdigest()
+
+
+def hash_file(path):
+    """Get the SHA-256 digest of a file's contents.
+
+    :param str path: the path to the file
+    :return str: a hexadecimal SHA-256 digest
+    """
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        while chunk := f.read(64 * 1024):
+            digest.update(chunk)
+
+    return digest.hexdigest()
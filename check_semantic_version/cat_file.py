@@ -0,0 +1,404 @@
+import atexit
+import contextlib
+import os
+import selectors
+import subprocess
+import threading
+import time
+from typing import NamedTuple
+
+from check_semantic_version.exceptions import CalledProcessError
+from check_semantic_version.git import READ_SIZE
+
+# The maximum time to wait for a `git cat-file` process to respond to a request before it's killed.
+DEFAULT_TIMEOUT = 30
+
+# The maximum number of requests written to a `git cat-file` process before its responses are read. This keeps the
+# requests well within a pipe's buffer so writing them can never block while `git` is blocked writing its responses.
+PIPELINE_SIZE = 256
+
+# The maximum number of `git cat-file` processes kept for each repository.
+DEFAULT_MAX_PROCESSES_PER_REPOSITORY = 4
+
+
+class GitObject(NamedTuple):
+    """A git object read with `git cat-file`. The content is `None` if only the object's information was read."""
+
+    sha: str
+    type: str
+    size: int
+    content: bytes = None
+
+
+class CommitObject(NamedTuple):
+    """A parsed git commit object."""
+
+    sha: str
+    tree: str
+    parents: tuple
+    committer_timestamp: int
+    message: str
+
+
+class TagObject(NamedTuple):
+    """A parsed annotated git tag object."""
+
+    sha: str
+    object: str
+    type: str
+    tag: str
+    message: str
+
+
+class CatFile:
+    """A long-lived `git cat-file` process for reading git objects without starting a process for each one. Requests
+    are pipelined: a batch of object names is written to the process before any of the responses are read. Use it as a
+    context manager (or call `close`) to shut the process down cleanly.
+
+    :param str repository_path: the path to the git repository
+    :param bool contents: if `True`, read objects' contents (`--batch`); otherwise, only read their types and sizes (`--batch-check`)
+    :param float timeout: the maximum time in seconds to wait for each response before killing the process
+    :return None:
+    """
+
+    def __init__(self, repository_path=".", contents=True, timeout=DEFAULT_TIMEOUT):
+        self.repository_path = repository_path
+        self.contents = contents
+        self.timeout = timeout
+        self.command = ["git", "cat-file", "--batch" if contents else "--batch-check"]
+
+        self._process = subprocess.Popen(
+            self.command,
+            cwd=repository_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._process.stdout, selectors.EVENT_READ)
+        self._buffer = bytearray()
+
+    @property
+    def alive(self):
+        """Check if the process is still running.
+
+        :return bool:
+        """
+        return self._process.poll() is None
+
+    def read(self, object_name):
+        """Read a single object.
+
+        :param str object_name: the name of the object (e.g. a sha or "HEAD:setup.py")
+        :raise check_semantic_version.exceptions.CalledProcessError: if the process exits unexpectedly
+        :raise subprocess.TimeoutExpired: if the process doesn't respond in time
+        :return GitObject|None: the object, or `None` if it doesn't exist
+        """
+        return next(self.read_many([object_name]))
+
+    def read_many(self, object_names):
+        """Read objects, pipelining the requests. The objects are yielded in the same order as their names.
+
+        :param iter(str) object_names: the names of the objects
+        :raise check_semantic_version.exceptions.CalledProcessError: if the process exits unexpectedly
+        :raise subprocess.TimeoutExpired: if the process doesn't respond in time
+        :return iter(GitObject|None): the objects, with `None` for any that don't exist
+        """
+        object_names = iter(object_names)
+
+        while batch := [name for _, name in zip(range(PIPELINE_SIZE), object_names)]:
+            for name in batch:
+                if "\n" in name:
+                    raise ValueError(f"Object names can't contain newlines: {name!r}.")
+
+            try:
+                self._process.stdin.write("".join(f"{name}\n" for name in batch).encode("utf8"))
+                self._process.stdin.flush()
+            except BrokenPipeError:
+                self._raise_for_exit()
+
+            pending = len(batch)
+
+            try:
+                while pending:
+                    response = self._read_response()
+                    pending -= 1
+                    yield response
+
+            finally:
+                # If iteration stops early, the rest of the batch's responses are read so they aren't mistaken for the
+                # responses to later requests.
+                if pending and self.alive:
+                    for _ in range(pending):
+                        self._read_response()
+
+    def read_commit(self, object_name):
+        """Read and parse a commit.
+
+        :param str object_name: the name of the commit (e.g. a sha or "HEAD")
+        :raise ValueError: if the object doesn't exist or isn't a commit
+        :return CommitObject:
+        """
+        git_object = self.read(object_name)
+
+        if git_object is None or git_object.type != "commit":
+            raise ValueError(f"{object_name!r} isn't a commit.")
+
+        return parse_commit(git_object.sha, git_object.content)
+
+    def read_tag(self, object_name):
+        """Read and parse an annotated tag.
+
+        :param str object_name: the name of the tag object (e.g. a sha or "refs/tags/1.0.0")
+        :raise ValueError: if the object doesn't exist or isn't an annotated tag
+        :return TagObject:
+        """
+        git_object = self.read(object_name)
+
+        if git_object is None or git_object.type != "tag":
+            raise ValueError(f"{object_name!r} isn't an annotated tag.")
+
+        return parse_tag(git_object.sha, git_object.content)
+
+    def close(self):
+        """Shut the process down by closing its input, killing it if it doesn't exit in time.
+
+        :return None:
+        """
+        if self._process.stdin.closed:
+            return
+
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+
+        try:
+            self._process.wait(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+
+        self._selector.close()
+        self._process.stdout.close()
+        self._process.stderr.close()
+
+    def _read_response(self):
+        """Read the response to a single request.
+
+        :return GitObject|None:
+        """
+        deadline = time.monotonic() + self.timeout
+        header = self._read_until_newline(deadline).decode("utf8")
+
+        if header.endswith(" missing") or header.endswith(" ambiguous"):
+            return None
+
+        sha, object_type, size = header.split(" ")
+        size = int(size)
+
+        if not self.contents:
+            return GitObject(sha=sha, type=object_type, size=size)
+
+        # The content is followed by a newline.
+        content = self._read_exactly(size + 1, deadline)[:-1]
+        return GitObject(sha=sha, type=object_type, size=size, content=content)
+
+    def _read_until_newline(self, deadline):
+        """Read a line (without its newline) from the process's output.
+
+        :param float deadline: the `time.monotonic` value to give up at
+        :return bytes:
+        """
+        start = 0
+
+        while (index := self._buffer.find(b"\n", start)) == -1:
+            start = len(self._buffer)
+            self._fill_buffer(deadline)
+
+        line = bytes(self._buffer[:index])
+        del self._buffer[: index + 1]
+        return line
+
+    def _read_exactly(self, size, deadline):
+        """Read an exact number of bytes from the process's output.
+
+        :param int size: the number of bytes to read
+        :param float deadline: the `time.monotonic` value to give up at
+        :return bytes:
+        """
+        while len(self._buffer) < size:
+            self._fill_buffer(deadline)
+
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def _fill_buffer(self, deadline):
+        """Read whatever output is available from the process into the buffer, waiting for some until the deadline.
+
+        :param float deadline: the `time.monotonic` value to give up at
+        :raise subprocess.TimeoutExpired: if no output is available before the deadline
+        :return None:
+        """
+        remaining = deadline - time.monotonic()
+
+        if remaining <= 0 or not self._selector.select(timeout=remaining):
+            self._process.kill()
+            self.close()
+            raise subprocess.TimeoutExpired(self.command, self.timeout)
+
+        chunk = os.read(self._process.stdout.fileno(), max(READ_SIZE, len(self._buffer)))
+
+        if not chunk:
+            self._raise_for_exit()
+
+        self._buffer += chunk
+
+    def _raise_for_exit(self):
+        """Raise an error for the process exiting unexpectedly, including its standard error.
+
+        :raise check_semantic_version.exceptions.CalledProcessError:
+        """
+        stderr = self._process.stderr.read()
+        returncode = self._process.wait()
+        self.close()
+        raise CalledProcessError(returncode=returncode, cmd=self.command, stderr=stderr)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class CatFilePool:
+    """A thread-safe pool of `git cat-file` processes shared between everything reading objects in a run (e.g. when
+    checking several packages in the same repository). Processes are kept per repository, type (`--batch` or
+    `--batch-check`), and timeout and reused, so each is only started once.
+
+    :param int max_processes_per_repository: the maximum number of processes of each type per repository; callers wait for one to become free once this is reached
+    :return None:
+    """
+
+    def __init__(self, max_processes_per_repository=DEFAULT_MAX_PROCESSES_PER_REPOSITORY):
+        self.max_processes_per_repository = max_processes_per_repository
+        self._idle = {}
+        self._counts = {}
+        self._condition = threading.Condition()
+
+    @contextlib.contextmanager
+    def acquire(self, repository_path=".", contents=True, timeout=DEFAULT_TIMEOUT):
+        """Get a process for exclusive use until the context exits, starting one if none are free.
+
+        :param str repository_path: the path to the git repository
+        :param bool contents: if `True`, get a `--batch` process; otherwise, get a `--batch-check` process
+        :param float timeout: the maximum time in seconds to wait for each response before killing the process
+        :return iter(CatFile):
+        """
+        key = (os.path.realpath(repository_path), contents, timeout)
+
+        with self._condition:
+            while not self._idle.get(key) and self._counts.get(key, 0) >= self.max_processes_per_repository:
+                self._condition.wait()
+
+            if self._idle.get(key):
+                cat_file = self._idle[key].pop()
+            else:
+                cat_file = None
+                self._counts[key] = self._counts.get(key, 0) + 1
+
+        try:
+            if cat_file is None:
+                cat_file = CatFile(repository_path, contents=contents, timeout=timeout)
+
+            yield cat_file
+
+        except BaseException:
+            # The process might be part-way through a response, so it can't be reused.
+            if cat_file is not None:
+                cat_file.close()
+
+            raise
+
+        finally:
+            with self._condition:
+                # Processes that have exited (e.g. after timing out) are replaced the next time one is needed.
+                if cat_file is not None and cat_file.alive:
+                    self._idle.setdefault(key, []).append(cat_file)
+                else:
+                    self._counts[key] -= 1
+
+                self._condition.notify()
+
+    def close(self):
+        """Shut down all the idle processes.
+
+        :return None:
+        """
+        with self._condition:
+            for key, cat_files in self._idle.items():
+                for cat_file in cat_files:
+                    cat_file.close()
+                    self._counts[key] -= 1
+
+            self._idle = {}
+
+
+def parse_commit(sha, content):
+    """Parse the content of a commit object.
+
+    :param str sha: the commit's sha
+    :param bytes content: the raw content of the commit object
+    :return CommitObject:
+    """
+    headers, _, message = content.partition(b"\n\n")
+    tree = None
+    parents = []
+    committer_timestamp = None
+
+    for line in headers.split(b"\n"):
+        # Continuation lines of multi-line headers (e.g. signatures) start with a space.
+        if line.startswith(b"tree "):
+            tree = line[5:].decode("ascii")
+        elif line.startswith(b"parent "):
+            parents.append(line[7:].decode("ascii"))
+        elif line.startswith(b"committer "):
+            committer_timestamp = int(line.rsplit(b" ", 2)[1])
+
+    return CommitObject(
+        sha=sha,
+        tree=tree,
+        parents=tuple(parents),
+        committer_timestamp=committer_timestamp,
+        message=message.decode("utf8", errors="replace"),
+    )
+
+
+def parse_tag(sha, content):
+    """Parse the content of an annotated tag object.
+
+    :param str sha: the tag object's sha
+    :param bytes content: the raw content of the tag object
+    :return TagObject:
+    """
+    headers, _, message = content.partition(b"\n\n")
+    fields = {}
+
+    for line in headers.split(b"\n"):
+        name, _, value = line.partition(b" ")
+        fields.setdefault(name.decode("ascii"), value.decode("utf8", errors="replace"))
+
+    return TagObject(
+        sha=sha,
+        object=fields["object"],
+        type=fields["type"],
+        tag=fields["tag"],
+        message=message.decode("utf8", errors="replace"),
+    )
+
+
+# The pool used by default so processes are shared across a whole run.
+CAT_FILE_POOL = CatFilePool()
+atexit.register(CAT_FILE_POOL.close)
@@ -1,72 +1,283 @@
+import concurrent.futures
+import glob
 import logging
 import os
-import signal
 import subprocess
-import sys
-import tempfile
+import time
+from typing import NamedTuple
 
+from check_semantic_version.cache import ResultCache, get_cache_key, hash_file
 from check_semantic_version.configuration import Configuration
+from check_semantic_version.exceptions import CalledProcessError
+from check_semantic_version.expected_version import get_expected_version, get_expected_versions
+from check_semantic_version.extractors import get_extractor
+from check_semantic_version.git import run_git
+from check_semantic_version.tag_index import CACHE_DIRECTORY_NAME
+from check_semantic_version.timings import span
 
 logger = logging.getLogger(__name__)
 
-logging.basicConfig(
-    stream=sys.stdout,
-    format="[%(asctime)s | %(levelname)s | %(name)s] %(message)s",
-    level=logging.INFO,
-)
-
 RED = "\033[0;31m"
 GREEN = "\033[0;32m"
 NO_COLOUR = "\033[0m"
 
-SUPPORTED_VERSION_SOURCE_FILES = {"setup.py", "pyproject.toml", "package.json"}
+# The format of log messages when checks are run from the command line or served by a daemon.
+LOG_FORMAT = "[%(asctime)s | %(levelname)s | %(name)s] %(message)s"
 
+# The maximum number of threads used to get the current versions of several packages at once.
+MAX_VERSION_EXTRACTION_WORKERS = 16
 
-class CalledProcessError(subprocess.CalledProcessError):
-    """A `CalledProcessError` that reports the `stderr` output of the process that errored."""
+PACKAGE_SPECIFICATION_OPTIONS = {"tag_prefix", "breaking_change_indicated_by"}
+
+
+class Package(NamedTuple):
+    """A package's version source file and the options for checking its version."""
+
+    path: str
+    tag_prefix: str = ""
+    breaking_change_indicated_by: str = "major"
 
-    def __str__(self):
-        if self.returncode and self.returncode < 0:
-            try:
-                return "Command '%s' died with %r. Stderr: %r" % (
-                    self.cmd,
-                    signal.Signals(-self.returncode),
-                    self.stderr,
-                )
-            except ValueError:
-                return "Command '%s' died with unknown signal %d. Stderr: %r" % (
-                    self.cmd,
-                    -self.returncode,
-                    self.stderr,
-                )
 
-        return "Command '%s' returned non-zero exit status %d. Stderr: %r" % (self.cmd, self.returncode, self.stderr)
+def parse_package_specification(specification, breaking_change_indicated_by="major", root_directory="."):
+    """Parse a package specification of the form `PATH[,tag_prefix=PREFIX][,breaking_change_indicated_by=NUMBER]`
+    into packages. The path can be a glob pattern (e.g. "packages/*/setup.py"), in which case a package is returned for
+    each matching file with the same options.
+
+    :param str specification: the package specification
+    :param str breaking_change_indicated_by: the default number in the semantic version that a breaking change should increment if the specification doesn't give one
+    :param str root_directory: the directory glob patterns are relative to (the paths of the packages returned are relative to it too)
+    :raise ValueError: if the specification has an unknown option or its glob pattern doesn't match any files
+    :return list(Package): the packages
+    """
+    path, *options = specification.split(",")
+    parsed_options = {"breaking_change_indicated_by": breaking_change_indicated_by}
+
+    for option in options:
+        name, separator, value = option.partition("=")
+
+        if name not in PACKAGE_SPECIFICATION_OPTIONS or not separator:
+            raise ValueError(
+                f"Invalid option {option!r} in package specification {specification!r}; options must be of the form "
+                f"`name=value` where `name` is one of {sorted(PACKAGE_SPECIFICATION_OPTIONS)!r}."
+            )
 
+        parsed_options[name] = value
 
-def check_versions_match(path, breaking_change_indicated_by="major"):
-    """Check that the current version in the version source file at the given path matches the expected semantic version.
+    if not any(character in path for character in "*?["):
+        return [Package(path=path, **parsed_options)]
 
-    :param str path: the path to the version source file (it must be of type "setup.py", "pyproject.toml", or "package.json")
+    paths = sorted(glob.glob(path, root_dir=root_directory, recursive=True))
+
+    if not paths:
+        raise ValueError(f"No version source files match {path!r}.")
+
+    return [Package(path=matching_path, **parsed_options) for matching_path in paths]
+
+
+def check_versions_match(
+    path,
+    breaking_change_indicated_by="major",
+    cache_directory=None,
+    base_ref=None,
+    repository_path=".",
+):
+    """Check that the current version in the version source file at the given path matches the expected semantic
+    version. A single version source file's expected version is calculated from the whole history, wherever it is in
+    the repository. Several version source files (e.g. for the packages in a monorepo) can be checked at once by giving
+    a list of paths, a glob pattern, or both. Their current versions are read concurrently and their expected versions
+    are calculated in a single pass through the git history, with only the commits changing files in each package's
+    directory counting towards its version. A single aggregated report is printed.
+
+    :param str|Package|list(str|Package) path: the path to the version source file (it must be a type with a registered extractor, e.g. "setup.py", "pyproject.toml", or "package.json"), or several of them; paths can be glob patterns and can be package specifications with options (see `parse_package_specification`)
     :param str breaking_change_indicated_by: the number in the semantic version that a breaking change should increment (must be one of "major", "minor", or "patch")
+    :param str|None cache_directory: if given, the path to a directory to cache results in; results are keyed by the HEAD commit, the tags, the configuration, the version of this package, and the version source file and any files its version is read from so a cached result is only reused if none of these have changed (only used when checking a single version source file whose version can be read without running code)
+    :param str|None base_ref: if given (e.g. the branch a pull request is going to be merged into), only the commits since the merge-base of this ref and HEAD are used to calculate the expected version, so the repository can be a shallow clone that includes the merge-base
+    :param str repository_path: the path to the git repository, which relative paths are relative to and where a `mkver.conf` file is looked for (the working directory isn't changed)
     :return bool: whether the versions match
     """
-    version_source_type = os.path.split(path)[-1]
-    current_version = _get_current_version(path=path, version_source_type=version_source_type)
+    packages = []
 
-    expected_semantic_version = _get_expected_semantic_version(
-        version_source_type=version_source_type,
-        breaking_change_indicated_by=breaking_change_indicated_by,
-    )
+    for specification in path if isinstance(path, (list, tuple)) else [path]:
+        if isinstance(specification, Package):
+            packages.append(specification)
+        else:
+            packages.extend(parse_package_specification(specification, breaking_change_indicated_by, repository_path))
 
-    if not current_version or current_version == "null":
-        print(f"{RED}VERSION FAILED CHECKS:{NO_COLOUR} No current version found.")
-        return False
+    packages = [
+        package._replace(path=os.path.normpath(os.path.join(repository_path, package.path))) for package in packages
+    ]
 
-    if current_version != expected_semantic_version:
-        print(
-            f"{RED}VERSION FAILED CHECKS:{NO_COLOUR} The current version ({current_version}) is different from the "
-            f"expected semantic version ({expected_semantic_version})."
+    if len(packages) > 1:
+        if cache_directory:
+            logger.warning("Results aren't cached when checking more than one version source file.")
+
+        return _check_many_versions_match(packages, base_ref=base_ref, repository_path=repository_path)
+
+    package = packages[0]
+    version_source_type = os.path.split(package.path)[-1]
+    result = None
+
+    if cache_directory:
+        cache = ResultCache(cache_directory)
+        cache_key = _get_result_cache_key(package, version_source_type, base_ref, repository_path)
+
+        if cache_key:
+            result = cache.get(cache_key)
+        else:
+            logger.info("The current version is found by running code, so the result isn't cached.")
+
+    if result:
+        logger.info("Using cached result from %r.", cache_directory)
+        current_version = result["current_version"]
+        expected_semantic_version = result["expected_semantic_version"]
+
+    else:
+        # The two lookups are independent and mostly spent waiting on subprocesses, so they're run concurrently.
+        start_time = time.perf_counter()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            current_version_future = executor.submit(
+                _run_stage,
+                "current version lookup",
+                start_time,
+                _get_current_version,
+                path=package.path,
+                version_source_type=version_source_type,
+            )
+
+            expected_semantic_version_future = executor.submit(
+                _run_stage,
+                "expected version lookup",
+                start_time,
+                _get_expected_semantic_version,
+                version_source_type=version_source_type,
+                breaking_change_indicated_by=package.breaking_change_indicated_by,
+                tag_prefix=package.tag_prefix,
+                base_ref=base_ref,
+                repository_path=repository_path,
+            )
+
+        current_version = current_version_future.result()
+        expected_semantic_version = expected_semantic_version_future.result()
+
+        if cache_directory and cache_key:
+            cache.set(
+                cache_key,
+                {"current_version": current_version, "expected_semantic_version": expected_semantic_version},
+            )
+
+    return _report_result(current_version, expected_semantic_version)
+
+
+def _check_many_versions_match(packages, base_ref=None, repository_path="."):
+    """Check that the current versions of several packages match their expected semantic versions, printing a line for
+    each package and an overall result. A package whose current version can't be read fails without stopping the
+    others being checked.
+
+    :param list(Package) packages: the packages to check
+    :param str|None base_ref: if given, only use the commits since the merge-base of this ref and HEAD
+    :param str repository_path: the path to the git repository
+    :return bool: whether all the packages' versions match
+    """
+    start_time = time.perf_counter()
+
+    # The expected versions are calculated alongside the current versions, so one more worker is used for them.
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(len(packages), MAX_VERSION_EXTRACTION_WORKERS) + 1
+    ) as executor:
+        expected_semantic_versions_future = executor.submit(
+            _run_stage,
+            "expected version lookup",
+            start_time,
+            _get_expected_semantic_versions,
+            packages,
+            base_ref=base_ref,
+            repository_path=repository_path,
         )
+
+        futures = [
+            executor.submit(
+                _run_stage,
+                f"current version lookup for {package.path!r}",
+                start_time,
+                _get_current_version,
+                package.path,
+                os.path.split(package.path)[-1],
+            )
+            for package in packages
+        ]
+
+    expected_semantic_versions = expected_semantic_versions_future.result()
+    number_of_failures = 0
+
+    for package, future, expected_semantic_version in zip(packages, futures, expected_semantic_versions):
+        try:
+            failure_message = _get_failure_message(future.result(), expected_semantic_version)
+        except Exception as e:
+            failure_message = f"The current version couldn't be read: {e}"
+
+        if failure_message:
+            number_of_failures += 1
+            print(f"{RED}FAILED:{NO_COLOUR} {package.path}: {failure_message}")
+        else:
+            print(f"{GREEN}PASSED:{NO_COLOUR} {package.path}: {expected_semantic_version}")
+
+    if number_of_failures:
+        print(f"{RED}VERSION FAILED CHECKS:{NO_COLOUR} {number_of_failures} of {len(packages)} packages failed.")
+        return False
+
+    print(
+        f"{GREEN}VERSION PASSED CHECKS:{NO_COLOUR} All {len(packages)} packages have their expected semantic versions."
+    )
+    return True
+
+
+def _run_stage(stage, start_time, function, *args, **kwargs):
+    """Run a stage of the check, logging when it starts and finishes relative to the start of the check so the overlap
+    of concurrent stages can be seen. If the stage fails, the failure is logged with the stage's name before the
+    exception is re-raised.
+
+    :param str stage: the name of the stage
+    :param float start_time: the `time.perf_counter` value at the start of the check
+    :param callable function: the function to run
+    :param args: positional arguments for the function
+    :param kwargs: keyword arguments for the function
+    :return any: the function's return value
+    """
+    stage_start_time = time.perf_counter()
+    logger.debug("Started the %s at +%.3fs.", stage, stage_start_time - start_time)
+
+    try:
+        with span(stage):
+            result = function(*args, **kwargs)
+    except Exception as e:
+        logger.error("The %s failed after %.3fs: %r", stage, time.perf_counter() - stage_start_time, e)
+        raise
+
+    end_time = time.perf_counter()
+
+    logger.info(
+        "Finished the %s in %.3fs (from +%.3fs to +%.3fs).",
+        stage,
+        end_time - stage_start_time,
+        stage_start_time - start_time,
+        end_time - start_time,
+    )
+
+    return result
+
+
+def _report_result(current_version, expected_semantic_version):
+    """Print whether the current version of a single package passes the check.
+
+    :param str current_version: the version in the version source file
+    :param str expected_semantic_version: the expected semantic version
+    :return bool: whether the versions match
+    """
+    failure_message = _get_failure_message(current_version, expected_semantic_version)
+
+    if failure_message:
+        print(f"{RED}VERSION FAILED CHECKS:{NO_COLOUR} {failure_message}")
         return False
 
     print(
@@ -76,71 +287,328 @@ def check_versions_match(path, breaking_change_indicated_by="major"):
     return True
 
 
-def _get_current_version(path, version_source_type):
-    """Get the current version of the package via the given version source. The relevant file containing the version
-    information is assumed to be in the current working directory unless `version_source_file` is given.
+def _get_failure_message(current_version, expected_semantic_version):
+    """Get the reason the current version fails the check, if it does.
 
-    :param str path: the path to the version source file (it must be of type "setup.py", "pyproject.toml", or "package.json")
-    :param str version_source_type: the type of file containing the current version number (must be one of "setup.py", "pyproject.toml", or "package.json")
-    :return str: the version specified in the version source file
+    :param str current_version: the version in the version source file
+    :param str expected_semantic_version: the expected semantic version
+    :return str|None: the reason for the failure, or `None` if the check passes
     """
-    if version_source_type not in SUPPORTED_VERSION_SOURCE_FILES:
-        raise ValueError(
-            f"Unsupported version source received: {version_source_type!r}; options are "
-            f"{SUPPORTED_VERSION_SOURCE_FILES!r}."
+    if not current_version or current_version == "null":
+        return "No current version found."
+
+    if current_version != expected_semantic_version:
+        return (
+            f"The current version ({current_version}) is different from the expected semantic version "
+            f"({expected_semantic_version})."
         )
 
-    absolute_path = os.path.abspath(path)
-    logger.info("Getting current version from %r.", absolute_path)
-
-    if version_source_type == "setup.py":
-        command = ["python", absolute_path, "--version"]
-        shell = False
-    elif version_source_type == "pyproject.toml":
-        command = ["poetry", "version", "-s", f"--directory={os.path.dirname(absolute_path)}"]
-        shell = False
-    elif version_source_type == "package.json":
-        command = f"""cat {absolute_path} | jq --raw-output '.["version"]'"""
-        shell = True
+    return None
+
+
+def _get_result_cache_key(package, version_source_type, base_ref=None, repository_path="."):
+    """Get the key for caching the result of checking the package's version source file. It's derived from the HEAD
+    commit, all the tags in the repository, the effective configuration (the `mkver.conf` file if there is one or the
+    generated configuration otherwise), the version of this package, and the contents of the version source file and
+    any files its version is read from (e.g. the module a `setup.py` file imports its version from). If a base ref is
+    given, the commit it points to is included too.
+
+    :param Package package: the package
+    :param str version_source_type: the type of the version source file
+    :param str|None base_ref: the base ref the expected version is calculated relative to, if any
+    :param str repository_path: the path to the git repository
+    :return str|None: the cache key, or `None` if the current version is found by running code so the result can't be cached
+    """
+    import importlib.metadata
 
     try:
-        process = subprocess.run(command, shell=shell, capture_output=True, check=True)
-    except subprocess.CalledProcessError as e:
-        raise CalledProcessError(returncode=e.returncode, cmd=e.cmd, output=e.output, stderr=e.stderr) from None
+        source_paths = get_extractor(version_source_type).get_source_paths(package.path)
+    except (OSError, ValueError):
+        # The check fails for an invalid version source file, so only the file itself can affect the result.
+        source_paths = [package.path]
 
-    current_version = process.stdout.strip().decode("utf8")
-    logger.info("Current version: %s", current_version)
-    return current_version
+    if source_paths is None:
+        return None
 
+    head = run_git(["rev-parse", "HEAD"], repository_path).strip()
+    tags = run_git(["for-each-ref", "--format=%(refname) %(objectname)", "refs/tags"], repository_path)
+    mkver_configuration_path = os.path.join(repository_path, "mkver.conf")
 
-def _get_expected_semantic_version(version_source_type, breaking_change_indicated_by):
-    """Get the expected semantic version for the package as of the current HEAD git commit.
+    if os.path.exists(mkver_configuration_path):
+        configuration_digest = hash_file(mkver_configuration_path)
+    else:
+        configuration = Configuration(
+            version_source_type=version_source_type,
+            breaking_change_indicated_by=package.breaking_change_indicated_by,
+            tag_prefix=package.tag_prefix,
+        )
 
-    :param str version_source_type: the type of file containing the current version number (must be one of "setup.py", "pyproject.toml", or "package.json")
-    :param str breaking_change_indicated_by: the number in the semantic version that a breaking change should increment (must be one of "major", "minor", or "patch")
+        configuration.generate()
+        configuration_digest = configuration.digest
+
+    parts = [
+        head,
+        tags,
+        configuration_digest,
+        importlib.metadata.version("check-semantic-version"),
+        version_source_type,
+        os.path.relpath(package.path, repository_path),
+    ]
+
+    for source_path in source_paths:
+        parts.extend((os.path.relpath(source_path, repository_path), hash_file(source_path)))
+
+    if base_ref:
+        parts.append(run_git(["rev-parse", base_ref], repository_path).strip())
+
+    return get_cache_key(*parts)
+
+
+def _get_current_version(path, version_source_type, execute=True):
+    """Get the current version of the package from its version source file with the extractor registered for the
+    version source type. The version is read in-process if possible; otherwise, the extractor's fallback subprocess
+    (e.g. executing `setup.py` or running Poetry) is run in the version source file's directory, so files it reads
+    relative to the working directory are found wherever this process is running.
+
+    :param str path: the path to the version source file
+    :param str version_source_type: the type of file containing the current version number (the name of a registered extractor or of a file matching one's patterns, e.g. "setup.py", "pyproject.toml", or "package.json")
+    :param bool execute: if `False`, return `None` instead of running the fallback subprocess if the version can't be read in-process
+    :raise ValueError: if the version source type isn't supported or the version can't be read and there's no fallback
+    :return str|None: the version specified in the version source file
+    """
+    extractor = get_extractor(version_source_type)
+    absolute_path = os.path.abspath(path)
+
+    with span("version extraction", path=absolute_path, version_source_type=version_source_type):
+        logger.info("Getting current version from %r.", absolute_path)
+        current_version = extractor.read(absolute_path)
+
+        if current_version is not None:
+            logger.info("Current version (read statically): %s", current_version)
+            return current_version
+
+        if not execute:
+            return None
+
+        command = extractor.get_fallback_command(absolute_path)
+
+        if command is None:
+            raise ValueError(f"The version in {absolute_path!r} couldn't be read.")
+
+        logger.info(extractor.fallback_message, absolute_path)
+
+        try:
+            with span("subprocess", command=command):
+                process = subprocess.run(
+                    command,
+                    cwd=os.path.dirname(absolute_path),
+                    capture_output=True,
+                    check=True,
+                )
+        except subprocess.CalledProcessError as e:
+            raise CalledProcessError(returncode=e.returncode, cmd=e.cmd, output=e.output, stderr=e.stderr) from None
+
+        current_version = extractor.parse_fallback_output(process.stdout.decode("utf8"), absolute_path)
+        logger.info("Current version: %s", current_version)
+        return current_version
+
+
+def _get_expected_semantic_version(
+    version_source_type,
+    breaking_change_indicated_by,
+    tag_prefix="",
+    base_ref=None,
+    repository_path=".",
+):
+    """Get the expected semantic version for the package as of the current HEAD git commit. If there's a `mkver.conf`
+    file in the repository, it's loaded and the version is calculated in-process with it unless it uses features only
+    `git-mkver` supports, in which case `git-mkver` is used with it; otherwise, a configuration is generated and the
+    version is calculated in-process.
+
+    :param str version_source_type: the type of file containing the current version number (the name of a registered extractor or of a file matching one's patterns)
+    :param str breaking_change_indicated_by: the number in the semantic version that a breaking change should increment (must be one of "major", "minor", or "patch"; ignored if there's a `mkver.conf` file)
+    :param str tag_prefix: the prefix before version numbers in tags (ignored if there's a `mkver.conf` file)
+    :param str|None base_ref: if given, only use the commits since the merge-base of this ref and HEAD (ignored if `git-mkver` is used)
+    :param str repository_path: the path to the git repository
     :return str:
     """
-    with tempfile.NamedTemporaryFile() as temporary_configuration:
-        if not os.path.exists("mkver.conf"):
-            logger.warning("No `mkver.conf` file found. Generating one instead.")
+    config_path = os.path.abspath(os.path.join(repository_path, "mkver.conf"))
 
-            configuration = Configuration(
-                version_source_type=version_source_type,
-                breaking_change_indicated_by=breaking_change_indicated_by,
-            )
+    if os.path.exists(config_path):
+        configuration = _load_mkver_configuration(config_path, version_source_type, repository_path)
+        _warn_if_breaking_change_input_ignored(configuration, breaking_change_indicated_by, config_path)
+        _warn_if_tag_prefix_input_ignored(configuration, tag_prefix, config_path)
 
-            configuration.generate()
-            config_path = temporary_configuration.name
-            configuration.write(path=config_path)
-            logger.info("`mkver.conf` file created at %r.", config_path)
+        if not configuration.unsupported_features:
+            with span("expected version calculation"):
+                return get_expected_version(configuration, repository_path=repository_path, base_ref=base_ref)
 
-        else:
-            config_path = os.path.abspath("mkver.conf")
-            logger.warning("`mkver.conf` file found at %r. Ignoring `breaking_change_indicated_by` input.", config_path)
+        if base_ref:
+            logger.warning("`git-mkver` always uses the full history. Ignoring the base ref %r.", base_ref)
+
+        command = ["git-mkver", "-c", config_path, "next"]
 
         try:
-            process = subprocess.run(["git-mkver", "-c", config_path, "next"], capture_output=True, check=True)
+            with span("subprocess", command=command):
+                process = subprocess.run(command, cwd=repository_path, capture_output=True, check=True)
         except subprocess.CalledProcessError as e:
             raise CalledProcessError(returncode=e.returncode, cmd=e.cmd, output=e.output, stderr=e.stderr)
 
-    return process.stdout.strip().decode("utf8")
+        return process.stdout.strip().decode("utf8")
+
+    logger.warning("No `mkver.conf` file found. Generating one instead.")
+
+    configuration = Configuration(
+        version_source_type=version_source_type,
+        breaking_change_indicated_by=breaking_change_indicated_by,
+        tag_prefix=tag_prefix,
+    )
+
+    configuration.generate()
+
+    with span("expected version calculation"):
+        return get_expected_version(configuration, repository_path=repository_path, base_ref=base_ref)
+
+
+def _get_package_directory(package_path, repository_root):
+    """Get the directory of a package relative to the repository root.
+
+    :param str package_path: the path to the package's version source file
+    :param str repository_root: the absolute path to the root of the repository
+    :return str: the directory ("" for the root)
+    """
+    directory = os.path.relpath(os.path.dirname(os.path.abspath(package_path)), repository_root)
+    return "" if directory == "." else directory
+
+
+def _get_expected_semantic_versions(packages, base_ref=None, repository_path="."):
+    """Get the expected semantic versions of several packages as of the current HEAD git commit. Unless there's a
+    `mkver.conf` file in the repository using features only `git-mkver` supports, they're calculated in a single pass
+    through the git history, with only the commits changing files in each package's directory counting towards its
+    version. The packages all use the `mkver.conf` file if there is one.
+
+    :param list(Package) packages: the packages
+    :param str|None base_ref: if given, only use the commits since the merge-base of this ref and HEAD (ignored if `git-mkver` is used)
+    :param str repository_path: the path to the git repository
+    :return list(str): the expected semantic versions in the same order as the packages
+    """
+    config_path = os.path.abspath(os.path.join(repository_path, "mkver.conf"))
+    mkver_configuration = None
+
+    if os.path.exists(config_path):
+        mkver_configuration = _load_mkver_configuration(
+            config_path,
+            os.path.split(packages[0].path)[-1],
+            repository_path,
+        )
+
+        if mkver_configuration.unsupported_features:
+            logger.warning("Checking each package separately with `git-mkver`.")
+
+            return [
+                _get_expected_semantic_version(
+                    os.path.split(package.path)[-1],
+                    package.breaking_change_indicated_by,
+                    tag_prefix=package.tag_prefix,
+                    base_ref=base_ref,
+                    repository_path=repository_path,
+                )
+                for package in packages
+            ]
+
+    repository_root = run_git(["rev-parse", "--show-toplevel"], repository_path).strip()
+    configurations_and_directories = []
+
+    for package in packages:
+        if mkver_configuration:
+            _warn_if_breaking_change_input_ignored(
+                mkver_configuration, package.breaking_change_indicated_by, config_path
+            )
+            _warn_if_tag_prefix_input_ignored(mkver_configuration, package.tag_prefix, config_path)
+            configuration = mkver_configuration
+        else:
+            configuration = Configuration(
+                version_source_type=os.path.split(package.path)[-1],
+                breaking_change_indicated_by=package.breaking_change_indicated_by,
+                tag_prefix=package.tag_prefix,
+            )
+
+            configuration.generate()
+
+        configurations_and_directories.append((configuration, _get_package_directory(package.path, repository_root)))
+
+    with span("expected version calculation", number_of_packages=len(packages)):
+        return get_expected_versions(configurations_and_directories, repository_path=repository_path, base_ref=base_ref)
+
+
+def _load_mkver_configuration(config_path, version_source_type, repository_path="."):
+    """Load a `mkver.conf` file, caching its compiled form in the repository's git directory so it's only parsed again
+    when it changes. If it uses features that can't be calculated in-process, a warning saying so is logged.
+
+    :param str config_path: the path to the `mkver.conf` file
+    :param str version_source_type: the type of file containing the current version number
+    :param str repository_path: the path to the git repository
+    :raise ValueError: if the file isn't a valid `git-mkver` configuration
+    :return check_semantic_version.configuration.Configuration:
+    """
+    common_directory = run_git(["rev-parse", "--path-format=absolute", "--git-common-dir"], repository_path).strip()
+
+    configuration = Configuration.from_file(
+        config_path,
+        version_source_type,
+        cache_directory=os.path.join(common_directory, CACHE_DIRECTORY_NAME),
+    )
+
+    if configuration.unsupported_features:
+        logger.warning(
+            "The `mkver.conf` file at %r uses %s, so `git-mkver` is used to calculate the expected version.",
+            config_path,
+            ", ".join(configuration.unsupported_features),
+        )
+
+    return configuration
+
+
+def _warn_if_breaking_change_input_ignored(configuration, breaking_change_indicated_by, config_path):
+    """Warn that the `breaking_change_indicated_by` input is ignored if the `mkver.conf` file treats breaking changes
+    differently, saying what the file makes them do instead.
+
+    :param check_semantic_version.configuration.Configuration configuration: the configuration loaded from the file
+    :param str breaking_change_indicated_by: the number in the semantic version that was asked to be incremented by a breaking change
+    :param str config_path: the path to the `mkver.conf` file
+    :return None:
+    """
+    if configuration.breaking_change_indicated_by == breaking_change_indicated_by.lower():
+        return
+
+    if configuration.breaking_change_indicated_by:
+        effect = f"increment the {configuration.breaking_change_indicated_by} number"
+    else:
+        effect = "not increment any number"
+
+    logger.warning(
+        "The commit message actions in the `mkver.conf` file at %r make breaking changes %s. Ignoring the "
+        "`breaking_change_indicated_by` input (%r).",
+        config_path,
+        effect,
+        breaking_change_indicated_by,
+    )
+
+
+def _warn_if_tag_prefix_input_ignored(configuration, tag_prefix, config_path):
+    """Warn that the `tag_prefix` input is ignored if it's given and differs from the `mkver.conf` file's tag prefix.
+
+    :param check_semantic_version.configuration.Configuration configuration: the configuration loaded from the file
+    :param str tag_prefix: the tag prefix that was asked for
+    :param str config_path: the path to the `mkver.conf` file
+    :return None:
+    """
+    if not tag_prefix or tag_prefix == configuration.tag_prefix:
+        return
+
+    logger.warning(
+        "The `mkver.conf` file at %r sets the tag prefix to %r. Ignoring the `tag_prefix` input (%r).",
+        config_path,
+        configuration.tag_prefix,
+        tag_prefix,
+    )
@@ -1,42 +1,206 @@
 import argparse
-import importlib.metadata
+import contextlib
+import logging
+import os
 import sys
 
-from check_semantic_version.check_semantic_version import SUPPORTED_VERSION_SOURCE_FILES, check_versions_match
+# Only the modules needed for the main check are imported up front so the CLI starts quickly (e.g. when it's run as a
+# pre-commit hook). The subcommands' modules are imported when they're run.
+from check_semantic_version.check_semantic_version import (
+    LOG_FORMAT,
+    check_versions_match,
+    parse_package_specification,
+)
+from check_semantic_version.extractors import get_supported_version_source_files
+from check_semantic_version.timings import TimingsRecorder
+
+logger = logging.getLogger(__name__)
+
+
+class _VersionAction(argparse.Action):
+    """Print the version of the CLI and exit. Unlike argparse's "version" action, the version is only looked up (which
+    needs the slow-to-import `importlib.metadata`) if the option is given.
+    """
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS, help=None):
+        super().__init__(option_strings=option_strings, dest=dest, default=default, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        import importlib.metadata
+
+        print(importlib.metadata.version("check-semantic-version"))
+        parser.exit()
 
 
 def main(argv=None):
     """Compare the current version to the expected semantic version. If they match, exit successfully with an exit code
-    of 0; if they don't, exit with an exit code of 1.
+    of 0; if they don't, exit with an exit code of 1. If a daemon started with the "serve" subcommand is running, it's
+    asked to run the check; otherwise, the check is run in this process. If the first argument is "audit", "fleet", or
+    "serve", run that subcommand instead (see `audit`, `fleet`, and `serve`). Logging is only configured if the
+    arguments are taken from the command line so programs calling this function keep control of it.
 
+    :param list(str)|None argv: the command line arguments; if `None`, they're taken from `sys.argv`
     :return None:
     """
+    if argv is None:
+        argv = sys.argv[1:]
+
+        logging.basicConfig(stream=sys.stdout, format=LOG_FORMAT, level=logging.INFO)
+
+    if argv and argv[0] == "audit":
+        audit(argv[1:])
+
+    if argv and argv[0] == "fleet":
+        fleet(argv[1:])
+
+    if argv and argv[0] == "serve":
+        serve(argv[1:])
+
     parser = argparse.ArgumentParser()
 
     parser.add_argument(
         "path",
-        help=f"The path to the version source file. The file must be one of these types: {SUPPORTED_VERSION_SOURCE_FILES}",
+        nargs="+",
+        help="The path to the version source file, or several paths to check many packages at once (e.g. in a "
+        f"monorepo). The files must be one of these types: {get_supported_version_source_files()}. Paths can be glob "
+        "patterns (e.g. 'packages/*/setup.py') and can be followed by per-path options (e.g. "
+        "'packages/a/setup.py,tag_prefix=a-v,breaking_change_indicated_by=minor').",
     )
 
     parser.add_argument(
         "breaking_change_indicated_by",
         choices=["major", "minor", "patch"],
-        default="major",
+        default=None,
         nargs="?",
+        help="Deprecated: use `--breaking-change-indicated-by` instead. It's still accepted after the paths for "
+        "compatibility.",
+    )
+
+    parser.add_argument(
+        "--breaking-change-indicated-by",
+        dest="breaking_change_indicated_by_option",
+        choices=["major", "minor", "patch"],
+        default=None,
         help='The number in the semantic version that a breaking change should increment (must be one of "major", '
-        '"minor", or "patch"). This is ignored if a `mkver.conf` file is present in the repository root.',
+        '"minor", or "patch"; defaults to "major"). This is ignored if a `mkver.conf` file is present in the '
+        "repository root.",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="A directory to cache results in. A cached result is reused if the HEAD commit, the tags, the "
+        "configuration, and the version source file are all unchanged. The directory can be shared between CI runs "
+        "(e.g. with `actions/cache`).",
+    )
+
+    parser.add_argument(
+        "--base-ref",
+        default=None,
+        help="The ref a pull request is going to be merged into (e.g. 'origin/main'). If given, only the commits since "
+        "its merge-base with HEAD are used to calculate the expected version and the last version tag reachable from "
+        "the merge-base is used as the base version, so a shallow clone deepened to the merge-base is enough.",
+    )
+
+    parser.add_argument(
+        "--timings",
+        nargs="?",
+        const="-",
+        default=None,
+        metavar="PATH",
+        help="Time each stage of the check (version extraction, configuration generation, expected version "
+        "calculation, and each subprocess) and write a JSON report of the timings to the given path, or to standard "
+        "error (away from the logs and the result on standard output) if no path is given.",
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and re-check the version whenever the version source file, HEAD, the refs, or the "
+        "`mkver.conf` file change, only re-running the lookups each change affects. Only one version source file can "
+        "be watched.",
+    )
+
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Run the check in this process even if a daemon started with `check-semantic-version serve` is running.",
     )
 
     parser.add_argument(
         "--version",
         "-v",
-        action="version",
-        version=importlib.metadata.version("check-semantic-version"),
+        action=_VersionAction,
         help="Print the version of the check-semantic-version CLI.",
     )
 
     args = parser.parse_args(argv)
-    match = check_versions_match(args.path, args.breaking_change_indicated_by)
+
+    if args.breaking_change_indicated_by_option:
+        args.breaking_change_indicated_by = args.breaking_change_indicated_by_option
+
+    # argparse gives every positional argument to `path`, so the deprecated positional form is split off the paths.
+    elif len(args.path) > 1 and args.path[-1] in {"major", "minor", "patch"}:
+        args.breaking_change_indicated_by = args.path.pop()
+
+    else:
+        args.breaking_change_indicated_by = "major"
+
+    if args.watch:
+        from check_semantic_version.watch import VersionWatcher
+
+        packages = [
+            package
+            for specification in args.path
+            for package in parse_package_specification(specification, args.breaking_change_indicated_by)
+        ]
+
+        if len(packages) > 1:
+            parser.error("Only one version source file can be watched.")
+
+        with VersionWatcher(packages[0], base_ref=args.base_ref) as watcher:
+            try:
+                watcher.run()
+            except KeyboardInterrupt:
+                pass
+
+        sys.exit(0)
+
+    # Timings can only be recorded for checks run in this process.
+    if not args.no_daemon and not args.timings:
+        from check_semantic_version.daemon import request_check
+
+        response = request_check(
+            args.path,
+            args.breaking_change_indicated_by,
+            cache_directory=args.cache_dir,
+            base_ref=args.base_ref,
+        )
+
+        if response:
+            sys.stdout.write(response["output"])
+
+            if response["error"]:
+                print(f"The daemon couldn't run the check: {response['error']}", file=sys.stderr)
+
+            sys.exit(0 if response["passed"] else 1)
+
+    # Spans are only timed if something is recording them.
+    timings_recorder = TimingsRecorder() if args.timings else None
+
+    with timings_recorder or contextlib.nullcontext():
+        match = check_versions_match(
+            args.path,
+            args.breaking_change_indicated_by,
+            cache_directory=args.cache_dir,
+            base_ref=args.base_ref,
+        )
+
+    if args.timings == "-":
+        timings_recorder.write_report(sys.stderr)
+    elif args.timings:
+        with open(args.timings, "w") as f:
+            timings_recorder.write_report(f)
 
     if not match:
         sys.exit(1)
@@ -44,5 +208,200 @@ def main(argv=None):
     sys.exit(0)
 
 
+def audit(argv):
+    """Audit the expected version at every commit in the history and write a CSV or JSON Lines report. Exit with an
+    exit code of 0 if every version tag agrees with the expected version and the version source file at its commit, or
+    with an exit code of 1 if any don't.
+
+    :param list(str) argv: the command line arguments after "audit"
+    :return None:
+    """
+    from check_semantic_version.audit import AUDIT_REPORT_FORMATS, audit_history, write_audit_report
+    from check_semantic_version.check_semantic_version import (
+        _load_mkver_configuration,
+        _warn_if_breaking_change_input_ignored,
+        _warn_if_tag_prefix_input_ignored,
+    )
+    from check_semantic_version.configuration import Configuration
+    from check_semantic_version.git import run_git
+
+    parser = argparse.ArgumentParser(
+        prog="check-semantic-version audit",
+        description="Audit the expected semantic version at every commit and version tag in the history in a single "
+        "pass, reporting where version tags disagree with the Conventional Commits or the version source file.",
+    )
+
+    parser.add_argument(
+        "path",
+        help="The path to the version source file. It must be one of these types: "
+        f"{get_supported_version_source_files()}.",
+    )
+
+    parser.add_argument(
+        "breaking_change_indicated_by",
+        choices=["major", "minor", "patch"],
+        default="major",
+        nargs="?",
+        help="The number in the semantic version that a breaking change should increment.",
+    )
+
+    parser.add_argument(
+        "--tag-prefix",
+        default="",
+        help="The prefix before version numbers in tags (e.g. 'v'). Ignored if there's a `mkver.conf` file.",
+    )
+
+    parser.add_argument("--revision", default="HEAD", help="The revision to audit the history of.")
+    parser.add_argument("--format", choices=AUDIT_REPORT_FORMATS, default="csv", help="The format of the report.")
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        default=None,
+        help="The path to write the report to. If not given, it's written to standard output and logs are written to "
+        "standard error.",
+    )
+
+    args = parser.parse_args(argv)
+
+    repository_root = run_git(["rev-parse", "--show-toplevel"]).strip()
+    version_source_type = os.path.split(args.path)[-1]
+    config_path = os.path.join(repository_root, "mkver.conf")
+
+    # Use the repository's `mkver.conf` file like the main check does.
+    if os.path.exists(config_path):
+        configuration = _load_mkver_configuration(config_path, version_source_type, repository_root)
+        _warn_if_breaking_change_input_ignored(configuration, args.breaking_change_indicated_by, config_path)
+        _warn_if_tag_prefix_input_ignored(configuration, args.tag_prefix, config_path)
+
+        if configuration.unsupported_features:
+            logger.warning("The audit is calculated in-process, so the unsupported features are ignored.")
+
+    else:
+        configuration = Configuration(
+            version_source_type=version_source_type,
+            breaking_change_indicated_by=args.breaking_change_indicated_by,
+            tag_prefix=args.tag_prefix,
+        )
+
+        configuration.generate()
+
+    version_source_path = os.path.relpath(os.path.abspath(args.path), repository_root)
+    records = audit_history(configuration, version_source_path, repository_root, revision=args.revision)
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            summary = write_audit_report(records, f, args.format)
+    else:
+        # Keep the report on standard output machine-readable.
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+                handler.setStream(sys.stderr)
+
+        summary = write_audit_report(records, sys.stdout, args.format)
+
+    print(
+        f"Audited {summary['commits']} commits: {summary['disagreements']} of {summary['tagged_commits']} "
+        "version-tagged commits disagree with their expected versions or version source files.",
+        file=sys.stderr,
+    )
+
+    sys.exit(1 if summary["disagreements"] else 0)
+
+
+def fleet(argv):
+    """Check many repositories listed in a manifest in parallel and write an aggregated report. Exit with an exit code
+    of 0 if every repository passes or with an exit code of 1 if any fail or can't be checked.
+
+    :param list(str) argv: the command line arguments after "fleet"
+    :return None:
+    """
+    from check_semantic_version.fleet import FLEET_REPORT_FORMATS, check_fleet, read_fleet_manifest, write_fleet_report
+
+    parser = argparse.ArgumentParser(
+        prog="check-semantic-version fleet",
+        description="Check the versions of many repositories in parallel across a pool of processes.",
+    )
+
+    parser.add_argument(
+        "manifest",
+        help="The path to a manifest with a line for each repository giving its path (relative to the manifest) "
+        "followed by the paths of its version source files (relative to the repository), which can be glob "
+        "patterns and have per-path options as for the main command.",
+    )
+
+    parser.add_argument(
+        "breaking_change_indicated_by",
+        choices=["major", "minor", "patch"],
+        default="major",
+        nargs="?",
+        help="The default number in the semantic version that a breaking change should increment.",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="The maximum number of repositories to check at once. Defaults to the number of CPUs.",
+    )
+
+    parser.add_argument("--format", choices=FLEET_REPORT_FORMATS, default="text", help="The format of the report.")
+    parser.add_argument("--output", "-o", default=None, help="The path to write the report to instead of stdout.")
+    args = parser.parse_args(argv)
+
+    repositories = read_fleet_manifest(args.manifest)
+    results = check_fleet(repositories, args.breaking_change_indicated_by, max_workers=args.workers)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            summary = write_fleet_report(results, f, args.format)
+    else:
+        summary = write_fleet_report(results, sys.stdout, args.format)
+
+    sys.exit(0 if summary["passed"] == summary["repositories"] else 1)
+
+
+def serve(argv):
+    """Run a daemon that answers check requests from the CLI over a Unix socket until it's interrupted or terminated.
+
+    :param list(str) argv: the command line arguments after "serve"
+    :return None:
+    """
+    import signal
+
+    from check_semantic_version.daemon import CheckServer, get_socket_path
+
+    parser = argparse.ArgumentParser(
+        prog="check-semantic-version serve",
+        description="Keep checks warm in a resident process. The CLI sends checks to the daemon when it's running and "
+        "runs them itself when it isn't. Results are reused until the repository's HEAD, refs, `mkver.conf` file, or "
+        "version source files change.",
+    )
+
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help="The path of the Unix socket to listen on. Defaults to the `CHECK_SEMANTIC_VERSION_SOCKET` environment "
+        "variable or a per-user socket in the runtime directory. The CLI finds the daemon through the same environment "
+        "variable, so set it instead of this option if the default isn't suitable.",
+    )
+
+    args = parser.parse_args(argv)
+    socket_path = args.socket or get_socket_path()
+
+    # Stop cleanly (removing the socket) when terminated as well as when interrupted.
+    signal.signal(signal.SIGTERM, lambda signal_number, frame: sys.exit(0))
+
+    with CheckServer(socket_path) as server:
+        print(f"Serving checks on {socket_path!r}.", file=sys.stderr)
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+    sys.exit(0)
+
+
 if __name__ == "__main__":
     main()
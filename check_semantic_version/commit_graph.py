@@ -0,0 +1,304 @@
+import mmap
+import os
+import struct
+
+COMMIT_GRAPH_SIGNATURE = b"CGPH"
+SHA_1_HASH_VERSION = 1
+
+# The parent position used for commits with fewer than two parents.
+NO_PARENT = 0x70000000
+
+# If this bit of a commit's second parent position is set, the commit has more than two parents and the rest of the
+# position indexes its other parents in the extra edge list.
+EXTRA_EDGES_FLAG = 0x80000000
+
+# The end of each commit's list of parents in the extra edge list is marked by this bit.
+LAST_EDGE_FLAG = 0x80000000
+
+# The size of each commit's entry in the commit data chunk: a tree sha, two parent positions, and the commit's
+# generation number and commit time.
+COMMIT_DATA_SIZE = 20 + 4 + 4 + 8
+
+
+class CommitGraph:
+    """A reader for a repository's commit-graph (a single file or a chain of split files), which stores the parents and
+    generation numbers of commits so ancestry can be resolved without reading commit objects. Use `CommitGraph.load` to
+    get one.
+
+    :param list(str) paths: the paths of the commit-graph files, from the base of the chain to the tip
+    :raise ValueError: if a file isn't a SHA-1 commit-graph
+    :return None:
+    """
+
+    def __init__(self, paths):
+        self._layers = []
+        offset = 0
+
+        for path in paths:
+            layer = _CommitGraphLayer(path, offset)
+            self._layers.append(layer)
+            offset += layer.number_of_commits
+
+        self.number_of_commits = offset
+
+    @classmethod
+    def load(cls, common_directory):
+        """Load the repository's commit-graph if it has one.
+
+        :param str common_directory: the path to the repository's common git directory
+        :return CommitGraph|None: the commit-graph, or `None` if there isn't one (or it can't be read)
+        """
+        info_directory = os.path.join(common_directory, "objects", "info")
+        chain_path = os.path.join(info_directory, "commit-graphs", "commit-graph-chain")
+
+        try:
+            if os.path.exists(chain_path):
+                with open(chain_path) as f:
+                    hashes = [line.strip() for line in f if line.strip()]
+
+                paths = [os.path.join(info_directory, "commit-graphs", f"graph-{hash}.graph") for hash in hashes]
+            elif os.path.exists(os.path.join(info_directory, "commit-graph")):
+                paths = [os.path.join(info_directory, "commit-graph")]
+            else:
+                return None
+
+            return cls(paths)
+
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def find(self, sha):
+        """Find the position of a commit in the commit-graph.
+
+        :param str sha: the sha of the commit
+        :return int|None: the position, or `None` if the commit isn't in the commit-graph
+        """
+        binary_sha = bytes.fromhex(sha)
+
+        for layer in self._layers:
+            position = layer.find(binary_sha)
+
+            if position is not None:
+                return position
+
+        return None
+
+    def get_sha(self, position):
+        """Get the sha of the commit at a position.
+
+        :param int position:
+        :return str:
+        """
+        return self._get_layer(position).get_sha(position)
+
+    def get_parents(self, position):
+        """Get the positions of the parents of the commit at a position.
+
+        :param int position:
+        :return list(int):
+        """
+        return self._get_layer(position).get_parents(position)
+
+    def get_generation(self, position):
+        """Get the generation number (topological level) of the commit at a position. A commit's generation is always
+        greater than those of its ancestors. Zero means the generation wasn't computed when the file was written.
+
+        :param int position:
+        :return int:
+        """
+        return self._get_layer(position).get_generation(position)
+
+    def is_ancestor(self, ancestor, descendant, read_parents):
+        """Check if a commit is an ancestor of (or is) another commit. The walk back from the descendant uses the
+        commit-graph's parents and doesn't go below the ancestor's generation. Commits newer than the commit-graph
+        (i.e. that aren't in it) have their parents read with the given function instead.
+
+        :param str ancestor: the sha of the possible ancestor
+        :param str descendant: the sha of the possible descendant
+        :param callable read_parents: a function returning the shas of the parents of a commit given its sha
+        :return bool:
+        """
+        if ancestor == descendant:
+            return True
+
+        ancestor_position = self.find(ancestor)
+
+        # Without the ancestor's generation, nothing can be pruned.
+        minimum_generation = self.get_generation(ancestor_position) if ancestor_position is not None else 0
+
+        # Commits in the commit-graph are tracked by position and commits newer than it by sha.
+        positions = []
+        shas = [descendant]
+        seen_positions = set()
+        seen_shas = {descendant}
+
+        while shas:
+            sha = shas.pop()
+            position = self.find(sha)
+
+            if position is not None:
+                if position not in seen_positions:
+                    seen_positions.add(position)
+                    positions.append(position)
+                continue
+
+            if sha == ancestor:
+                return True
+
+            for parent in read_parents(sha):
+                if parent not in seen_shas:
+                    seen_shas.add(parent)
+                    shas.append(parent)
+
+        while positions:
+            position = positions.pop()
+
+            if position == ancestor_position:
+                return True
+
+            # A commit's ancestors all have lower generations, so none of them can be the ancestor if the commit's
+            # generation isn't higher than the ancestor's.
+            if minimum_generation and self.get_generation(position) <= minimum_generation:
+                continue
+
+            for parent in self.get_parents(position):
+                if parent not in seen_positions:
+                    seen_positions.add(parent)
+                    positions.append(parent)
+
+        return False
+
+    def close(self):
+        """Unmap the commit-graph files.
+
+        :return None:
+        """
+        for layer in self._layers:
+            layer.close()
+
+    def _get_layer(self, position):
+        """Get the layer of the commit-graph chain containing a position.
+
+        :param int position:
+        :return _CommitGraphLayer:
+        """
+        for layer in self._layers:
+            if position < layer.offset + layer.number_of_commits:
+                return layer
+
+        raise IndexError(f"There's no commit at position {position} in the commit-graph.")
+
+
+class _CommitGraphLayer:
+    """A single memory-mapped commit-graph file. Positions are global across the chain of files the layer is part of.
+
+    :param str path: the path of the commit-graph file
+    :param int offset: the number of commits in the layers below this one
+    :raise ValueError: if the file isn't a SHA-1 commit-graph
+    :return None:
+    """
+
+    def __init__(self, path, offset):
+        self.path = path
+        self.offset = offset
+
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        signature, version, hash_version, number_of_chunks = struct.unpack_from(">4sBBB", self._data)
+
+        if signature != COMMIT_GRAPH_SIGNATURE or version != 1 or hash_version != SHA_1_HASH_VERSION:
+            raise ValueError(f"{path!r} isn't a version 1 SHA-1 commit-graph.")
+
+        chunks = {}
+
+        for index in range(number_of_chunks):
+            chunk_id, chunk_offset = struct.unpack_from(">4sQ", self._data, 8 + index * 12)
+            chunks[chunk_id] = chunk_offset
+
+        self._fanout = struct.unpack_from(">256I", self._data, chunks[b"OIDF"])
+        self.number_of_commits = self._fanout[255]
+        self._shas_offset = chunks[b"OIDL"]
+        self._commit_data_offset = chunks[b"CDAT"]
+        self._extra_edges_offset = chunks.get(b"EDGE")
+
+    def find(self, binary_sha):
+        """Find the global position of a commit in this layer by binary searching its sorted shas.
+
+        :param bytes binary_sha: the commit's 20-byte sha
+        :return int|None: the position, or `None` if the commit isn't in this layer
+        """
+        first_byte = binary_sha[0]
+        low = self._fanout[first_byte - 1] if first_byte else 0
+        high = self._fanout[first_byte]
+
+        while low < high:
+            middle = (low + high) // 2
+            start = self._shas_offset + middle * 20
+            candidate = self._data[start : start + 20]
+
+            if candidate < binary_sha:
+                low = middle + 1
+            elif candidate > binary_sha:
+                high = middle
+            else:
+                return self.offset + middle
+
+        return None
+
+    def get_sha(self, position):
+        """Get the sha of the commit at a global position in this layer.
+
+        :param int position:
+        :return str:
+        """
+        start = self._shas_offset + (position - self.offset) * 20
+        return self._data[start : start + 20].hex()
+
+    def get_parents(self, position):
+        """Get the global positions of the parents of the commit at a global position in this layer.
+
+        :param int position:
+        :return list(int):
+        """
+        start = self._commit_data_offset + (position - self.offset) * COMMIT_DATA_SIZE + 20
+        first_parent, second_parent = struct.unpack_from(">II", self._data, start)
+
+        if first_parent == NO_PARENT:
+            return []
+
+        if second_parent == NO_PARENT:
+            return [first_parent]
+
+        if not second_parent & EXTRA_EDGES_FLAG:
+            return [first_parent, second_parent]
+
+        parents = [first_parent]
+        edge_offset = self._extra_edges_offset + (second_parent & ~EXTRA_EDGES_FLAG) * 4
+
+        while True:
+            (edge,) = struct.unpack_from(">I", self._data, edge_offset)
+            parents.append(edge & ~LAST_EDGE_FLAG)
+
+            if edge & LAST_EDGE_FLAG:
+                return parents
+
+            edge_offset += 4
+
+    def get_generation(self, position):
+        """Get the generation number (topological level) of the commit at a global position in this layer. It's
+        stored in the top 30 bits of the commit's generation and commit time field.
+
+        :param int position:
+        :return int:
+        """
+        start = self._commit_data_offset + (position - self.offset) * COMMIT_DATA_SIZE + 28
+        (generation_and_time,) = struct.unpack_from(">I", self._data, start)
+        return generation_and_time >> 2
+
+    def close(self):
+        """Unmap the file.
+
+        :return None:
+        """
+        self._data.close()
@@ -1,6 +1,19 @@
 import copy
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
 
-from pyhocon import ConfigFactory, HOCONConverter
+from check_semantic_version.extractors import get_extractor
+from check_semantic_version.rules import ACTION_PRECEDENCE, CommitMessageRules
+from check_semantic_version.timings import span
+
+logger = logging.getLogger(__name__)
+
+# Increment this when the compiled form of `mkver.conf` files changes so previously cached compilations are ignored.
+COMPILED_CONFIGURATION_FORMAT_VERSION = 1
 
 DEFAULTS = {
     "tag": False,
@@ -12,39 +25,6 @@ DEFAULTS = {
     "patches": [],
 }
 
-PATCHES = {
-    "setup.py": {
-        "name": "setup.py",
-        "filePatterns": ["setup.py"],
-        "replacements": [
-            {
-                "find": 'version="{VersionRegex}"',
-                "replace": 'version="{Version}"',
-            },
-        ],
-    },
-    "pyproject.toml": {
-        "name": "pyproject.toml",
-        "filePatterns": ["pyproject.toml"],
-        "replacements": [
-            {
-                "find": 'version = "{VersionRegex}"',
-                "replace": 'version = "{Version}"',
-            }
-        ],
-    },
-    "package.json": {
-        "name": "package.json",
-        "filePatterns": ["package.json"],
-        "replacements": [
-            {
-                "find": '"version": "{VersionRegex}"',
-                "replace": '"version": "{Version}"',
-            }
-        ],
-    },
-}
-
 COMMIT_MESSAGE_ACTIONS_TEMPLATE = [
     {
         "pattern": "BREAKING CHANGE",
@@ -67,10 +47,13 @@ BREAKING_CHANGE_COMMIT_ACTION_MAPPING = {
 }
 
 
+CONFIGURATION_SECTIONS = ("tagPrefix", "defaults", "patches", "commitMessageActions")
+
+
 class Configuration:
     """A representation of a `mkver.conf` (`git-mkver` configuration) file.
 
-    :param str version_source_type: the type of file containing the current version number (must be one of "setup.py", "pyproject.toml", or "package.json")
+    :param str version_source_type: the type of file containing the current version number (the name of a registered extractor or of a file matching one's patterns, e.g. "setup.py", "pyproject.toml", or "package.json")
     :param str breaking_change_indicated_by: the number in the semantic version that a breaking change should increment (must be one of "major", "minor", or "patch")
     :param str tag_prefix: the prefix to be used before version numbers (e.g. "v")
     :return None:
@@ -81,28 +64,120 @@ class Configuration:
         self.breaking_change_indicated_by = breaking_change_indicated_by.lower()
         self.tag_prefix = tag_prefix
 
+    @classmethod
+    def from_file(cls, path, version_source_type, cache_directory=None):
+        """Load a `mkver.conf` file, validating it and compiling it into the same form as a generated configuration.
+        If a cache directory is given, the compiled form is cached in it keyed by a hash of the file's contents, so the
+        file is only parsed (which needs the slow-to-import `pyhocon`) when it changes.
+
+        The loaded configuration's `breaking_change_indicated_by` is the number that the file's commit message actions
+        make a "BREAKING CHANGE" commit increment (`None` if it doesn't increment any).
+
+        :param str path: the path to the `mkver.conf` file
+        :param str version_source_type: the type of file containing the current version number
+        :param str|None cache_directory: if given, the path to a directory to cache the compiled configuration in
+        :raise ValueError: if the file can't be parsed or isn't a valid `git-mkver` configuration
+        :return Configuration:
+        """
+        with open(path, "rb") as f:
+            contents = f.read()
+
+        cache_path = None
+        compiled = None
+
+        # Included files aren't part of the hash, so configurations including other files aren't cached.
+        if cache_directory and not re.search(rb"^\s*include\b", contents, re.MULTILINE):
+            digest = hashlib.sha256(b"%d\0" % COMPILED_CONFIGURATION_FORMAT_VERSION + contents).hexdigest()
+            cache_path = os.path.join(cache_directory, f"mkver-{digest}.json")
+            compiled = _load_compiled_configuration(cache_path)
+
+        if compiled is None:
+            with span("configuration parsing", path=path):
+                compiled = _compile_configuration(path, contents)
+
+            if cache_path:
+                _save_compiled_configuration(compiled, cache_path)
+
+        configuration = cls(version_source_type=version_source_type, tag_prefix=compiled["tagPrefix"])
+        configuration._configuration = compiled
+        configuration.breaking_change_indicated_by = configuration._get_breaking_change_number()
+        return configuration
+
     def generate(self):
         """Generate the configuration.
 
         :return None:
         """
-        self._configuration = {
-            "tagPrefix": self.tag_prefix,
-            "defaults": self._get_defaults(),
-            "patches": [PATCHES[self.version_source_type]],
-            "commitMessageActions": self._get_commit_message_actions(),
-        }
+        with span("configuration generation", version_source_type=self.version_source_type):
+            self._configuration = {
+                "tagPrefix": self.tag_prefix,
+                "defaults": self._get_defaults(),
+                "patches": [get_extractor(self.version_source_type).patch],
+                "commitMessageActions": self._get_commit_message_actions(),
+            }
+
+    @property
+    def digest(self):
+        """A SHA-256 digest of the generated configuration that changes whenever its contents do.
+
+        :return str:
+        """
+        return hashlib.sha256(json.dumps(self._configuration, sort_keys=True).encode("utf8")).hexdigest()
+
+    @property
+    def commit_message_actions(self):
+        """The commit message actions of the generated configuration.
+
+        :return list(dict):
+        """
+        return self._configuration["commitMessageActions"]
+
+    @property
+    def when_no_valid_commit_messages(self):
+        """The action to take if none of the commit messages since the last version tag match a commit message action.
+
+        :return str:
+        """
+        return self._configuration["defaults"]["whenNoValidCommitMessages"]
 
-        self._hocon_configuration = ConfigFactory.from_dict(self._configuration)
+    @property
+    def unsupported_features(self):
+        """The features of the configuration that can't be used when calculating the expected version in-process,
+        meaning `git-mkver` must be used instead. Generated configurations never have any.
+
+        :return list(str):
+        """
+        features = [f"the {key!r} section" for key in self._configuration if key not in CONFIGURATION_SECTIONS]
+        defaults = self._configuration["defaults"]
+
+        features.extend(f"the {key!r} default" for key in defaults if key not in DEFAULTS)
+
+        if defaults.get("includeBuildMetaData") is not False:
+            features.append("build metadata (`includeBuildMetaData` isn't set to `false`)")
+
+        if "whenNoValidCommitMessages" not in defaults:
+            features.append("`git-mkver`'s default `whenNoValidCommitMessages` action")
+
+        for action in self._configuration["commitMessageActions"]:
+            try:
+                re.compile(action["pattern"])
+            except re.error:
+                features.append(f"the pattern {action['pattern']!r}, which isn't a valid Python regular expression")
+
+        return features
 
     def write(self, path):
-        """Write the configuration to a file.
+        """Write the configuration to a file in HOCON format. `pyhocon` is only imported here as it's slow to import
+        and the configuration is only written to a file for `git-mkver`.
 
         :param str path: the path to write the file to
         :return None:
         """
-        with open(path, "w") as f:
-            f.write(HOCONConverter.to_hocon(self._hocon_configuration))
+        from pyhocon import ConfigFactory, HOCONConverter
+
+        with span("configuration writing", path=path):
+            with open(path, "w") as f:
+                f.write(HOCONConverter.to_hocon(ConfigFactory.from_dict(self._configuration)))
 
     def _get_defaults(self):
         """Generate the defaults section of the configuration.
@@ -110,9 +185,23 @@ class Configuration:
         :return dict:
         """
         defaults = DEFAULTS.copy()
-        defaults["patches"] = [self.version_source_type]
+        defaults["patches"] = [get_extractor(self.version_source_type).name]
         return defaults
 
+    def _get_breaking_change_number(self):
+        """Get the number in the semantic version that the configuration's commit message actions make a breaking
+        change increment.
+
+        :return str|None: "major", "minor", or "patch", or `None` if breaking changes don't increment any of them
+        """
+        try:
+            action = CommitMessageRules(self.commit_message_actions).get_action("BREAKING CHANGE")
+        except (ValueError, re.error):
+            return None
+
+        numbers = {action: number for number, action in BREAKING_CHANGE_COMMIT_ACTION_MAPPING.items()}
+        return numbers.get(action)
+
     def _get_commit_message_actions(self):
         """Generate the commit message actions section of the configuration.
 
@@ -124,3 +213,125 @@ class Configuration:
             pattern["action"] = BREAKING_CHANGE_COMMIT_ACTION_MAPPING[self.breaking_change_indicated_by]
 
         return actions
+
+
+def _compile_configuration(path, contents):
+    """Parse the contents of a `mkver.conf` file and validate it, filling in the sections `git-mkver` doesn't require.
+
+    :param str path: the path to the file (used for resolving includes and in error messages)
+    :param bytes contents: the contents of the file
+    :raise ValueError: if the file can't be parsed or isn't a valid `git-mkver` configuration
+    :return dict: the compiled configuration
+    """
+    from pyhocon import ConfigFactory
+    from pyhocon.exceptions import ConfigException
+    from pyparsing import ParseBaseException
+
+    try:
+        parsed = ConfigFactory.parse_string(contents.decode("utf8"), basedir=os.path.dirname(path) or ".")
+    except (ConfigException, ParseBaseException, UnicodeDecodeError) as e:
+        raise ValueError(f"The `mkver.conf` file {path!r} couldn't be parsed: {e}") from e
+
+    # Round-trip through JSON to turn `pyhocon`'s config trees into plain dictionaries and lists.
+    configuration = json.loads(json.dumps(parsed.as_plain_ordered_dict()))
+
+    def check(condition, message):
+        if not condition:
+            raise ValueError(f"The `mkver.conf` file {path!r} is invalid: {message}")
+
+    configuration.setdefault("tagPrefix", "")
+    configuration.setdefault("defaults", {})
+    configuration.setdefault("patches", [])
+    configuration.setdefault("commitMessageActions", [])
+
+    check(isinstance(configuration["tagPrefix"], str), "`tagPrefix` must be a string.")
+    check(isinstance(configuration["defaults"], dict), "`defaults` must be an object.")
+
+    when_no_valid_commit_messages = configuration["defaults"].get("whenNoValidCommitMessages", "IncrementPatch")
+
+    check(
+        when_no_valid_commit_messages in ACTION_PRECEDENCE,
+        f"`defaults.whenNoValidCommitMessages` must be one of {list(ACTION_PRECEDENCE)!r}.",
+    )
+
+    check(isinstance(configuration["patches"], list), "`patches` must be a list.")
+
+    for patch in configuration["patches"]:
+        check(
+            isinstance(patch, dict)
+            and isinstance(patch.get("name"), str)
+            and _is_list_of(patch.get("filePatterns"), str)
+            and _is_list_of(patch.get("replacements"), dict)
+            and all(
+                isinstance(replacement.get("find"), str) and isinstance(replacement.get("replace"), str)
+                for replacement in patch["replacements"]
+            ),
+            f"each patch must have a `name`, `filePatterns`, and `replacements` with `find` and `replace` strings "
+            f"(got {patch!r}).",
+        )
+
+    patch_names = {patch["name"] for patch in configuration["patches"]}
+
+    for name in configuration["defaults"].get("patches", []):
+        check(name in patch_names, f"the default patch {name!r} isn't defined in `patches`.")
+
+    check(isinstance(configuration["commitMessageActions"], list), "`commitMessageActions` must be a list.")
+
+    for action in configuration["commitMessageActions"]:
+        check(
+            isinstance(action, dict) and isinstance(action.get("pattern"), str),
+            f"each commit message action must have a `pattern` string (got {action!r}).",
+        )
+
+        check(
+            action.get("action") in ACTION_PRECEDENCE,
+            f"the action of the pattern {action['pattern']!r} must be one of {list(ACTION_PRECEDENCE)!r}.",
+        )
+
+    return configuration
+
+
+def _is_list_of(value, type_):
+    """Check if a value is a list of values of the given type.
+
+    :param any value: the value to check
+    :param type type_: the type the list's items must have
+    :return bool:
+    """
+    return isinstance(value, list) and all(isinstance(item, type_) for item in value)
+
+
+def _load_compiled_configuration(path):
+    """Load a cached compiled configuration.
+
+    :param str path: the path to the cached compiled configuration
+    :return dict|None: the compiled configuration, or `None` if it isn't cached or can't be read
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        logger.warning("Ignoring unreadable compiled configuration %r.", path)
+        return None
+
+
+def _save_compiled_configuration(configuration, path):
+    """Cache a compiled configuration, ignoring failures (e.g. a read-only git directory) as caching is only an
+    optimisation.
+
+    :param dict configuration: the compiled configuration
+    :param str path: the path to cache it at
+    :return None:
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+            json.dump(configuration, f)
+
+        os.replace(f.name, path)
+
+    except OSError as e:
+        logger.debug("Couldn't save compiled configuration to %r: %s", path, e)
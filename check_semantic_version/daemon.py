@@ -0,0 +1,284 @@
+import contextlib
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import tempfile
+import time
+
+from check_semantic_version.check_semantic_version import (
+    LOG_FORMAT,
+    check_versions_match,
+    parse_package_specification,
+)
+from check_semantic_version.extractors import get_extractor
+from check_semantic_version.git import run_git
+from check_semantic_version.tag_index import RACY_REFS_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# The environment variable that sets the path of the socket the daemon listens on and the client connects to.
+SOCKET_PATH_ENVIRONMENT_VARIABLE = "CHECK_SEMANTIC_VERSION_SOCKET"
+
+# The longest time in seconds the client waits for the daemon to accept a request and answer it before the check is run
+# in-process instead, so a hung daemon can't block every check.
+REQUEST_TIMEOUT = 30
+
+
+def get_socket_path():
+    """Get the path of the daemon's socket. It's taken from the `CHECK_SEMANTIC_VERSION_SOCKET` environment variable
+    if it's set; otherwise, it's a per-user socket in the runtime directory (or the temporary directory if there isn't
+    one).
+
+    :return str: the path of the socket
+    """
+    if os.environ.get(SOCKET_PATH_ENVIRONMENT_VARIABLE):
+        return os.environ[SOCKET_PATH_ENVIRONMENT_VARIABLE]
+
+    runtime_directory = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_directory, f"check-semantic-version-{os.getuid()}.sock")
+
+
+def request_check(
+    path,
+    breaking_change_indicated_by="major",
+    cache_directory=None,
+    base_ref=None,
+    repository_path=".",
+    socket_path=None,
+    timeout=REQUEST_TIMEOUT,
+):
+    """Ask a running daemon to check the versions of the packages in a repository (see `check_versions_match` for the
+    arguments). Relative paths are resolved against the current working directory before they're sent. If no daemon
+    is running, the socket belongs to another user, or the daemon stops or doesn't answer within the timeout, `None` is
+    returned so the check can be run in-process instead.
+
+    :param str|list(str) path: the path to the version source file, or several of them
+    :param str breaking_change_indicated_by: the number in the semantic version that a breaking change should increment
+    :param str|None cache_directory: if given, the path to a directory to cache results in
+    :param str|None base_ref: if given, only use the commits since the merge-base of this ref and HEAD
+    :param str repository_path: the path to the git repository
+    :param str|None socket_path: the path of the daemon's socket; if `None`, `get_socket_path` is used
+    :param float timeout: the longest time in seconds to wait for the daemon to accept the request and answer it
+    :return dict|None: the daemon's response (whether the versions match, the check's output, and any error), or `None` if there isn't a daemon to answer
+    """
+    socket_path = socket_path or get_socket_path()
+
+    try:
+        # Another user could create a socket at a predictable path and answer checks falsely.
+        if os.stat(socket_path).st_uid != os.getuid():
+            logger.warning("Ignoring the daemon socket %r as it belongs to another user.", socket_path)
+            return None
+    except FileNotFoundError:
+        return None
+
+    request = {
+        "path": path if isinstance(path, (list, tuple)) else [path],
+        "breaking_change_indicated_by": breaking_change_indicated_by,
+        "cache_directory": os.path.abspath(cache_directory) if cache_directory else None,
+        "base_ref": base_ref,
+        "repository_path": os.path.abspath(repository_path),
+    }
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+
+        try:
+            client.connect(socket_path)
+            client.sendall(json.dumps(request).encode("utf8") + b"\n")
+
+            with client.makefile("rb") as f:
+                line = f.readline()
+
+        except (ConnectionRefusedError, ConnectionResetError, FileNotFoundError, BrokenPipeError):
+            return None
+        except TimeoutError:
+            logger.warning("The daemon didn't answer within %s seconds. Running the check in-process.", timeout)
+            return None
+
+    if not line:
+        return None
+
+    return json.loads(line)
+
+
+class CheckServer(socketserver.UnixStreamServer):
+    """A daemon answering check requests from `request_check` over a Unix socket. Keeping the process running means
+    checks don't pay for interpreter start-up, imports, or starting `git cat-file` processes, and the tag indexes and
+    commit scan checkpoints saved in each repository's git directory are reused as usual.
+
+    The result of each request is kept in memory along with a signature of the state it depends on: the modification
+    times and sizes of the repository's HEAD, refs, packed refs, shallow file, `mkver.conf` file, version source files,
+    and the files their versions are read from (e.g. the module a `setup.py` file imports its version from). A repeated
+    request is answered from memory without running any `git` commands until the signature changes. Results are never
+    reused if a version can only be found by running code (e.g. executing a `setup.py` file), as that code could read
+    any file. Requests are handled one at a time as a check's output is captured by redirecting standard output.
+
+    :param str socket_path: the path to listen on; a stale socket left by a daemon that didn't stop cleanly is replaced
+    :raise OSError: if another daemon is already listening on the socket
+    :return None:
+    """
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self._results = {}
+        self._git_directories = {}
+        _remove_stale_socket(socket_path)
+
+        # Only the user running the daemon can connect to the socket.
+        old_umask = os.umask(0o177)
+
+        try:
+            super().__init__(socket_path, _CheckRequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def server_close(self):
+        super().server_close()
+
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.socket_path)
+
+    def check(self, request):
+        """Answer a check request, reusing the previous result of the same request if the state it depends on hasn't
+        changed since.
+
+        :param dict request: the request sent by `request_check`
+        :return dict: whether the versions match, the check's output, and any error
+        """
+        key = json.dumps(request, sort_keys=True)
+        signature = self._get_signature(request)
+        previous = self._results.get(key)
+
+        if signature is not None and previous and previous["signature"] == signature:
+            logger.info("Reusing the result for %r as nothing it depends on has changed.", request["repository_path"])
+            return previous["response"]
+
+        output = io.StringIO()
+        handler = logging.StreamHandler(output)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logging.getLogger().addHandler(handler)
+        error = None
+
+        try:
+            with contextlib.redirect_stdout(output):
+                passed = check_versions_match(
+                    request["path"],
+                    request["breaking_change_indicated_by"],
+                    cache_directory=request["cache_directory"],
+                    base_ref=request["base_ref"],
+                    repository_path=request["repository_path"],
+                )
+
+        except Exception as e:
+            passed = None
+            error = f"{type(e).__name__}: {e}"
+
+        finally:
+            logging.getLogger().removeHandler(handler)
+
+        response = {"passed": passed, "output": output.getvalue(), "error": error}
+
+        # Files changed this recently might change again without their modification times changing, so results
+        # depending on them aren't reused.
+        last_modified = max((modified for _, modified, _ in signature or [] if modified), default=0)
+
+        if signature is not None and not error and time.time_ns() - last_modified > RACY_REFS_INTERVAL * 1e9:
+            self._results[key] = {"signature": signature, "response": response}
+        else:
+            self._results.pop(key, None)
+
+        return response
+
+    def _get_signature(self, request):
+        """Get the paths, modification times, and sizes of the files and directories a request's result depends on.
+        The repository's git directories are only looked up the first time it's checked.
+
+        :param dict request: the request
+        :return list(tuple)|None: the path, modification time, and size of each file or directory (`None` if it doesn't exist), or `None` if a version can only be found by running code so the result can't be reused
+        """
+        repository_path = request["repository_path"]
+
+        if repository_path not in self._git_directories:
+            self._git_directories[repository_path] = run_git(
+                ["rev-parse", "--path-format=absolute", "--git-dir", "--git-common-dir"],
+                repository_path,
+            ).split()
+
+        git_directory, common_directory = self._git_directories[repository_path]
+
+        paths = [
+            os.path.join(git_directory, "HEAD"),
+            os.path.join(common_directory, "packed-refs"),
+            os.path.join(common_directory, "shallow"),
+            os.path.join(repository_path, "mkver.conf"),
+        ]
+
+        for specification in request["path"]:
+            for package in parse_package_specification(
+                specification,
+                request["breaking_change_indicated_by"],
+                repository_path,
+            ):
+                package_path = os.path.abspath(os.path.join(repository_path, package.path))
+
+                try:
+                    source_paths = get_extractor(os.path.basename(package_path)).get_source_paths(package_path)
+                except (OSError, ValueError):
+                    # The check fails for a missing or invalid version source file, so its result isn't reused anyway.
+                    source_paths = [package_path]
+
+                if source_paths is None:
+                    return None
+
+                paths.extend(source_paths)
+
+        for directory, _, filenames in os.walk(os.path.join(common_directory, "refs")):
+            paths.append(directory)
+            paths.extend(os.path.join(directory, filename) for filename in filenames)
+
+        signature = []
+
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append((path, None, None))
+
+        return signature
+
+
+class _CheckRequestHandler(socketserver.StreamRequestHandler):
+    """Read a JSON check request from a client and write the JSON response back."""
+
+    def handle(self):
+        try:
+            response = self.server.check(json.loads(self.rfile.readline()))
+        except Exception as e:
+            logger.exception("Couldn't answer a check request.")
+            response = {"passed": None, "output": "", "error": f"{type(e).__name__}: {e}"}
+
+        self.wfile.write(json.dumps(response).encode("utf8") + b"\n")
+
+
+def _remove_stale_socket(socket_path):
+    """Remove a socket left behind by a daemon that didn't stop cleanly.
+
+    :param str socket_path: the path of the socket
+    :raise OSError: if a daemon is listening on the socket
+    :return None:
+    """
+    if not os.path.exists(socket_path):
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except ConnectionRefusedError:
+            os.remove(socket_path)
+            return
+
+    raise OSError(f"A daemon is already listening on {socket_path!r}.")
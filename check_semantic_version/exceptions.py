@@ -0,0 +1,23 @@
+import signal
+import subprocess
+
+
+class CalledProcessError(subprocess.CalledProcessError):
+    """A `CalledProcessError` that reports the `stderr` output of the process that errored."""
+
+    def __str__(self):
+        if self.returncode and self.returncode < 0:
+            try:
+                return "Command '%s' died with %r. Stderr: %r" % (
+                    self.cmd,
+                    signal.Signals(-self.returncode),
+                    self.stderr,
+                )
+            except ValueError:
+                return "Command '%s' died with unknown signal %d. Stderr: %r" % (
+                    self.cmd,
+                    -self.returncode,
+                    self.stderr,
+                )
+
+        return "Command '%s' returned non-zero exit status %d. Stderr: %r" % (self.cmd, self.returncode, self.stderr)
@@ -0,0 +1,479 @@
+import json
+import logging
+import os
+import tempfile
+
+from check_semantic_version.cat_file import CAT_FILE_POOL
+from check_semantic_version.exceptions import CalledProcessError
+from check_semantic_version.git import iter_commits, run_git
+from check_semantic_version.object_store import ObjectStore, get_git_backend
+from check_semantic_version.rules import ACTION_PRECEDENCE, CommitMessageRules
+from check_semantic_version.tag_index import CACHE_DIRECTORY_NAME, TagIndex
+from check_semantic_version.version import Version
+
+logger = logging.getLogger(__name__)
+
+
+def get_expected_version(configuration, repository_path=".", use_checkpoint=True, backend=None, base_ref=None):
+    """Calculate the expected semantic version of the git repository's HEAD commit in the same way `git-mkver next`
+    does. The highest version tag reachable from HEAD is found with a tag index, the action of each commit since it
+    is determined from the configuration's commit message actions, and the highest-precedence action is applied to the
+    tag's version. The commits are streamed from git in a single pass.
+
+    After each calculation, a checkpoint of the scan is saved in the repository's git directory so the next calculation
+    only has to scan the commits made since. The checkpoint is discarded if the configuration or the tags change, or if
+    history is rewritten so that the checkpoint's commit is no longer an ancestor of HEAD, or if the last version tag
+    reachable from HEAD changes (e.g. when a branch with a higher version tag is merged).
+
+    If a base ref is given (e.g. the branch a pull request is going to be merged into), only the commits since the
+    merge-base of the base ref and HEAD are scanned and the last version tag reachable from the merge-base is used as
+    the base version. This works in shallow clones as long as they include the merge-base (and the last version tag's
+    commit if it isn't the merge-base).
+
+    :param check_semantic_version.configuration.Configuration configuration: a generated configuration
+    :param str repository_path: the path to the git repository
+    :param bool use_checkpoint: if `False`, scan from the last version tag and don't save a checkpoint (checkpoints are never used with a base ref)
+    :param str|None backend: how to read the repository: "git" to run the `git` binary or "python" to read its files directly without starting any processes; if `None`, it's taken from the `CHECK_SEMANTIC_VERSION_GIT_BACKEND` environment variable, defaulting to "git"
+    :param str|None base_ref: if given, only scan the commits since the merge-base of this ref and HEAD (the merge-base is always found with `git`)
+    :raise ValueError: if a commit message matches a pattern with the "Fail" action, or if a base ref is given and HEAD has no merge-base with it or commits needed are missing from a shallow clone
+    :return str: the expected semantic version
+    """
+    rules = CommitMessageRules(configuration.commit_message_actions)
+    use_checkpoint = use_checkpoint and not base_ref
+
+    if get_git_backend(backend) == "python":
+        object_store = ObjectStore(repository_path)
+        git_directory, head = object_store.git_directory, object_store.resolve_ref("HEAD")
+    else:
+        object_store = None
+        git_directory, head = run_git(["rev-parse", "--absolute-git-dir", "HEAD"], repository_path).split()
+
+    checkpoint_path = os.path.join(git_directory, CACHE_DIRECTORY_NAME, f"checkpoint-{configuration.digest}.json")
+
+    try:
+        tag_index = TagIndex(repository_path, configuration.tag_prefix, object_store=object_store)
+
+        if base_ref:
+            scan = _scan_pull_request(tag_index, rules, repository_path, base_ref)
+        else:
+            checkpoint = None
+
+            if use_checkpoint:
+                checkpoint = _load_checkpoint(checkpoint_path, tag_index)
+
+            scan = _scan_history(tag_index, rules, repository_path, checkpoint)
+
+    finally:
+        if object_store:
+            object_store.close()
+
+    if use_checkpoint:
+        _save_checkpoint(checkpoint_path, scan | {"commit": head, "tags_digest": tag_index.digest})
+
+    if scan["tag"]:
+        logger.info("Last version tag: %r.", scan["tag"])
+    else:
+        logger.info("No version tags found. Starting from version %s.", scan["version"])
+
+    if scan["number_of_commits"] == 0:
+        action = "NoIncrement"
+    else:
+        action = scan["action"] or configuration.when_no_valid_commit_messages
+
+    last_version = Version.from_tag(scan["version"])
+    expected_version = str(last_version.increment(action))
+    logger.info("Expected version (%s since %s): %s", action, last_version, expected_version)
+    return expected_version
+
+
+def get_expected_versions(packages, repository_path=".", base_ref=None):
+    """Calculate the expected semantic versions of several packages in a monorepo in a single pass through the git
+    history. Each package has its own configuration (and so its own tag prefix and commit message actions) and only
+    the commits changing files in its directory count towards its version. Each package's last version tag is found
+    with a tag index and the pass stops once every package's last version tag has been reached. Merge commits only
+    count towards packages at the repository root. If a base ref is given, only the commits since its merge-base with
+    HEAD are scanned and each package's last version tag is the one reachable from the merge-base.
+
+    :param list(tuple(check_semantic_version.configuration.Configuration, str)) packages: for each package, a generated configuration and the package's directory relative to the repository root ("" for the root)
+    :param str repository_path: the path to the git repository
+    :param str|None base_ref: if given, only scan the commits since the merge-base of this ref and HEAD
+    :raise ValueError: if a commit message matches a pattern with the "Fail" action, or if a base ref is given and HEAD has no merge-base with it or commits needed are missing from a shallow clone
+    :return list(str): the expected semantic version of each package, in the same order as the packages
+    """
+    merge_base = _get_merge_base(base_ref, repository_path) if base_ref else None
+    last_tags = {}
+
+    for configuration, _ in packages:
+        if configuration.tag_prefix not in last_tags:
+            last_tag = TagIndex(repository_path, configuration.tag_prefix).get_last_reachable_tag(merge_base or "HEAD")
+
+            if merge_base:
+                _check_history_is_complete(
+                    last_tag.commit if last_tag else None,
+                    merge_base,
+                    repository_path,
+                    purpose=f"the last version tag with the prefix {configuration.tag_prefix!r} can't be found",
+                )
+
+            last_tags[configuration.tag_prefix] = last_tag
+
+    scans = [
+        _PackageScan(configuration, directory, last_tags[configuration.tag_prefix])
+        for configuration, directory in packages
+    ]
+
+    for commit in iter_commits(f"{merge_base}..HEAD" if merge_base else "HEAD", repository_path, include_files=True):
+        remaining_scans = [scan for scan in scans if not scan.finished]
+
+        if not remaining_scans:
+            break
+
+        for scan in remaining_scans:
+            scan.add(commit)
+
+    expected_versions = []
+
+    for scan in scans:
+        # Every commit since the merge-base is scanned, so only scans stopped at a version tag can be incomplete.
+        if scan.last_tag and not merge_base:
+            _rescan_package_if_incomplete(scan, repository_path)
+
+        if scan.number_of_commits == 0:
+            action = "NoIncrement"
+        else:
+            action = scan.action or scan.configuration.when_no_valid_commit_messages
+
+        expected_version = str(scan.last_version.increment(action))
+
+        logger.info(
+            "Expected version of the package in %r (%s since %s): %s",
+            scan.directory or ".",
+            action,
+            scan.last_tag.name if scan.last_tag else scan.last_version,
+            expected_version,
+        )
+
+        expected_versions.append(expected_version)
+
+    return expected_versions
+
+
+class _PackageScan:
+    """The state of the scan of a single package's commits during a shared pass through the history.
+
+    :param check_semantic_version.configuration.Configuration configuration: the package's generated configuration
+    :param str directory: the package's directory relative to the repository root ("" for the root)
+    :param check_semantic_version.tag_index.Tag|None last_tag: the package's last version tag reachable from HEAD
+    :return None:
+    """
+
+    def __init__(self, configuration, directory, last_tag):
+        self.configuration = configuration
+        self.directory = directory.strip("/")
+        self.rules = CommitMessageRules(configuration.commit_message_actions)
+        self.last_tag = last_tag
+        self.last_version = last_tag.version if last_tag else Version(0, 0, 0)
+        self.finished = False
+        self.action = None
+        self.number_of_commits = 0
+
+    def add(self, commit):
+        """Add a commit to the scan. If it's the commit of the package's last version tag, the scan is finished;
+        otherwise, if it changes the package, its action is included.
+
+        :param check_semantic_version.git.Commit commit: the commit, including its changed files
+        :return None:
+        """
+        if self.last_tag and commit.sha == self.last_tag.commit:
+            self.finished = True
+            return
+
+        if self.changes_package(commit):
+            self.number_of_commits += 1
+
+            if self.action != self.rules.highest_action:
+                self.action = _get_higher_action(self.action, self.rules.get_action(commit.message))
+
+    def changes_package(self, commit):
+        """Check if a commit changes any files in the package's directory.
+
+        :param check_semantic_version.git.Commit commit: the commit, including its changed files
+        :return bool:
+        """
+        if not self.directory:
+            return True
+
+        return any(path.startswith(self.directory + "/") for path in commit.files)
+
+
+def _rescan_package_if_incomplete(scan, repository_path):
+    """Rescan a package's commits since its last version tag if the shared pass missed some. This happens when commits
+    from branches merged since the tag were made before it, so they come after it in the log.
+
+    :param _PackageScan scan: the package's completed scan
+    :param str repository_path: the path to the git repository
+    :return None:
+    """
+    revision_range = f"{scan.last_tag.commit}..HEAD"
+
+    if scan.directory:
+        arguments = ["rev-list", "--count", "--no-merges", revision_range, "--", scan.directory]
+    else:
+        arguments = ["rev-list", "--count", revision_range]
+
+    if int(run_git(arguments, repository_path)) == scan.number_of_commits:
+        return
+
+    logger.info("Rescanning %r for the package in %r.", revision_range, scan.directory or ".")
+    scan.action = None
+    scan.number_of_commits = 0
+
+    for commit in iter_commits(revision_range, repository_path, include_files=True):
+        if scan.changes_package(commit):
+            scan.number_of_commits += 1
+            scan.action = _get_higher_action(scan.action, scan.rules.get_action(commit.message))
+
+
+def _scan_history(tag_index, rules, repository_path, checkpoint=None):
+    """Scan the commits since the last version tag reachable from HEAD, or only those since the checkpoint if one is
+    given.
+
+    :param check_semantic_version.tag_index.TagIndex tag_index: the index of the repository's version tags
+    :param check_semantic_version.rules.CommitMessageRules rules: the compiled commit message actions
+    :param str repository_path: the path to the git repository
+    :param dict|None checkpoint: a valid checkpoint from a previous scan
+    :return dict: the last version tag and version, the highest-precedence action, and the number of commits scanned
+    """
+    if checkpoint:
+        logger.info("Resuming from the checkpoint at %s.", checkpoint["commit"])
+        commits = _CommitScan(repository_path, checkpoint["commit"], tag_index.object_store)
+        action = _get_highest_action(commits, rules)
+
+        # The checkpoint is only valid if the last version tag reachable from HEAD is still the same.
+        return {
+            "tag": checkpoint["tag"],
+            "version": checkpoint["version"],
+            "action": _get_higher_action(checkpoint["action"], action),
+            "number_of_commits": checkpoint["number_of_commits"] + commits.number_of_commits,
+        }
+
+    last_tag = tag_index.get_last_reachable_tag("HEAD")
+    commits = _CommitScan(repository_path, last_tag.commit if last_tag else None, tag_index.object_store)
+    action = _get_highest_action(commits, rules)
+
+    return {
+        "tag": last_tag.name if last_tag else None,
+        "version": str(last_tag.version if last_tag else Version(0, 0, 0)),
+        "action": action,
+        "number_of_commits": commits.number_of_commits,
+    }
+
+
+def _scan_pull_request(tag_index, rules, repository_path, base_ref):
+    """Scan the commits since the merge-base of the base ref and HEAD, using the last version tag reachable from the
+    merge-base as the base version.
+
+    :param check_semantic_version.tag_index.TagIndex tag_index: the index of the repository's version tags
+    :param check_semantic_version.rules.CommitMessageRules rules: the compiled commit message actions
+    :param str repository_path: the path to the git repository
+    :param str base_ref: the ref the pull request is going to be merged into (e.g. "origin/main")
+    :raise ValueError: if HEAD has no merge-base with the base ref or commits needed are missing from a shallow clone
+    :return dict: the last version tag and version, the highest-precedence action, and the number of commits scanned
+    """
+    merge_base = _get_merge_base(base_ref, repository_path)
+    last_tag = tag_index.get_last_reachable_tag(merge_base)
+
+    _check_history_is_complete(
+        last_tag.commit if last_tag else None,
+        merge_base,
+        repository_path,
+        purpose="the last version tag can't be found",
+    )
+
+    commits = _CommitScan(repository_path, merge_base, tag_index.object_store)
+    action = _get_highest_action(commits, rules)
+    logger.info(
+        "Scanned the %d commits since the merge-base with %r (%s).", commits.number_of_commits, base_ref, merge_base
+    )
+
+    return {
+        "tag": last_tag.name if last_tag else None,
+        "version": str(last_tag.version if last_tag else Version(0, 0, 0)),
+        "action": action,
+        "number_of_commits": commits.number_of_commits,
+    }
+
+
+def _get_merge_base(base_ref, repository_path):
+    """Get the merge-base of the base ref and HEAD, checking that none of the commits between it and HEAD are missing
+    from the repository (which they can be in a shallow clone).
+
+    :param str base_ref: the ref the pull request is going to be merged into (e.g. "origin/main")
+    :param str repository_path: the path to the git repository
+    :raise ValueError: if HEAD has no merge-base with the base ref or commits needed are missing from a shallow clone
+    :return str: the sha of the merge-base
+    """
+    try:
+        merge_base = run_git(["merge-base", base_ref, "HEAD"], repository_path).strip()
+    except CalledProcessError as e:
+        # `git merge-base` exits with 1 if there's no merge-base (other errors, e.g. an unknown ref, exit with 128).
+        if e.returncode != 1:
+            raise
+
+        purpose = f"the merge-base of HEAD and {base_ref!r} can't be found"
+        _check_history_is_complete(None, "HEAD", repository_path, purpose)
+        _check_history_is_complete(None, base_ref, repository_path, purpose)
+        raise ValueError(f"HEAD and {base_ref!r} have no common history.") from None
+
+    _check_history_is_complete(merge_base, "HEAD", repository_path, purpose="the commits to check can't be scanned")
+    return merge_base
+
+
+def _check_history_is_complete(since, until, repository_path, purpose):
+    """Check that none of the commits between two commits are missing from the repository. Commits can only be missing
+    from shallow clones, where the history is cut off at the shallow commits (whose parents weren't fetched).
+
+    :param str|None since: the sha of the commit to check since (exclusive); if `None`, check all the ancestors
+    :param str until: the commit to check until (inclusive)
+    :param str repository_path: the path to the git repository
+    :param str purpose: what can't be done if commits are missing, to include in the error message
+    :raise ValueError: if commits are missing, saying how many are known to be missing
+    :return None:
+    """
+    try:
+        with open(
+            run_git(["rev-parse", "--path-format=absolute", "--git-path", "shallow"], repository_path).strip()
+        ) as f:
+            shallow_commits = set(f.read().split())
+    except FileNotFoundError:
+        return
+
+    commits = run_git(["rev-list", f"{since}..{until}" if since else until], repository_path).split()
+    cut_off_commits = [sha for sha in commits if sha in shallow_commits]
+
+    if not cut_off_commits:
+        return
+
+    with CAT_FILE_POOL.acquire(repository_path) as cat_file:
+        missing_commits = {parent for sha in cut_off_commits for parent in cat_file.read_commit(sha).parents}
+
+    raise ValueError(
+        f"This is a shallow clone and {purpose}: the history of {until!r} is cut off after {len(commits)} commit(s) "
+        f"and at least {len(missing_commits)} more (the parents of {', '.join(cut_off_commits)}) are missing. Fetch "
+        "more history (e.g. with `git fetch --deepen=<number of commits>` or `fetch-depth: 0` in `actions/checkout`)."
+    )
+
+
+class _CommitScan:
+    """An iterable of the messages of the commits since a commit (or in the whole history), newest-first. Commits are
+    streamed from `git log` (or read one at a time from the object store) so memory use stays flat however long the
+    history is. After iterating, the number of commits scanned is available as an attribute.
+
+    :param str repository_path: the path to the git repository
+    :param str|None since: the sha of the commit to scan since (exclusive); if `None`, scan the whole history
+    :param check_semantic_version.object_store.ObjectStore|None object_store: if given, read the commits with this instead of running `git`
+    :return None:
+    """
+
+    def __init__(self, repository_path, since=None, object_store=None):
+        self.repository_path = repository_path
+        self.since = since
+        self.object_store = object_store
+        self.number_of_commits = 0
+
+    def __iter__(self):
+        if self.object_store:
+            head = self.object_store.resolve_ref("HEAD")
+            commits = self.object_store.iter_commits(head, exclude=[self.since] if self.since else [])
+        else:
+            commits = iter_commits(f"{self.since}..HEAD" if self.since else "HEAD", self.repository_path)
+
+        for commit in commits:
+            self.number_of_commits += 1
+            yield commit.message
+
+
+def _get_highest_action(commit_messages, rules):
+    """Get the highest-precedence action of the given commit messages. Once the highest possible action has been
+    found, the remaining messages are consumed without being matched.
+
+    :param iter(str) commit_messages: the commit messages to get the action of
+    :param check_semantic_version.rules.CommitMessageRules rules: the compiled commit message actions
+    :raise ValueError: if a commit message matches a pattern with the "Fail" action
+    :return str|None: the action, or `None` if no messages match a pattern
+    """
+    action = None
+
+    for message in commit_messages:
+        if action != rules.highest_action:
+            action = _get_higher_action(action, rules.get_action(message))
+
+    return action
+
+
+def _get_higher_action(action, other_action):
+    """Get the higher-precedence of two actions, either of which may be `None`.
+
+    :param str|None action:
+    :param str|None other_action:
+    :return str|None:
+    """
+    if action is None:
+        return other_action
+
+    if other_action is None:
+        return action
+
+    return max(action, other_action, key=ACTION_PRECEDENCE.get)
+
+
+def _load_checkpoint(path, tag_index):
+    """Load the checkpoint at the given path if it's still valid.
+
+    :param str path: the path to the checkpoint file
+    :param check_semantic_version.tag_index.TagIndex tag_index: the index of the repository's current version tags
+    :return dict|None: the checkpoint, or `None` if there isn't a valid one
+    """
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        logger.warning("Ignoring unreadable checkpoint %r.", path)
+        return None
+
+    if checkpoint.get("tags_digest") != tag_index.digest:
+        logger.info("Tags have changed since the checkpoint. Scanning from the last version tag.")
+        return None
+
+    if not tag_index.is_ancestor(checkpoint["commit"], "HEAD"):
+        logger.info("History has been rewritten since the checkpoint. Scanning from the last version tag.")
+        return None
+
+    # A merge can make an existing, higher version tag reachable without changing the tags themselves.
+    last_tag = tag_index.get_last_reachable_tag("HEAD")
+
+    if (last_tag.name if last_tag else None) != checkpoint["tag"]:
+        logger.info("The last version tag has changed since the checkpoint. Scanning from the last version tag.")
+        return None
+
+    return checkpoint
+
+
+def _save_checkpoint(path, checkpoint):
+    """Save a checkpoint, ignoring failures (e.g. a read-only git directory) as checkpoints are only an optimisation.
+
+    :param str path: the path to save the checkpoint to
+    :param dict checkpoint: the checkpoint
+    :return None:
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+            json.dump(checkpoint, f)
+
+        os.replace(f.name, path)
+    except OSError as e:
+        logger.debug("Couldn't save checkpoint to %r: %s", path, e)
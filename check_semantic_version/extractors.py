@@ -0,0 +1,716 @@
+import ast
+import configparser
+import fnmatch
+import json
+import os
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # pragma: no cover - Python < 3.11
+    try:
+        import tomli as tomllib
+    except ModuleNotFoundError:
+        tomllib = None
+
+# The registered extractors by name, in the order they're tried in when matching file names.
+EXTRACTORS = {}
+
+
+def register_extractor(extractor_class):
+    """Register a version extractor class so the files matching its patterns can be used as version source files.
+    Extractors are matched against file names in the order they're registered, so extractors with more general
+    patterns must be registered after those with more specific ones.
+
+    :param type extractor_class: a subclass of `VersionExtractor`
+    :return type: the class
+    """
+    EXTRACTORS[extractor_class.name] = extractor_class()
+    return extractor_class
+
+
+def get_extractor(version_source_type):
+    """Get the extractor for a version source type, given either as the extractor's name or as the name of a version
+    source file.
+
+    :param str version_source_type: the name of the extractor or the version source file
+    :raise ValueError: if no extractor matches
+    :return VersionExtractor:
+    """
+    if version_source_type in EXTRACTORS:
+        return EXTRACTORS[version_source_type]
+
+    for extractor in EXTRACTORS.values():
+        if any(fnmatch.fnmatchcase(version_source_type, pattern) for pattern in extractor.file_patterns):
+            return extractor
+
+    raise ValueError(
+        f"Unsupported version source received: {version_source_type!r}; options are "
+        f"{get_supported_version_source_files()!r}."
+    )
+
+
+def get_supported_version_source_files():
+    """Get the patterns of the names of the files that can be used as version source files.
+
+    :return list(str):
+    """
+    return [pattern for extractor in EXTRACTORS.values() for pattern in extractor.file_patterns]
+
+
+class VersionExtractor:
+    """A reader of the current version from a type of version source file. The version is read in-process with `read`
+    and, only if that can't find it (e.g. because it's computed dynamically), with a subprocess running the command
+    from `get_fallback_command`. Subclasses give:
+
+    - `name`: the version source type, which is also the name of its `git-mkver` patch
+    - `file_patterns`: the glob patterns of the names of the files it reads
+    - `replacements`: the `find` and `replace` patterns of its `git-mkver` patch
+    - `reads_python_modules`: whether reading the version can need the Python modules near the file
+    - `example_file`: the path and contents (with a `{version}` placeholder) of an example file, e.g. for benchmarks
+
+    :return None:
+    """
+
+    name = None
+    file_patterns = ()
+    replacements = []
+    reads_python_modules = False
+    example_file = None
+    fallback_message = "The version in %r can't be read statically. Falling back to running a subprocess."
+
+    @property
+    def patch(self):
+        """The `git-mkver` patch updating the version in the version source file.
+
+        :return dict:
+        """
+        return {"name": self.name, "filePatterns": list(self.file_patterns), "replacements": self.replacements}
+
+    def read(self, path, read_paths=None):
+        """Read the version from the file in-process.
+
+        :param str path: the absolute path to the file
+        :param set(str)|None read_paths: if given, the paths of any other files the version is read from are added to it
+        :return str|None: the version, or `None` if it can't be read in-process
+        """
+        raise NotImplementedError
+
+    def get_source_paths(self, path):
+        """Get the paths of the files the version is read from: the version source file itself and any others it
+        refers to (e.g. the module a `setup.py` file imports its version from). A result depending on the version can
+        be reused until one of these files changes.
+
+        :param str path: the absolute path to the file
+        :return list(str)|None: the paths, or `None` if the version can't be read in-process, in which case it's found by running code that could read any file
+        """
+        read_paths = {path}
+
+        if self.read(path, read_paths) is None:
+            return None
+
+        return sorted(read_paths)
+
+    def get_fallback_command(self, path):
+        """Get the command to run to get the version if it can't be read in-process.
+
+        :param str path: the absolute path to the file
+        :return list(str)|None: the command, or `None` if there's no fallback
+        """
+        return None
+
+    def parse_fallback_output(self, output, path):
+        """Get the version from the output of the fallback command.
+
+        :param str output: the standard output of the command
+        :param str path: the absolute path to the file
+        :return str: the version
+        """
+        return output.strip()
+
+
+@register_extractor
+class SetupPyExtractor(VersionExtractor):
+    """Read the version from a `setup.py` file by statically analysing its `setup` call, falling back to executing
+    it.
+    """
+
+    name = "setup.py"
+    file_patterns = ("setup.py",)
+    replacements = [{"find": 'version="{VersionRegex}"', "replace": 'version="{Version}"'}]
+    example_file = ("setup.py", 'from setuptools import setup\n\nsetup(name="package", version="{version}")\n')
+    reads_python_modules = True
+    fallback_message = "The version in %r is dynamic. Falling back to executing it."
+
+    def read(self, path, read_paths=None):
+        """Read the version from a `setup.py` file without executing it by statically analysing its `setup` call.
+        Literal `version` arguments, module-level constants, and `__version__` variables imported from a local module
+        are resolved. Names are only resolved if they're bound exactly once in the module, by a top-level statement
+        before the `setup` call. `None` is returned if the version can only be found by executing code.
+
+        :param str path: the absolute path to the `setup.py` file
+        :param set(str)|None read_paths: if given, the paths of the modules the version is imported from are added to it
+        :return str|None: the version, if it could be found statically
+        """
+        tree = _parse_python_file(path)
+
+        if tree is None:
+            return None
+
+        calls = [node for node in ast.walk(tree) if isinstance(node, ast.Call) and _is_setup_function(node.func)]
+
+        # Which of several `setup` calls runs (if any) can only be known by executing the file.
+        if len(calls) != 1:
+            return None
+
+        call_index = next(index for index, statement in enumerate(tree.body) if calls[0] in ast.walk(statement))
+
+        for keyword in calls[0].keywords:
+            if keyword.arg == "version":
+                return _resolve_static_string(
+                    keyword.value,
+                    tree,
+                    path,
+                    search_directory=os.path.dirname(path),
+                    before=call_index,
+                    read_paths=read_paths,
+                )
+
+        return None
+
+    def get_fallback_command(self, path):
+        return ["python", path, "--version"]
+
+
+@register_extractor
+class PyprojectTomlExtractor(VersionExtractor):
+    """Read the static version from a `pyproject.toml` file, falling back to Poetry."""
+
+    name = "pyproject.toml"
+    file_patterns = ("pyproject.toml",)
+    replacements = [{"find": 'version = "{VersionRegex}"', "replace": 'version = "{Version}"'}]
+    example_file = ("pyproject.toml", '[tool.poetry]\nname = "package"\nversion = "{version}"\n')
+    fallback_message = "No static version found in %r. Falling back to Poetry."
+
+    def read(self, path, read_paths=None):
+        """Read the static version from a `pyproject.toml` file without running Poetry. The PEP 621
+        `[project].version` field takes precedence over `[tool.poetry].version`, matching Poetry's own behaviour.
+        `None` is returned if the version is dynamic, missing, or a TOML parser isn't available so the caller can
+        fall back to Poetry.
+
+        :param str path: the absolute path to the `pyproject.toml` file
+        :param set(str)|None read_paths: unused as no other files are read
+        :return str|None: the static version, if there is one
+        """
+        if tomllib is None:
+            return None
+
+        with open(path, "rb") as f:
+            pyproject = tomllib.load(f)
+
+        project = pyproject.get("project", {})
+
+        if "version" in project.get("dynamic", []):
+            return None
+
+        if "version" in project:
+            return str(project["version"])
+
+        version = pyproject.get("tool", {}).get("poetry", {}).get("version")
+
+        if version is None:
+            return None
+
+        return str(version)
+
+    def get_fallback_command(self, path):
+        return ["poetry", "version", "-s", f"--directory={os.path.dirname(path)}"]
+
+
+@register_extractor
+class PackageJsonExtractor(VersionExtractor):
+    """Read the top-level version from a `package.json` file."""
+
+    name = "package.json"
+    file_patterns = ("package.json",)
+    replacements = [{"find": '"version": "{VersionRegex}"', "replace": '"version": "{Version}"'}]
+    example_file = ("package.json", '{{\n  "name": "package",\n  "version": "{version}"\n}}\n')
+
+    def read(self, path, read_paths=None):
+        """Read the top-level version from a `package.json` file. Like `jq --raw-output '.["version"]'`, `"null"` is
+        returned if there's no version, non-string versions are returned as JSON, and the last version is used if the
+        key is repeated.
+
+        :param str path: the absolute path to the `package.json` file
+        :param set(str)|None read_paths: unused as no other files are read
+        :return str: the version
+        """
+        with open(path, encoding="utf8") as f:
+            version = json.load(f).get("version")
+
+        if isinstance(version, str):
+            return version
+
+        return json.dumps(version)
+
+
+@register_extractor
+class SetupCfgExtractor(VersionExtractor):
+    """Read the version from the `[metadata]` section of a `setup.cfg` file, falling back to `setuptools`."""
+
+    name = "setup.cfg"
+    file_patterns = ("setup.cfg",)
+    replacements = [{"find": "version = {VersionRegex}", "replace": "version = {Version}"}]
+    example_file = ("setup.cfg", "[metadata]\nname = package\nversion = {version}\n")
+    reads_python_modules = True
+    fallback_message = "The version in %r can't be read statically. Falling back to `setuptools`."
+
+    def read(self, path, read_paths=None):
+        """Read the version from a `setup.cfg` file. Literal versions, `attr:` versions that can be resolved
+        statically (like in `setup.py` files), and `file:` versions are supported.
+
+        :param str path: the absolute path to the `setup.cfg` file
+        :param set(str)|None read_paths: if given, the paths of the modules and files the version is read from are added to it
+        :return str|None: the version, if it could be read without executing any code
+        """
+        parser = configparser.ConfigParser(interpolation=None)
+
+        try:
+            parser.read(path, encoding="utf8")
+        except configparser.Error:
+            return None
+
+        version = parser.get("metadata", "version", fallback=None)
+
+        if version is None:
+            return None
+
+        directory = os.path.dirname(path)
+
+        if version.startswith("attr:"):
+            module, _, name = version[len("attr:") :].strip().rpartition(".")
+            module_path = _find_module_file(module, 0, path, directory)
+            return _resolve_name_in_module(name, module_path, directory, depth=0, read_paths=read_paths)
+
+        if version.startswith("file:"):
+            contents = []
+
+            for file_path in version[len("file:") :].split(","):
+                file_path = os.path.join(directory, file_path.strip())
+
+                try:
+                    with open(file_path, encoding="utf8") as f:
+                        contents.append(f.read())
+                except OSError:
+                    return None
+
+                if read_paths is not None:
+                    read_paths.add(file_path)
+
+            return "\n".join(contents).strip()
+
+        return version.strip()
+
+    def get_fallback_command(self, path):
+        return [
+            "python",
+            "-c",
+            "import sys; from setuptools.config.setupcfg import read_configuration; "
+            "print(read_configuration(sys.argv[1])['metadata']['version'])",
+            path,
+        ]
+
+
+@register_extractor
+class CargoTomlExtractor(VersionExtractor):
+    """Read the version from the `[package]` table of a Rust crate's `Cargo.toml` file, falling back to Cargo."""
+
+    name = "Cargo.toml"
+    file_patterns = ("Cargo.toml",)
+    replacements = [{"find": 'version = "{VersionRegex}"', "replace": 'version = "{Version}"'}]
+    example_file = ("Cargo.toml", '[package]\nname = "package"\nversion = "{version}"\nedition = "2021"\n')
+    fallback_message = "No static version found in %r. Falling back to Cargo."
+
+    def read(self, path, read_paths=None):
+        """Read the version from a `Cargo.toml` file, including versions inherited from the workspace with
+        `version.workspace = true`. `None` is returned if there's no version or a TOML parser isn't available.
+
+        :param str path: the absolute path to the `Cargo.toml` file
+        :param set(str)|None read_paths: if given, the path of the workspace's `Cargo.toml` file is added to it if the version is inherited from it
+        :return str|None: the version, if it could be read
+        """
+        if tomllib is None:
+            return None
+
+        with open(path, "rb") as f:
+            version = tomllib.load(f).get("package", {}).get("version")
+
+        if isinstance(version, str):
+            return version
+
+        if isinstance(version, dict) and version.get("workspace") is True:
+            return self._read_workspace_version(os.path.dirname(os.path.dirname(path)), read_paths)
+
+        return None
+
+    def get_fallback_command(self, path):
+        return ["cargo", "metadata", "--no-deps", "--format-version=1", f"--manifest-path={path}"]
+
+    def parse_fallback_output(self, output, path):
+        for package in json.loads(output)["packages"]:
+            if os.path.realpath(package["manifest_path"]) == os.path.realpath(path):
+                return package["version"]
+
+        raise ValueError(f"Cargo didn't give the version of the package in {path!r}.")
+
+    def _read_workspace_version(self, directory, read_paths=None):
+        """Read the version in the `[workspace.package]` table of the nearest workspace's `Cargo.toml` file in the
+        directory or its ancestors.
+
+        :param str directory: the directory to start looking in
+        :param set(str)|None read_paths: if given, the path of the workspace's `Cargo.toml` file is added to it
+        :return str|None: the workspace's version, if it has one
+        """
+        while True:
+            manifest_path = os.path.join(directory, "Cargo.toml")
+
+            if os.path.isfile(manifest_path):
+                with open(manifest_path, "rb") as f:
+                    workspace = tomllib.load(f).get("workspace")
+
+                if workspace is not None:
+                    if read_paths is not None:
+                        read_paths.add(manifest_path)
+
+                    return workspace.get("package", {}).get("version")
+
+            parent = os.path.dirname(directory)
+
+            if parent == directory:
+                return None
+
+            directory = parent
+
+
+@register_extractor
+class VersionFileExtractor(VersionExtractor):
+    """Read the version from a plain-text file containing only the version."""
+
+    name = "VERSION"
+    file_patterns = ("VERSION", "VERSION.txt")
+    replacements = [{"find": "{VersionRegex}", "replace": "{Version}"}]
+    example_file = ("VERSION", "{version}\n")
+
+    def read(self, path, read_paths=None):
+        """Read the first non-empty line of the file.
+
+        :param str path: the absolute path to the file
+        :param set(str)|None read_paths: unused as no other files are read
+        :return str|None: the version, or `None` if the file is empty
+        """
+        with open(path, encoding="utf8") as f:
+            for line in f:
+                if line.strip():
+                    return line.strip()
+
+        return None
+
+
+@register_extractor
+class ModuleVersionExtractor(VersionExtractor):
+    """Read the `__version__` variable of a Python module (e.g. a package's `__init__.py` or `_version.py` file) by
+    statically analysing it, falling back to importing it. As it matches any Python file, it's registered after the
+    `setup.py` extractor.
+    """
+
+    name = "__version__"
+    file_patterns = ("*.py",)
+    replacements = [{"find": '__version__ = "{VersionRegex}"', "replace": '__version__ = "{Version}"'}]
+    example_file = ("package/__init__.py", '"""A package."""\n\n__version__ = "{version}"\n')
+    reads_python_modules = True
+    fallback_message = "The `__version__` in %r is dynamic. Falling back to importing it."
+
+    def read(self, path, read_paths=None):
+        """Read the module's `__version__` variable without executing any code. Literal versions, module-level
+        constants, and versions imported from other local modules are resolved.
+
+        :param str path: the absolute path to the module
+        :param set(str)|None read_paths: if given, the paths of the modules the version is imported from are added to it
+        :return str|None: the version, if it could be found statically
+        """
+        tree = _parse_python_file(path)
+
+        if tree is None:
+            return None
+
+        search_directory, _ = self._get_import_root_and_name(path)
+        return _resolve_module_level_name("__version__", tree, path, search_directory, depth=0, read_paths=read_paths)
+
+    def get_fallback_command(self, path):
+        import_root, module_name = self._get_import_root_and_name(path)
+
+        return [
+            "python",
+            "-c",
+            "import importlib, sys; sys.path.insert(0, sys.argv[1]); "
+            "print(importlib.import_module(sys.argv[2]).__version__)",
+            import_root,
+            module_name,
+        ]
+
+    def _get_import_root_and_name(self, path):
+        """Get the directory the module's top-level package is in and the module's dotted name.
+
+        :param str path: the absolute path to the module
+        :return tuple(str, str): the directory and the name
+        """
+        directory, filename = os.path.split(path)
+        parts = [] if filename == "__init__.py" else [os.path.splitext(filename)[0]]
+
+        while os.path.isfile(os.path.join(directory, "__init__.py")):
+            directory, package = os.path.split(directory)
+            parts.insert(0, package)
+
+        return directory, ".".join(parts)
+
+
+def _parse_python_file(path):
+    """Parse a Python file into an abstract syntax tree.
+
+    :param str path: the path to the Python file
+    :return ast.Module|None: the syntax tree, or `None` if the file doesn't exist or isn't valid Python
+    """
+    try:
+        with open(path, "rb") as f:
+            return ast.parse(f.read(), filename=path)
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+
+def _is_setup_function(node):
+    """Check if the function called in a call expression is `setup` or `setuptools.setup`.
+
+    :param ast.AST node: the expression being called
+    :return bool:
+    """
+    if isinstance(node, ast.Name):
+        return node.id == "setup"
+
+    return (
+        isinstance(node, ast.Attribute)
+        and node.attr == "setup"
+        and isinstance(node.value, ast.Name)
+        and node.value.id == "setuptools"
+    )
+
+
+def _resolve_static_string(node, tree, path, search_directory, depth=0, before=None, read_paths=None):
+    """Resolve an expression to a string without executing any code. String literals, names bound at module level
+    (including by importing them from a local module), and attributes of imported local modules are supported.
+
+    :param ast.AST node: the expression to resolve
+    :param ast.Module tree: the syntax tree of the module the expression is in
+    :param str path: the path of the module the expression is in
+    :param str search_directory: the directory to look for imported top-level modules in
+    :param int depth: the number of imports followed so far
+    :param int|None before: if given, the index of the top-level statement the expression is in; names must be bound
+        before it
+    :param set(str)|None read_paths: if given, the paths of the modules read are added to it
+    :return str|None: the string, or `None` if it can't be resolved statically
+    """
+    if depth > 5:
+        return None
+
+    if isinstance(node, ast.Constant):
+        return node.value if isinstance(node.value, str) else None
+
+    if isinstance(node, ast.Name):
+        return _resolve_module_level_name(
+            node.id, tree, path, search_directory, depth, before=before, read_paths=read_paths
+        )
+
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+        index = _find_single_binding(node.value.id, tree, before)
+
+        if index is None or not isinstance(tree.body[index], ast.Import):
+            return None
+
+        for alias in tree.body[index].names:
+            if alias.asname == node.value.id or (not alias.asname and alias.name == node.value.id):
+                module_path = _find_module_file(alias.name, 0, path, search_directory)
+                return _resolve_name_in_module(node.attr, module_path, search_directory, depth, read_paths)
+
+    return None
+
+
+def _resolve_module_level_name(name, tree, path, search_directory, depth, before=None, read_paths=None):
+    """Resolve a name to a string using the module-level statement that binds it. The name is only resolved if it's
+    bound exactly once in the module's scope, by a top-level assignment or import, as otherwise its value depends on
+    which code runs.
+
+    :param str name: the name to resolve
+    :param ast.Module tree: the syntax tree of the module
+    :param str path: the path of the module
+    :param str search_directory: the directory to look for imported top-level modules in
+    :param int depth: the number of imports followed so far
+    :param int|None before: if given, the index of the top-level statement the name is used in; the name must be bound
+        before it
+    :param set(str)|None read_paths: if given, the paths of the modules read are added to it
+    :return str|None: the string, or `None` if it can't be resolved statically
+    """
+    index = _find_single_binding(name, tree, before)
+
+    if index is None:
+        return None
+
+    statement = tree.body[index]
+
+    if isinstance(statement, ast.Assign):
+        if any(isinstance(target, ast.Name) and target.id == name for target in statement.targets):
+            return _resolve_static_string(
+                statement.value, tree, path, search_directory, depth, before=index, read_paths=read_paths
+            )
+
+    elif isinstance(statement, ast.AnnAssign):
+        if isinstance(statement.target, ast.Name) and statement.value:
+            return _resolve_static_string(
+                statement.value, tree, path, search_directory, depth, before=index, read_paths=read_paths
+            )
+
+    elif isinstance(statement, ast.ImportFrom):
+        for alias in statement.names:
+            if (alias.asname or alias.name) == name:
+                module_path = _find_module_file(statement.module, statement.level, path, search_directory)
+                return _resolve_name_in_module(alias.name, module_path, search_directory, depth, read_paths)
+
+    return None
+
+
+def _find_single_binding(name, tree, before=None):
+    """Find the top-level statement binding a name in a module, if it's the only place the name is bound in the
+    module's scope. Assignments (including augmented ones and in compound statements), deletions, imports (including
+    star imports), definitions, and `global` declarations in nested scopes all count as bindings.
+
+    :param str name: the name
+    :param ast.Module tree: the syntax tree of the module
+    :param int|None before: if given, the index of the top-level statement the binding must come before
+    :return int|None: the index of the binding statement in the module's body, or `None` if there isn't exactly one
+        binding or it isn't a top-level statement before the given one
+    """
+    if any(isinstance(node, ast.Global) and name in node.names for node in ast.walk(tree)):
+        return None
+
+    binding_indices = []
+
+    for index, statement in enumerate(tree.body):
+        for node in _walk_scope(statement):
+            if name in _get_bound_names(node) or "*" in _get_bound_names(node):
+                binding_indices.append(index)
+
+    if len(binding_indices) != 1:
+        return None
+
+    index = binding_indices[0]
+
+    if before is not None and index >= before:
+        return None
+
+    if not isinstance(tree.body[index], (ast.Assign, ast.AnnAssign, ast.Import, ast.ImportFrom)):
+        return None
+
+    return index
+
+
+def _walk_scope(node):
+    """Walk a syntax tree without entering the bodies of functions, lambdas, and classes, which have their own scopes.
+
+    :param ast.AST node: the node to start from
+    :return iter(ast.AST): the node and its descendants in the same scope
+    """
+    yield node
+
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+        return
+
+    for child in ast.iter_child_nodes(node):
+        yield from _walk_scope(child)
+
+
+def _get_bound_names(node):
+    """Get the names a syntax tree node binds in the scope it's in.
+
+    :param ast.AST node: the node
+    :return set(str): the names ("*" for a star import)
+    """
+    if isinstance(node, ast.Name):
+        return set() if isinstance(node.ctx, ast.Load) else {node.id}
+
+    if isinstance(node, ast.alias):
+        return {node.asname or node.name.split(".")[0]}
+
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return {node.name}
+
+    if isinstance(node, (ast.ExceptHandler, ast.MatchAs, ast.MatchStar)):
+        return {node.name} if node.name else set()
+
+    if isinstance(node, ast.MatchMapping):
+        return {node.rest} if node.rest else set()
+
+    return set()
+
+
+def _resolve_name_in_module(name, module_path, search_directory, depth, read_paths=None):
+    """Resolve a module-level name in another module to a string.
+
+    :param str name: the name to resolve
+    :param str|None module_path: the path of the module
+    :param str search_directory: the directory to look for imported top-level modules in
+    :param int depth: the number of imports followed so far
+    :param set(str)|None read_paths: if given, the paths of the modules read are added to it
+    :return str|None: the string, or `None` if it can't be resolved statically
+    """
+    if module_path is None:
+        return None
+
+    tree = _parse_python_file(module_path)
+
+    if tree is None:
+        return None
+
+    if read_paths is not None:
+        read_paths.add(module_path)
+
+    return _resolve_module_level_name(name, tree, module_path, search_directory, depth + 1, read_paths=read_paths)
+
+
+def _find_module_file(module, level, importing_path, search_directory):
+    """Find the file of a local module. Absolute imports are looked for in the search directory and its `src`
+    directory; relative imports are looked for relative to the importing module.
+
+    :param str|None module: the dotted name of the module (`None` for e.g. `from . import x`)
+    :param int level: the number of leading dots in a relative import
+    :param str importing_path: the path of the module doing the importing
+    :param str search_directory: the directory to look for top-level modules in
+    :return str|None: the path of the module's file, if it could be found
+    """
+    parts = module.split(".") if module else []
+
+    if level:
+        base_directory = os.path.dirname(importing_path)
+
+        for _ in range(level - 1):
+            base_directory = os.path.dirname(base_directory)
+
+        base_directories = [base_directory]
+    else:
+        base_directories = [search_directory, os.path.join(search_directory, "src")]
+
+    for base_directory in base_directories:
+        for candidate in (
+            os.path.join(base_directory, *parts) + ".py" if parts else None,
+            os.path.join(base_directory, *parts, "__init__.py"),
+        ):
+            if candidate and os.path.isfile(candidate):
+                return candidate
+
+    return None
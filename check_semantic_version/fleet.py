@@ -0,0 +1,219 @@
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import contextlib
+import io
+import json
+import logging
+import os
+import re
+import shlex
+import time
+from typing import NamedTuple
+
+from check_semantic_version.cat_file import CAT_FILE_POOL
+from check_semantic_version.check_semantic_version import check_versions_match
+
+logger = logging.getLogger(__name__)
+
+FLEET_REPORT_FORMATS = ("text", "json")
+
+ANSI_ESCAPE_SEQUENCE_PATTERN = re.compile(r"\033\[[0-9;]*m")
+
+
+class Repository(NamedTuple):
+    """A repository to check and the package specifications (see `parse_package_specification`) of its version source
+    files, relative to the repository.
+    """
+
+    path: str
+    version_sources: tuple
+
+
+class RepositoryResult(NamedTuple):
+    """The result of checking a repository. `passed` is `None` if the check couldn't be completed (see `error`)."""
+
+    path: str
+    passed: bool
+    duration: float
+    output: str
+    error: str = None
+
+
+def read_fleet_manifest(path):
+    """Read a fleet manifest. Each line gives the path to a repository followed by one or more package specifications
+    (e.g. `setup.py` or `'packages/*/package.json,tag_prefix=web-v'`) separated by whitespace, which can be quoted as in
+    a shell. Relative repository paths are relative to the manifest's directory. Blank lines and lines starting with
+    `#` are ignored.
+
+    :param str path: the path to the manifest
+    :raise ValueError: if a line doesn't give any package specifications
+    :return list(Repository): the repositories
+    """
+    repositories = []
+
+    with open(path) as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+
+            repository_path, *version_sources = shlex.split(line)
+
+            if not version_sources:
+                raise ValueError(
+                    f"Line {line_number} of the fleet manifest {path!r} doesn't give any version source files for "
+                    f"{repository_path!r}."
+                )
+
+            repositories.append(
+                Repository(
+                    path=os.path.join(os.path.dirname(os.path.abspath(path)), repository_path),
+                    version_sources=tuple(version_sources),
+                )
+            )
+
+    return repositories
+
+
+def check_fleet(repositories, breaking_change_indicated_by="major", max_workers=None):
+    """Check the versions of many repositories in parallel across a pool of processes. Each repository is checked in
+    its own directory without changing the working directory, and anything going wrong while checking it (including
+    its worker process dying) only fails that repository. A worker process dying breaks the whole pool, so the
+    repositories whose checks were lost are rechecked, each in its own process, to isolate the one responsible.
+
+    :param list(Repository) repositories: the repositories to check
+    :param str breaking_change_indicated_by: the default number in the semantic version that a breaking change should increment if a package specification doesn't give one
+    :param int|None max_workers: the maximum number of worker processes; if `None`, the number of CPUs is used
+    :return list(RepositoryResult): the results in the same order as the repositories
+    """
+    results = _check_repositories_in_pool(repositories, breaking_change_indicated_by, max_workers)
+    lost_indexes = [index for index, result in enumerate(results) if result is None]
+
+    if lost_indexes:
+        logger.warning("A worker process died. Rechecking %d repositories in their own processes.", len(lost_indexes))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            rechecked_results = executor.map(
+                lambda index: _check_repositories_in_pool([repositories[index]], breaking_change_indicated_by, 1)[0],
+                lost_indexes,
+            )
+
+        for index, result in zip(lost_indexes, rechecked_results):
+            results[index] = result or RepositoryResult(
+                path=repositories[index].path,
+                passed=None,
+                duration=0.0,
+                output="",
+                error="The process checking the repository died.",
+            )
+
+    return results
+
+
+def write_fleet_report(results, f, output_format="text"):
+    """Write an aggregated report of the results of checking many repositories, either as text with a line for each
+    repository and a summary or as a JSON object with a list of the results and a summary.
+
+    :param list(RepositoryResult) results: the results
+    :param io.TextIOBase f: the file to write the report to
+    :param str output_format: one of "text" or "json"
+    :raise ValueError: if the output format isn't supported
+    :return dict: the summary of the results
+    """
+    if output_format not in FLEET_REPORT_FORMATS:
+        raise ValueError(f"Unsupported fleet report format {output_format!r}; options are {FLEET_REPORT_FORMATS!r}.")
+
+    summary = {
+        "repositories": len(results),
+        "passed": sum(result.passed is True for result in results),
+        "failed": sum(result.passed is False for result in results),
+        "errored": sum(result.passed is None for result in results),
+        "total_duration": sum(result.duration for result in results),
+    }
+
+    if output_format == "json":
+        json.dump({"results": [result._asdict() for result in results], "summary": summary}, f, indent=2)
+        f.write("\n")
+        return summary
+
+    for result in sorted(results, key=lambda result: result.duration, reverse=True):
+        status = {True: "PASSED", False: "FAILED", None: "ERROR"}[result.passed]
+        lines = result.output.strip().splitlines()
+        f.write(f"{status} {result.path} ({result.duration:.2f}s): {result.error or (lines[-1] if lines else '')}\n")
+
+    f.write(
+        f"{summary['passed']} passed, {summary['failed']} failed, and {summary['errored']} errored of "
+        f"{summary['repositories']} repositories ({summary['total_duration']:.2f}s of checks).\n"
+    )
+
+    return summary
+
+
+def _check_repositories_in_pool(repositories, breaking_change_indicated_by, max_workers):
+    """Check repositories in a pool of processes.
+
+    :param list(Repository) repositories: the repositories to check
+    :param str breaking_change_indicated_by: the default number in the semantic version that a breaking change should increment
+    :param int|None max_workers: the maximum number of worker processes
+    :return list(RepositoryResult|None): the results in the same order as the repositories; `None` for repositories whose checks were lost because a worker process died
+    """
+    results = [None] * len(repositories)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=_initialise_worker) as executor:
+        futures = {
+            executor.submit(_check_repository, repository, breaking_change_indicated_by): index
+            for index, repository in enumerate(repositories)
+        }
+
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except BrokenProcessPool:
+                # The result is left as `None` so the repository is rechecked on its own.
+                pass
+
+    return results
+
+
+def _initialise_worker():
+    """Only log warnings and errors in worker processes so the output of many checks isn't interleaved.
+
+    :return None:
+    """
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+def _check_repository(repository, breaking_change_indicated_by):
+    """Check a repository's version source files, capturing the check's output and any error raised. The `git cat-file`
+    processes started for the repository are shut down afterwards so a worker process checking many repositories
+    doesn't accumulate them.
+
+    :param Repository repository: the repository to check
+    :param str breaking_change_indicated_by: the default number in the semantic version that a breaking change should increment
+    :return RepositoryResult: the result
+    """
+    start_time = time.perf_counter()
+    output = io.StringIO()
+    error = None
+
+    try:
+        with contextlib.redirect_stdout(output):
+            passed = check_versions_match(
+                list(repository.version_sources),
+                breaking_change_indicated_by,
+                repository_path=repository.path,
+            )
+
+    except Exception as e:
+        passed = None
+        error = f"{type(e).__name__}: {e}"
+
+    finally:
+        CAT_FILE_POOL.close()
+
+    return RepositoryResult(
+        path=repository.path,
+        passed=passed,
+        duration=time.perf_counter() - start_time,
+        output=ANSI_ESCAPE_SEQUENCE_PATTERN.sub("", output.getvalue()),
+        error=error,
+    )
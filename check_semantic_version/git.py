@@ -0,0 +1,191 @@
+import subprocess
+from typing import NamedTuple
+
+from check_semantic_version.exceptions import CalledProcessError
+from check_semantic_version.timings import span
+
+READ_SIZE = 64 * 1024
+
+
+class Commit(NamedTuple):
+    """A commit read from `git log`."""
+
+    sha: str
+    tags: tuple
+    message: str
+    files: tuple = ()
+    parents: tuple = ()
+
+
+def run_git(arguments, repository_path=".", decode=True):
+    """Run a git command in the repository and return its output.
+
+    :param list(str) arguments: the arguments to pass to `git`
+    :param str repository_path: the path to the git repository
+    :param bool decode: if `False`, return the output as bytes (e.g. for archives)
+    :raise check_semantic_version.exceptions.CalledProcessError: if the command fails
+    :return str|bytes: the command's standard output
+    """
+    command = ["git", *arguments]
+
+    try:
+        with span("subprocess", command=command):
+            process = subprocess.run(command, cwd=repository_path, capture_output=True, check=True)
+    except subprocess.CalledProcessError as e:
+        raise CalledProcessError(returncode=e.returncode, cmd=e.cmd, output=e.output, stderr=e.stderr) from None
+
+    if not decode:
+        return process.stdout
+
+    return process.stdout.decode("utf8")
+
+
+def iter_git_records(arguments, repository_path="."):
+    """Run a git command that writes null-terminated records and yield the records as they're written. Only one read's
+    worth of output is held in memory at a time. If the generator is closed before the command finishes (e.g. by
+    breaking out of a loop over it), the command is terminated.
+
+    :param list(str) arguments: the arguments to pass to `git`
+    :param str repository_path: the path to the git repository
+    :raise check_semantic_version.exceptions.CalledProcessError: if the command fails
+    :return iter(bytes): the records without their terminating null characters
+    """
+    command = ["git", *arguments]
+
+    # The span covers the whole time the output is being streamed and processed.
+    with span("subprocess", command=command):
+        yield from _iter_records(command, repository_path)
+
+
+def _iter_records(command, repository_path):
+    """Run a command that writes null-terminated records and yield the records as they're written (see
+    `iter_git_records`).
+
+    :param list(str) command: the command
+    :param str repository_path: the directory to run the command in
+    :raise check_semantic_version.exceptions.CalledProcessError: if the command fails
+    :return iter(bytes): the records without their terminating null characters
+    """
+    process = subprocess.Popen(command, cwd=repository_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    finished = False
+
+    try:
+        remainder = b""
+
+        while chunk := process.stdout.read1(READ_SIZE):
+            records = (remainder + chunk).split(b"\0")
+            remainder = records.pop()
+            yield from records
+
+        if remainder:
+            yield remainder
+
+        finished = True
+
+    finally:
+        if not finished:
+            process.kill()
+
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        returncode = process.wait()
+
+    if returncode:
+        raise CalledProcessError(returncode=returncode, cmd=command, stderr=stderr)
+
+
+def iter_commits(revision_range="HEAD", repository_path=".", include_files=False):
+    """Yield the commits in the revision range newest-first, streaming them from `git log` so memory use doesn't grow
+    with the size of the history. Only tags are included in each commit's decorations.
+
+    :param str revision_range: a revision range understood by `git log` (e.g. "1.0.0..HEAD")
+    :param str repository_path: the path to the git repository
+    :param bool include_files: if `True`, include the paths (relative to the repository root) of the files each commit changed compared to its parent; merge commits have no files
+    :raise check_semantic_version.exceptions.CalledProcessError: if `git log` fails
+    :return iter(Commit):
+    """
+    if not include_files:
+        arguments = ["log", "-z", "--decorate-refs=refs/tags/", "--format=%H%x1f%D%x1f%B", revision_range]
+
+        for record in iter_git_records(arguments, repository_path):
+            sha, decorations, message = record.decode("utf8").split("\x1f", 2)
+            yield Commit(sha=sha, tags=_parse_tag_decorations(decorations), message=message)
+
+        return
+
+    # The changed files are written as separate null-terminated records after each commit's record, so each commit
+    # record is marked with a record separator character to tell them apart.
+    arguments = [
+        "log",
+        "-z",
+        "--decorate-refs=refs/tags/",
+        "--name-only",
+        "--no-renames",
+        "--format=%x1e%H%x1f%D%x1f%B",
+        revision_range,
+    ]
+
+    commit = None
+    files = []
+
+    for record in iter_git_records(arguments, repository_path):
+        if record.startswith(b"\x1e"):
+            if commit:
+                yield commit._replace(files=tuple(files))
+
+            sha, decorations, message = record[1:].decode("utf8").split("\x1f", 2)
+            commit = Commit(sha=sha, tags=_parse_tag_decorations(decorations), message=message)
+            files = []
+
+        elif record:
+            files.append(record.decode("utf8").lstrip("\n"))
+
+    if commit:
+        yield commit._replace(files=tuple(files))
+
+
+def iter_commits_oldest_first(revision="HEAD", repository_path="."):
+    """Yield the commits reachable from the revision with their parents, oldest first in topological order (so every
+    commit comes after all its parents). Only tags are included in each commit's decorations.
+
+    :param str revision: the revision to yield the history of
+    :param str repository_path: the path to the git repository
+    :raise check_semantic_version.exceptions.CalledProcessError: if `git log` fails
+    :return iter(Commit):
+    """
+    arguments = [
+        "log",
+        "-z",
+        "--topo-order",
+        "--reverse",
+        "--decorate-refs=refs/tags/",
+        "--format=%H%x1f%P%x1f%D%x1f%B",
+        revision,
+    ]
+
+    for record in iter_git_records(arguments, repository_path):
+        sha, parents, decorations, message = record.decode("utf8").split("\x1f", 3)
+
+        yield Commit(
+            sha=sha,
+            tags=_parse_tag_decorations(decorations),
+            message=message,
+            parents=tuple(parents.split()),
+        )
+
+
+def _parse_tag_decorations(decorations):
+    """Parse the tag names out of a `git log` `%D` decoration string (e.g. "tag: 1.0.0, tag: latest").
+
+    :param str decorations: the decoration string
+    :return tuple(str): the tag names
+    """
+    if not decorations:
+        return ()
+
+    return tuple(
+        decoration.strip()[len("tag: ") :]
+        for decoration in decorations.split(",")
+        if decoration.strip().startswith("tag: ")
+    )
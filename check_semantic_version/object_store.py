@@ -0,0 +1,762 @@
+import collections
+import glob
+import heapq
+import mmap
+import os
+import re
+import struct
+import zlib
+
+from check_semantic_version.cat_file import GitObject, parse_commit, parse_tag
+
+# The environment variable that selects how git repositories are read: "git" (run the `git` binary) or "python" (read
+# the repository's files directly with `ObjectStore`, without starting any processes).
+GIT_BACKEND_ENVIRONMENT_VARIABLE = "CHECK_SEMANTIC_VERSION_GIT_BACKEND"
+GIT_BACKENDS = ("git", "python")
+
+PACK_OBJECT_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+OFS_DELTA = 6
+REF_DELTA = 7
+
+# The number of recently-read packed objects kept in memory so that the bases of delta chains aren't re-read.
+DELTA_BASE_CACHE_SIZE = 256
+
+SHA_PATTERN = re.compile(r"[0-9a-f]{40}")
+
+
+def get_git_backend(backend=None):
+    """Get the git backend to use.
+
+    :param str|None backend: the backend to use; if `None`, it's taken from the `CHECK_SEMANTIC_VERSION_GIT_BACKEND` environment variable, defaulting to "git"
+    :raise ValueError: if the backend isn't one of "git" or "python"
+    :return str:
+    """
+    backend = backend or os.environ.get(GIT_BACKEND_ENVIRONMENT_VARIABLE) or "git"
+
+    if backend not in GIT_BACKENDS:
+        raise ValueError(f"Unknown git backend {backend!r}; options are {GIT_BACKENDS!r}.")
+
+    return backend
+
+
+def find_git_directories(repository_path="."):
+    """Find the git directory and the common git directory (which differ for linked worktrees) of the repository
+    containing the path, without running `git`.
+
+    :param str repository_path: a path inside the repository
+    :raise FileNotFoundError: if the path isn't inside a git repository
+    :return (str, str): the absolute paths of the git directory and the common git directory
+    """
+    directory = os.path.abspath(repository_path)
+
+    while True:
+        dot_git = os.path.join(directory, ".git")
+
+        if os.path.isdir(dot_git):
+            git_directory = dot_git
+            break
+
+        if os.path.isfile(dot_git):
+            with open(dot_git) as f:
+                git_directory = os.path.join(directory, f.read().strip().removeprefix("gitdir: "))
+            break
+
+        # Bare repositories have no `.git` directory.
+        if os.path.isfile(os.path.join(directory, "HEAD")) and os.path.isdir(os.path.join(directory, "objects")):
+            git_directory = directory
+            break
+
+        parent = os.path.dirname(directory)
+
+        if parent == directory:
+            raise FileNotFoundError(f"{repository_path!r} isn't inside a git repository.")
+
+        directory = parent
+
+    git_directory = os.path.normpath(git_directory)
+    common_directory = git_directory
+
+    if os.path.isfile(os.path.join(git_directory, "commondir")):
+        with open(os.path.join(git_directory, "commondir")) as f:
+            common_directory = os.path.normpath(os.path.join(git_directory, f.read().strip()))
+
+    return git_directory, common_directory
+
+
+class ObjectStore:
+    """A reader for a git repository's objects and refs that reads its files directly (loose objects, memory-mapped
+    pack files, and `packed-refs`) instead of running `git`. It has the same object-reading interface as
+    `check_semantic_version.cat_file.CatFile`, but objects can only be named by their full sha or by a ref name. As in
+    `git`, the commits at the boundary of a shallow clone are treated as having no parents when walking history.
+    Repositories using SHA-256 object names or the reftable ref storage format aren't supported.
+
+    :param str repository_path: a path inside the git repository
+    :raise ValueError: if the repository uses an unsupported format
+    :return None:
+    """
+
+    def __init__(self, repository_path="."):
+        self.git_directory, self.common_directory = find_git_directories(repository_path)
+
+        if os.path.exists(os.path.join(self.common_directory, "reftable")):
+            raise ValueError("Repositories using the reftable ref storage format aren't supported.")
+
+        self._check_object_format()
+        self._object_directories = self._find_object_directories()
+        self._packs = {}
+        self._delta_base_cache = collections.OrderedDict()
+        self._load_packs()
+        self.shallow_commits = self._read_shallow_commits()
+
+    def read(self, object_name):
+        """Read a single object.
+
+        :param str object_name: the full sha of the object or the name of a ref pointing to it (e.g. "HEAD", "refs/tags/1.0.0", or "1.0.0")
+        :return check_semantic_version.cat_file.GitObject|None: the object, or `None` if it doesn't exist
+        """
+        sha = object_name if SHA_PATTERN.fullmatch(object_name) else self.resolve_ref(object_name)
+
+        if sha is None:
+            return None
+
+        result = self._read_loose_object(sha) or self._read_packed_object(sha)
+
+        # Objects might have been packed (e.g. by `git gc`) since the packs were loaded.
+        if result is None:
+            self._load_packs()
+            result = self._read_loose_object(sha) or self._read_packed_object(sha)
+
+        if result is None:
+            return None
+
+        object_type, content = result
+        return GitObject(sha=sha, type=object_type, size=len(content), content=content)
+
+    def read_many(self, object_names):
+        """Read objects in the same order as their names.
+
+        :param iter(str) object_names: the names of the objects
+        :return iter(check_semantic_version.cat_file.GitObject|None): the objects, with `None` for any that don't exist
+        """
+        for object_name in object_names:
+            yield self.read(object_name)
+
+    def read_commit(self, object_name):
+        """Read and parse a commit.
+
+        :param str object_name: the full sha of the commit or the name of a ref pointing to it
+        :raise ValueError: if the object doesn't exist or isn't a commit
+        :return check_semantic_version.cat_file.CommitObject:
+        """
+        git_object = self.read(object_name)
+
+        if git_object is None or git_object.type != "commit":
+            raise ValueError(f"{object_name!r} isn't a commit.")
+
+        return parse_commit(git_object.sha, git_object.content)
+
+    def read_tag(self, object_name):
+        """Read and parse an annotated tag.
+
+        :param str object_name: the full sha of the tag object or the name of a ref pointing to it
+        :raise ValueError: if the object doesn't exist or isn't an annotated tag
+        :return check_semantic_version.cat_file.TagObject:
+        """
+        git_object = self.read(object_name)
+
+        if git_object is None or git_object.type != "tag":
+            raise ValueError(f"{object_name!r} isn't an annotated tag.")
+
+        return parse_tag(git_object.sha, git_object.content)
+
+    def read_parents(self, sha):
+        """Read the parents of a commit, treating the commits at the boundary of a shallow clone as having none.
+
+        :param str sha: the sha of the commit
+        :raise ValueError: if the object doesn't exist or isn't a commit
+        :return tuple(str): the shas of the parents
+        """
+        if sha in self.shallow_commits:
+            return ()
+
+        return self.read_commit(sha).parents
+
+    def resolve_ref(self, name):
+        """Resolve a ref name to the sha it points to, following symbolic refs. Short names are looked up in the same
+        order as `git rev-parse` does (e.g. "1.0.0" is looked for as "refs/1.0.0", "refs/tags/1.0.0", "refs/heads/1.0.0"
+        and so on).
+
+        :param str name: the ref name (e.g. "HEAD", "refs/heads/main", or "main")
+        :return str|None: the sha, or `None` if the ref doesn't exist
+        """
+        if name == "HEAD" or name.startswith("refs/"):
+            candidates = [name]
+        else:
+            candidates = [
+                f"refs/{name}",
+                f"refs/tags/{name}",
+                f"refs/heads/{name}",
+                f"refs/remotes/{name}",
+                f"refs/remotes/{name}/HEAD",
+            ]
+
+        packed_refs = None
+
+        for candidate in candidates:
+            for _ in range(10):
+                value = self._read_loose_ref(candidate)
+
+                if value is None:
+                    if packed_refs is None:
+                        packed_refs = self._read_packed_refs()
+
+                    value = packed_refs.get(candidate, (None,))[0]
+
+                if value is None or not value.startswith("ref: "):
+                    break
+
+                candidate = value[len("ref: ") :]
+
+            if value is not None:
+                return value
+
+        return None
+
+    def iter_refs(self, prefix="refs/"):
+        """Yield the refs with the given prefix sorted by name, along with the objects annotated tags point to (like
+        `git for-each-ref --format="%(refname) %(objectname) %(*objectname)"`).
+
+        :param str prefix: the prefix of the ref names
+        :return iter(tuple(str, str, str|None)): the name of each ref, the sha it points to, and the sha of the object it points to if it's an annotated tag (or `None` otherwise)
+        """
+        refs = {
+            name: (sha, peeled) for name, (sha, peeled) in self._read_packed_refs().items() if name.startswith(prefix)
+        }
+
+        loose_refs_directory = os.path.join(self.common_directory, *prefix.rstrip("/").split("/"))
+
+        for directory, _, filenames in os.walk(loose_refs_directory):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.common_directory).replace(os.sep, "/")
+
+                if filename.endswith(".lock") or not name.startswith(prefix):
+                    continue
+
+                value = self._read_loose_ref(name)
+
+                # Loose refs take precedence over packed ones, whose peeled values then no longer apply.
+                if value and not value.startswith("ref: "):
+                    refs[name] = (value, _UNKNOWN)
+
+        for name in sorted(refs):
+            sha, peeled = refs[name]
+
+            # `packed-refs` gives the fully peeled object, which is only the object the tag points to if the tag doesn't
+            # point to another tag, so the tag object is read to find out.
+            if peeled is not None:
+                git_object = self.read(sha)
+                peeled = parse_tag(sha, git_object.content).object if git_object and git_object.type == "tag" else None
+
+            yield name, sha, peeled
+
+    def iter_commits(self, include, exclude=()):
+        """Yield the commits reachable from the included commits but not from the excluded ones, newest first (by
+        committer date), like `git rev-list <include> ^<exclude>`. As with `git`, the walk stops once every commit left
+        to visit is reachable from an excluded commit.
+
+        :param str include: the sha of the commit to start from
+        :param iter(str) exclude: the shas of the commits whose ancestors to exclude
+        :return iter(check_semantic_version.cat_file.CommitObject):
+        """
+        uninteresting = set()
+        seen = set()
+        queue = []
+        counter = 0
+
+        for sha, is_uninteresting in [(include, False), *((sha, True) for sha in exclude)]:
+            if sha in seen:
+                if is_uninteresting:
+                    uninteresting.add(sha)
+                continue
+
+            seen.add(sha)
+
+            if is_uninteresting:
+                uninteresting.add(sha)
+
+            commit = self.read_commit(sha)
+            heapq.heappush(queue, (-commit.committer_timestamp, counter, commit))
+            counter += 1
+
+        while queue and any(commit.sha not in uninteresting for _, _, commit in queue):
+            _, _, commit = heapq.heappop(queue)
+            is_uninteresting = commit.sha in uninteresting
+
+            for parent in () if commit.sha in self.shallow_commits else commit.parents:
+                if is_uninteresting:
+                    uninteresting.add(parent)
+
+                if parent not in seen:
+                    seen.add(parent)
+                    parent_commit = self.read_commit(parent)
+                    heapq.heappush(queue, (-parent_commit.committer_timestamp, counter, parent_commit))
+                    counter += 1
+
+            if not is_uninteresting:
+                yield commit
+
+    def is_ancestor(self, ancestor, descendant):
+        """Check if a commit is an ancestor of (or is) another commit.
+
+        :param str ancestor: the sha of the possible ancestor
+        :param str descendant: the sha of the possible descendant
+        :return bool:
+        """
+        stack = [descendant]
+        seen = {descendant}
+
+        while stack:
+            sha = stack.pop()
+
+            if sha == ancestor:
+                return True
+
+            for parent in self.read_parents(sha):
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+
+        return False
+
+    def close(self):
+        """Unmap the pack files.
+
+        :return None:
+        """
+        for pack in self._packs.values():
+            pack.close()
+
+        self._packs = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _check_object_format(self):
+        """Check the repository uses SHA-1 object names.
+
+        :raise ValueError: if the repository uses another object format
+        :return None:
+        """
+        try:
+            with open(os.path.join(self.common_directory, "config")) as f:
+                config = f.read()
+        except FileNotFoundError:
+            return
+
+        match = re.search(r"^\s*objectformat\s*=\s*(\S+)", config, re.IGNORECASE | re.MULTILINE)
+
+        if match and match.group(1).lower() != "sha1":
+            raise ValueError(f"Repositories using the {match.group(1)!r} object format aren't supported.")
+
+    def _read_shallow_commits(self):
+        """Read the shas of the commits at the boundary of a shallow clone, whose parents are missing.
+
+        :return set(str): the shas (empty if the repository isn't a shallow clone)
+        """
+        try:
+            with open(os.path.join(self.common_directory, "shallow")) as f:
+                return set(f.read().split())
+        except FileNotFoundError:
+            return set()
+
+    def _find_object_directories(self):
+        """Find the repository's object directory and any alternate object directories it borrows objects from.
+
+        :return list(str):
+        """
+        object_directories = [os.path.join(self.common_directory, "objects")]
+
+        for object_directory in object_directories:
+            try:
+                with open(os.path.join(object_directory, "info", "alternates")) as f:
+                    alternates = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+            except FileNotFoundError:
+                continue
+
+            for alternate in alternates:
+                alternate = os.path.normpath(os.path.join(object_directory, alternate))
+
+                if alternate not in object_directories:
+                    object_directories.append(alternate)
+
+        return object_directories
+
+    def _load_packs(self):
+        """Open any pack files that haven't been opened yet.
+
+        :return None:
+        """
+        for object_directory in self._object_directories:
+            for index_path in sorted(glob.glob(os.path.join(object_directory, "pack", "*.idx"))):
+                pack_path = index_path[: -len(".idx")] + ".pack"
+
+                if index_path not in self._packs and os.path.exists(pack_path):
+                    self._packs[index_path] = _Pack(index_path, pack_path)
+
+    def _read_loose_object(self, sha):
+        """Read a loose object.
+
+        :param str sha: the sha of the object
+        :return (str, bytes)|None: the object's type and content, or `None` if there's no loose object with the sha
+        """
+        for object_directory in self._object_directories:
+            try:
+                with open(os.path.join(object_directory, sha[:2], sha[2:]), "rb") as f:
+                    data = zlib.decompress(f.read())
+            except FileNotFoundError:
+                continue
+
+            header, _, content = data.partition(b"\0")
+            object_type, size = header.decode("ascii").split(" ")
+
+            if int(size) != len(content):
+                raise ValueError(f"Loose object {sha} is corrupt.")
+
+            return object_type, content
+
+        return None
+
+    def _read_packed_object(self, sha):
+        """Read an object from whichever pack contains it.
+
+        :param str sha: the sha of the object
+        :return (str, bytes)|None: the object's type and content, or `None` if no pack contains it
+        """
+        binary_sha = bytes.fromhex(sha)
+
+        for pack in self._packs.values():
+            offset = pack.find_offset(binary_sha)
+
+            if offset is not None:
+                return self._read_pack_entry(pack, offset)
+
+        return None
+
+    def _read_pack_entry(self, pack, offset):
+        """Read the object at an offset in a pack, resolving any chain of deltas it's stored as.
+
+        :param _Pack pack: the pack
+        :param int offset: the offset of the object's entry in the pack
+        :return (str, bytes): the object's type and content
+        """
+        deltas = []
+
+        while True:
+            cache_key = (pack.pack_path, offset)
+
+            if cache_key in self._delta_base_cache:
+                self._delta_base_cache.move_to_end(cache_key)
+                object_type, content = self._delta_base_cache[cache_key]
+                break
+
+            entry_type, base, data = pack.read_entry(offset)
+
+            if entry_type in PACK_OBJECT_TYPES:
+                object_type, content = PACK_OBJECT_TYPES[entry_type], data
+                self._cache_delta_base(cache_key, object_type, content)
+                break
+
+            deltas.append((cache_key, data))
+
+            if entry_type == OFS_DELTA:
+                offset = base
+                continue
+
+            # The base of a ref delta can be in any pack, or even be a loose object.
+            base_sha = base.hex()
+            base_offset = pack.find_offset(base)
+
+            if base_offset is not None:
+                offset = base_offset
+                continue
+
+            base_object = self._read_loose_object(base_sha) or self._read_packed_object(base_sha)
+
+            if base_object is None:
+                raise ValueError(f"The base object {base_sha} of a delta in {pack.pack_path!r} is missing.")
+
+            object_type, content = base_object
+            break
+
+        for cache_key, delta in reversed(deltas):
+            content = _apply_delta(content, delta)
+            self._cache_delta_base(cache_key, object_type, content)
+
+        return object_type, content
+
+    def _cache_delta_base(self, cache_key, object_type, content):
+        """Cache a packed object in case it's the base of other deltas, evicting the least recently used object if the
+        cache is full.
+
+        :param tuple(str, int) cache_key: the pack's path and the object's offset in it
+        :param str object_type: the object's type
+        :param bytes content: the object's content
+        :return None:
+        """
+        self._delta_base_cache[cache_key] = (object_type, content)
+
+        if len(self._delta_base_cache) > DELTA_BASE_CACHE_SIZE:
+            self._delta_base_cache.popitem(last=False)
+
+    def _read_loose_ref(self, name):
+        """Read a loose ref file. `HEAD` (and other pseudo-refs) are read from the worktree's own git directory.
+
+        :param str name: the full name of the ref
+        :return str|None: the sha or symbolic ref (e.g. "ref: refs/heads/main") it contains, or `None` if there's no such loose ref
+        """
+        directory = self.git_directory if "/" not in name else self.common_directory
+
+        try:
+            with open(os.path.join(directory, *name.split("/"))) as f:
+                return f.read().strip() or None
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return None
+
+    def _read_packed_refs(self):
+        """Read the `packed-refs` file.
+
+        :return dict(str, tuple(str, str|None)): the sha of each packed ref and the sha of the object it points to once fully peeled (or `None` if it isn't an annotated tag, or `_UNKNOWN` if the file doesn't say)
+        """
+        refs = {}
+        traits = set()
+
+        try:
+            with open(os.path.join(self.common_directory, "packed-refs")) as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return refs
+
+        name = None
+
+        for line in lines:
+            if line.startswith("# pack-refs with:"):
+                traits = set(line[len("# pack-refs with:") :].split())
+            elif line.startswith("^") and name:
+                refs[name] = (refs[name][0], line[1:])
+            elif line and not line.startswith("#"):
+                sha, name = line.split(" ", 1)
+
+                # Peeled values are given for every annotated tag if the file is (fully) peeled, so refs without one
+                # aren't annotated tags.
+                if "fully-peeled" in traits or ("peeled" in traits and name.startswith("refs/tags/")):
+                    refs[name] = (sha, None)
+                else:
+                    refs[name] = (sha, _UNKNOWN)
+
+        return refs
+
+
+class _Pack:
+    """A memory-mapped pack file and its version 2 index.
+
+    :param str index_path: the path to the `.idx` file
+    :param str pack_path: the path to the `.pack` file
+    :raise ValueError: if the index isn't a version 2 pack index
+    :return None:
+    """
+
+    def __init__(self, index_path, pack_path):
+        self.index_path = index_path
+        self.pack_path = pack_path
+
+        with open(index_path, "rb") as f:
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        with open(pack_path, "rb") as f:
+            self._pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._index[:8] != b"\377tOc\0\0\0\2":
+            raise ValueError(f"{index_path!r} isn't a version 2 pack index.")
+
+        if self._pack[:4] != b"PACK":
+            raise ValueError(f"{pack_path!r} isn't a pack file.")
+
+        self._fanout = struct.unpack_from(">256I", self._index, 8)
+        self._number_of_objects = self._fanout[255]
+        self._shas_offset = 8 + 256 * 4
+        self._offsets_offset = self._shas_offset + self._number_of_objects * 24
+        self._large_offsets_offset = self._offsets_offset + self._number_of_objects * 4
+
+    def find_offset(self, binary_sha):
+        """Find the offset of an object's entry in the pack by binary searching the index.
+
+        :param bytes binary_sha: the object's 20-byte sha
+        :return int|None: the offset, or `None` if the object isn't in the pack
+        """
+        first_byte = binary_sha[0]
+        low = self._fanout[first_byte - 1] if first_byte else 0
+        high = self._fanout[first_byte]
+
+        while low < high:
+            middle = (low + high) // 2
+            start = self._shas_offset + middle * 20
+            candidate = self._index[start : start + 20]
+
+            if candidate < binary_sha:
+                low = middle + 1
+            elif candidate > binary_sha:
+                high = middle
+            else:
+                (offset,) = struct.unpack_from(">I", self._index, self._offsets_offset + middle * 4)
+
+                # Offsets too big for 31 bits are stored in a separate table of 64-bit offsets.
+                if offset & 0x80000000:
+                    (offset,) = struct.unpack_from(
+                        ">Q", self._index, self._large_offsets_offset + (offset & 0x7FFFFFFF) * 8
+                    )
+
+                return offset
+
+        return None
+
+    def read_entry(self, offset):
+        """Read and decompress the entry at an offset in the pack without resolving deltas.
+
+        :param int offset: the offset of the entry
+        :return (int, int|bytes|None, bytes): the entry's type, its delta base (the base's offset for an offset delta, its 20-byte sha for a ref delta, or `None` otherwise), and its decompressed data
+        """
+        pack = self._pack
+        byte = pack[offset]
+        entry_type = (byte >> 4) & 7
+        size = byte & 0x0F
+        shift = 4
+        position = offset + 1
+
+        while byte & 0x80:
+            byte = pack[position]
+            size |= (byte & 0x7F) << shift
+            shift += 7
+            position += 1
+
+        base = None
+
+        if entry_type == OFS_DELTA:
+            byte = pack[position]
+            position += 1
+            base_distance = byte & 0x7F
+
+            while byte & 0x80:
+                byte = pack[position]
+                position += 1
+                base_distance = ((base_distance + 1) << 7) | (byte & 0x7F)
+
+            base = offset - base_distance
+
+        elif entry_type == REF_DELTA:
+            base = pack[position : position + 20]
+            position += 20
+
+        decompressor = zlib.decompressobj()
+        chunks = []
+        chunk_size = max(size, 64)
+
+        while not decompressor.eof:
+            chunk = pack[position : position + chunk_size]
+
+            if not chunk:
+                raise ValueError(f"The entry at offset {offset} in {self.pack_path!r} is truncated.")
+
+            chunks.append(decompressor.decompress(chunk))
+            position += len(chunk)
+
+        data = b"".join(chunks)
+
+        if len(data) != size:
+            raise ValueError(f"The entry at offset {offset} in {self.pack_path!r} is corrupt.")
+
+        return entry_type, base, data
+
+    def close(self):
+        """Unmap the index and pack files.
+
+        :return None:
+        """
+        self._index.close()
+        self._pack.close()
+
+
+def _apply_delta(base, delta):
+    """Reconstruct an object from its delta base and a git delta.
+
+    :param bytes base: the base object's content
+    :param bytes delta: the delta
+    :raise ValueError: if the delta doesn't apply to the base
+    :return bytes: the reconstructed object's content
+    """
+    position = 0
+    sizes = []
+
+    for _ in range(2):
+        size = 0
+        shift = 0
+
+        while True:
+            byte = delta[position]
+            position += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+
+            if not byte & 0x80:
+                break
+
+        sizes.append(size)
+
+    base_size, result_size = sizes
+
+    if base_size != len(base):
+        raise ValueError("A delta doesn't apply to its base object.")
+
+    result = bytearray()
+
+    while position < len(delta):
+        instruction = delta[position]
+        position += 1
+
+        if instruction & 0x80:
+            # Copy a range of the base object. The bits of the instruction say which bytes of the offset and size
+            # follow.
+            copy_offset = 0
+            copy_size = 0
+
+            for bit in range(4):
+                if instruction & (1 << bit):
+                    copy_offset |= delta[position] << (8 * bit)
+                    position += 1
+
+            for bit in range(3):
+                if instruction & (0x10 << bit):
+                    copy_size |= delta[position] << (8 * bit)
+                    position += 1
+
+            result += base[copy_offset : copy_offset + (copy_size or 0x10000)]
+
+        elif instruction:
+            # Insert the literal bytes that follow.
+            result += delta[position : position + instruction]
+            position += instruction
+
+        else:
+            raise ValueError("A delta contains an invalid instruction.")
+
+    if len(result) != result_size:
+        raise ValueError("A delta produced an object of the wrong size.")
+
+    return bytes(result)
+
+
+# A marker for a packed ref whose peeled value isn't recorded in `packed-refs`.
+_UNKNOWN = object()
@@ -0,0 +1,193 @@
+import re
+
+# The order of precedence of `git-mkver` actions when more than one commit message matches a pattern.
+ACTION_PRECEDENCE = {
+    "NoIncrement": 0,
+    "IncrementPatch": 1,
+    "IncrementMinor": 2,
+    "IncrementMajor": 3,
+    "Fail": 4,
+}
+
+# `git-mkver`'s built-in commit message actions. Actions in a configuration are merged with these, replacing any with
+# the same pattern.
+DEFAULT_COMMIT_MESSAGE_ACTIONS = [
+    {"pattern": "BREAKING CHANGE", "action": "IncrementMajor"},
+    {"pattern": r"major(\(.+\))?!:", "action": "IncrementMajor"},
+    {"pattern": r"minor(\(.+\))?!:", "action": "IncrementMajor"},
+    {"pattern": r"patch(\(.+\))?!:", "action": "IncrementMajor"},
+    {"pattern": r"feature(\(.+\))?!:", "action": "IncrementMajor"},
+    {"pattern": r"feat(\(.+\))?!:", "action": "IncrementMajor"},
+    {"pattern": r"fix(\(.+\))?!:", "action": "IncrementMajor"},
+    {"pattern": r"major(\(.+\))?:", "action": "IncrementMajor"},
+    {"pattern": r"minor(\(.+\))?:", "action": "IncrementMinor"},
+    {"pattern": r"patch(\(.+\))?:", "action": "IncrementPatch"},
+    {"pattern": r"feature(\(.+\))?:", "action": "IncrementMinor"},
+    {"pattern": r"feat(\(.+\))?:", "action": "IncrementMinor"},
+    {"pattern": r"fix(\(.+\))?:", "action": "IncrementPatch"},
+]
+
+
+class CommitMessageRules:
+    """A compiled set of commit message actions that finds the highest-precedence action matching a commit message in a
+    single pass over it. The actions are merged into `git-mkver`'s default actions.
+
+    The literal text that each pattern must start with is extracted and all of these prefixes are combined into one
+    regular expression, which the regular expression engine scans for in a single pass using its literal-prefix
+    optimisations. Each pattern is then only tried, anchored, at the positions where its prefix occurs, in descending
+    order of precedence. This gives the same result as searching for each pattern separately, even when matches
+    overlap. Patterns without a literal prefix (e.g. ones starting with a group or a character class) are searched for
+    separately.
+
+    :param list(dict) commit_message_actions: the commit message patterns and their actions
+    :return None:
+    """
+
+    def __init__(self, commit_message_actions):
+        merged = {action["pattern"]: action["action"] for action in DEFAULT_COMMIT_MESSAGE_ACTIONS}
+
+        for action in commit_message_actions:
+            if action["action"] not in ACTION_PRECEDENCE:
+                raise ValueError(
+                    f"Unknown commit message action {action['action']!r} for pattern {action['pattern']!r}; options "
+                    f"are {list(ACTION_PRECEDENCE)!r}."
+                )
+
+            merged[action["pattern"]] = action["action"]
+
+        # Python's sort is stable, so patterns with the same action stay in their original order.
+        self.actions = sorted(merged.items(), key=lambda item: ACTION_PRECEDENCE[item[1]], reverse=True)
+
+        # Nothing can outrank the highest-precedence action, so matching can stop as soon as it's found.
+        self.highest_action = self.actions[0][1] if self.actions else None
+
+        self._unprefixed_rules = []
+        prefixed_rules = {}
+
+        for pattern, action in self.actions:
+            prefix = _get_literal_prefix(pattern)
+
+            if prefix:
+                prefixed_rules.setdefault(prefix, []).append((re.compile(pattern), action))
+            else:
+                self._unprefixed_rules.append((re.compile(pattern), action))
+
+        # Map the first character of each prefix to the prefixes and their rules so the prefixes occurring at a position
+        # can be found quickly.
+        self._prefixed_rules = {}
+
+        for prefix, rules in prefixed_rules.items():
+            self._prefixed_rules.setdefault(prefix[0], []).append((prefix, rules))
+
+        if prefixed_rules:
+            self._prefix_pattern = re.compile("|".join(re.escape(prefix) for prefix in prefixed_rules))
+        else:
+            self._prefix_pattern = None
+
+    def get_action(self, message):
+        """Get the highest-precedence action of the patterns matching the commit message.
+
+        :param str message: the commit message
+        :raise ValueError: if the message matches a pattern with the "Fail" action
+        :return str|None: the action, or `None` if no patterns match
+        """
+        action = None
+
+        # These are in descending order of precedence, so only the first match matters.
+        for pattern, rule_action in self._unprefixed_rules:
+            if pattern.search(message):
+                action = rule_action
+                break
+
+        if self._prefix_pattern is not None:
+            position = 0
+
+            while action != self.highest_action and (prefix_match := self._prefix_pattern.search(message, position)):
+                start = prefix_match.start()
+
+                for prefix, rules in self._prefixed_rules[message[start]]:
+                    if not message.startswith(prefix, start):
+                        continue
+
+                    for pattern, rule_action in rules:
+                        if action is not None and ACTION_PRECEDENCE[rule_action] <= ACTION_PRECEDENCE[action]:
+                            break
+
+                        if pattern.match(message, start):
+                            action = rule_action
+                            break
+
+                # Prefixes can overlap, so the search resumes from the next character rather than after the match.
+                position = start + 1
+
+        if action == "Fail":
+            raise ValueError(f"A commit message matched a pattern with the 'Fail' action: {message!r}.")
+
+        return action
+
+
+def _get_literal_prefix(pattern):
+    """Get the literal text that every match of a regular expression must start with.
+
+    :param str pattern: the regular expression
+    :return str: the literal prefix (empty if there isn't one)
+    """
+    depth = 0
+    in_character_class = False
+    index = 0
+
+    # A top-level alternation means matches could start with different text.
+    while index < len(pattern):
+        character = pattern[index]
+
+        if character == "\\":
+            index += 2
+            continue
+
+        if in_character_class:
+            in_character_class = character != "]"
+        elif character == "[":
+            in_character_class = True
+        elif character == "(":
+            depth += 1
+        elif character == ")":
+            depth -= 1
+        elif character == "|" and depth == 0:
+            return ""
+
+        index += 1
+
+    prefix = []
+    index = 0
+
+    while index < len(pattern):
+        character = pattern[index]
+
+        if character == "\\":
+            # Escaped letters and digits are character classes, anchors, or backreferences rather than literals.
+            if index + 1 >= len(pattern) or pattern[index + 1].isalnum():
+                break
+
+            literal = pattern[index + 1]
+            length = 2
+
+        elif character in ".^$*+?{}[]|()":
+            break
+
+        else:
+            literal = character
+            length = 1
+
+        quantifier = pattern[index + length : index + length + 1]
+
+        # A character that can be repeated zero times isn't required.
+        if quantifier in ("*", "?", "{"):
+            break
+
+        prefix.append(literal)
+        index += length
+
+        if quantifier == "+":
+            break
+
+    return "".join(prefix)
@@ -0,0 +1,264 @@
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import tempfile
+import time
+from typing import NamedTuple
+
+from check_semantic_version.cat_file import CAT_FILE_POOL
+from check_semantic_version.commit_graph import CommitGraph
+from check_semantic_version.git import run_git
+from check_semantic_version.timings import span
+from check_semantic_version.version import Version
+
+logger = logging.getLogger(__name__)
+
+# The name of the directory in the repository's git directory that tag indexes (and other derived data) are kept in.
+CACHE_DIRECTORY_NAME = "check-semantic-version"
+
+# Bump this if the format of cached tag indexes changes so old ones are ignored.
+TAG_INDEX_FORMAT_VERSION = 1
+
+# Refs changed this recently might be changed again without their modification times changing (e.g. on filesystems with
+# coarse timestamps), so indexes of them aren't cached.
+RACY_REFS_INTERVAL = 2
+
+
+class Tag(NamedTuple):
+    """A version tag and the commit it points to."""
+
+    version: Version
+    name: str
+    commit: str
+
+
+class TagIndex:
+    """An index of a repository's version tags with a given prefix, sorted from the highest version to the lowest. The
+    tags are listed with a single `git for-each-ref` call and parsed into sortable version tuples. The index is cached
+    in the repository's git directory, keyed by the modification times of the packed refs and the loose tag refs, so
+    it's only rebuilt when tags are added, moved, or deleted.
+
+    :param str repository_path: the path to the git repository
+    :param str tag_prefix: the prefix before version numbers in tags (e.g. "v")
+    :param bool use_cache: if `False`, always list the tags with git and don't cache the index
+    :param check_semantic_version.object_store.ObjectStore|None object_store: if given, read the tags and test their reachability with this instead of running `git`
+    :return None:
+    """
+
+    def __init__(self, repository_path=".", tag_prefix="", use_cache=True, object_store=None):
+        self.repository_path = repository_path
+        self.tag_prefix = tag_prefix
+        self.object_store = object_store
+        self.tags = []
+        self.digest = None
+
+        if object_store:
+            common_directory = object_store.common_directory
+        else:
+            common_directory = run_git(
+                ["rev-parse", "--path-format=absolute", "--git-common-dir"], repository_path
+            ).strip()
+
+        self._common_directory = common_directory
+        self.commit_graph = CommitGraph.load(common_directory)
+        prefix_digest = hashlib.sha256(tag_prefix.encode("utf8")).hexdigest()[:16]
+        self._cache_path = os.path.join(common_directory, CACHE_DIRECTORY_NAME, f"tags-{prefix_digest}.json")
+
+        signature = self._get_refs_signature()
+
+        if use_cache and self._load_cache(signature):
+            return
+
+        self._build()
+
+        last_modified = max((modified for _, modified, _ in signature), default=0)
+
+        if use_cache and time.time_ns() - last_modified > RACY_REFS_INTERVAL * 1e9:
+            self._save_cache(signature)
+
+    def get_last_reachable_tag(self, revision="HEAD"):
+        """Get the highest version tag whose commit is an ancestor of (or is) the revision. Commits are checked in
+        descending order of version, stopping at the first reachable one.
+
+        :param str revision: the revision the tag must be reachable from
+        :return Tag|None: the tag, or `None` if no version tags are reachable
+        """
+        checked_commits = set()
+
+        if self.commit_graph:
+            for tag in self.tags:
+                if tag.commit not in checked_commits and self.is_ancestor(tag.commit, revision):
+                    return tag
+
+                checked_commits.add(tag.commit)
+
+            return None
+
+        if self.object_store:
+            # The revision's ancestors are walked newest first, once, as far as needed to find each tag's commit.
+            ancestors = self.object_store.iter_commits(self.object_store.resolve_ref(revision) or revision)
+            reachable_commits = set()
+
+        for tag in self.tags:
+            if tag.commit in checked_commits:
+                continue
+
+            checked_commits.add(tag.commit)
+
+            if self.object_store:
+                if tag.commit in reachable_commits:
+                    return tag
+
+                for ancestor in ancestors:
+                    reachable_commits.add(ancestor.sha)
+
+                    if ancestor.sha == tag.commit:
+                        return tag
+
+                continue
+
+            if self.is_ancestor(tag.commit, revision):
+                return tag
+
+        return None
+
+    def is_ancestor(self, ancestor, descendant="HEAD"):
+        """Check if a commit is an ancestor of (or is) another commit. If the repository has a commit-graph, it's used
+        to resolve ancestry in-process without reading most commit objects; otherwise, `git merge-base --is-ancestor`
+        is run (or the commits are walked with the object store).
+
+        :param str ancestor: the sha of the possible ancestor
+        :param str descendant: the sha of the possible descendant or a ref pointing to it
+        :return bool: whether the commit is an ancestor; `False` if either commit doesn't exist
+        """
+        try:
+            if self.commit_graph and self.object_store:
+                return self.commit_graph.is_ancestor(
+                    ancestor,
+                    self.object_store.read_commit(descendant).sha,
+                    self.object_store.read_parents,
+                )
+
+            if self.commit_graph:
+                with CAT_FILE_POOL.acquire(self.repository_path) as cat_file:
+                    return self.commit_graph.is_ancestor(
+                        ancestor,
+                        cat_file.read_commit(descendant).sha,
+                        lambda sha: cat_file.read_commit(sha).parents,
+                    )
+
+            if self.object_store:
+                return self.object_store.is_ancestor(ancestor, self.object_store.read_commit(descendant).sha)
+
+        except ValueError:
+            return False
+
+        command = ["git", "merge-base", "--is-ancestor", ancestor, descendant]
+
+        with span("subprocess", command=command):
+            ancestor_check = subprocess.run(command, cwd=self.repository_path, capture_output=True)
+
+        return ancestor_check.returncode == 0
+
+    def _build(self):
+        """List the tags with git and parse the version tags into the index.
+
+        :return None:
+        """
+        if self.object_store:
+            # This is the same as `git for-each-ref`'s output below so the digest doesn't depend on how tags are read.
+            listing = "".join(
+                f"{sha}\0{peeled or ''}\0{name[len('refs/tags/') :]}\n"
+                for name, sha, peeled in self.object_store.iter_refs("refs/tags/")
+            )
+        else:
+            # Annotated tags are peeled (`%(*objectname)`) so every tag's commit is known without another git call.
+            listing = run_git(
+                ["for-each-ref", "--format=%(objectname)%00%(*objectname)%00%(refname:strip=2)", "refs/tags/"],
+                self.repository_path,
+            )
+
+        self.digest = hashlib.sha256(listing.encode("utf8")).hexdigest()
+        tags = []
+
+        for line in listing.splitlines():
+            object_name, peeled_object_name, name = line.split("\0")
+            version = Version.from_tag(name, self.tag_prefix)
+
+            if version:
+                tags.append(Tag(version=version, name=name, commit=peeled_object_name or object_name))
+
+        self.tags = sorted(tags, reverse=True)
+
+    def _get_refs_signature(self):
+        """Get the paths, modification times, and sizes of the files and directories that tag refs are stored in. If
+        any tag is added, moved, or deleted, the signature changes.
+
+        :return list(list): the path, modification time, and size of each file or directory
+        """
+        signature = []
+        paths = [os.path.join(self._common_directory, "packed-refs"), os.path.join(self._common_directory, "reftable")]
+
+        for directory, _, _ in os.walk(os.path.join(self._common_directory, "refs", "tags")):
+            paths.append(directory)
+
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+
+            signature.append([os.path.relpath(path, self._common_directory), stat.st_mtime_ns, stat.st_size])
+
+        return signature
+
+    def _load_cache(self, signature):
+        """Load the cached index if it's for the current refs.
+
+        :param list(list) signature: the current signature of the tag refs
+        :return bool: whether the cached index was loaded
+        """
+        try:
+            with open(self._cache_path) as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable tag index %r.", self._cache_path)
+            return False
+
+        if cached.get("format_version") != TAG_INDEX_FORMAT_VERSION or cached.get("signature") != signature:
+            return False
+
+        self.digest = cached["digest"]
+        self.tags = [
+            Tag(version=Version(*version), name=name, commit=commit) for version, name, commit in cached["tags"]
+        ]
+        return True
+
+    def _save_cache(self, signature):
+        """Cache the index, ignoring failures (e.g. a read-only git directory) as caching is only an optimisation.
+
+        :param list(list) signature: the signature of the tag refs the index was built from
+        :return None:
+        """
+        cached = {
+            "format_version": TAG_INDEX_FORMAT_VERSION,
+            "signature": signature,
+            "digest": self.digest,
+            "tags": self.tags,
+        }
+
+        try:
+            os.makedirs(os.path.dirname(self._cache_path), exist_ok=True)
+
+            with tempfile.NamedTemporaryFile(
+                "w", dir=os.path.dirname(self._cache_path), suffix=".tmp", delete=False
+            ) as f:
+                json.dump(cached, f)
+
+            os.replace(f.name, self._cache_path)
+        except OSError as e:
+            logger.debug("Couldn't save tag index to %r: %s", self._cache_path, e)
@@ -0,0 +1,153 @@
+import contextlib
+import contextvars
+import itertools
+import json
+import threading
+import time
+from typing import NamedTuple
+
+_span_hooks = []
+_span_ids = itertools.count(1)
+_current_span_id = contextvars.ContextVar("current_span_id", default=None)
+
+
+class Span(NamedTuple):
+    """A timed stage of a check. Times are from `time.perf_counter`. The parent is the span that was open in the same
+    thread when this one started, if any.
+    """
+
+    id: int
+    parent_id: int
+    name: str
+    start: float
+    duration: float
+    attributes: dict
+    thread: str
+    error: str = None
+
+
+def add_span_hook(hook):
+    """Add a function to be called with each span as it finishes (e.g. to forward it to a metrics pipeline). Hooks are
+    called in the thread the span ran in, so they must be thread-safe. Exceptions raised by hooks are ignored.
+
+    :param callable hook: a function taking a `Span`
+    :return None:
+    """
+    _span_hooks.append(hook)
+
+
+def remove_span_hook(hook):
+    """Remove a span hook added with `add_span_hook`.
+
+    :param callable hook: the hook
+    :return None:
+    """
+    _span_hooks.remove(hook)
+
+
+@contextlib.contextmanager
+def span(name, **attributes):
+    """Time the code in the context as a span with the given name and attributes, passing the span to each span hook
+    when it finishes. If there aren't any hooks, nothing is timed.
+
+    :param str name: the name of the span (e.g. "configuration generation" or "subprocess")
+    :param attributes: attributes describing the span (e.g. the command run by a subprocess)
+    :return iter(None):
+    """
+    if not _span_hooks:
+        yield
+        return
+
+    span_id = next(_span_ids)
+    parent_id = _current_span_id.get()
+    token = _current_span_id.set(span_id)
+    error = None
+    start = time.perf_counter()
+
+    try:
+        yield
+    except Exception as e:
+        error = repr(e)
+        raise
+    finally:
+        duration = time.perf_counter() - start
+
+        try:
+            _current_span_id.reset(token)
+        except ValueError:
+            # A span around the `yield`s of a generator can finish in a different context from the one it started in
+            # (e.g. if the generator is closed by the garbage collector).
+            pass
+
+        finished_span = Span(
+            id=span_id,
+            parent_id=parent_id,
+            name=name,
+            start=start,
+            duration=duration,
+            attributes=attributes,
+            thread=threading.current_thread().name,
+            error=error,
+        )
+
+        for hook in list(_span_hooks):
+            try:
+                hook(finished_span)
+            except Exception:
+                pass
+
+
+class TimingsRecorder:
+    """A span hook that records spans so a JSON timings report can be made from them. Use it as a context manager to
+    record the spans finishing while the context is open.
+
+    :return None:
+    """
+
+    def __init__(self):
+        self.spans = []
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, finished_span):
+        with self._lock:
+            self.spans.append(finished_span)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        add_span_hook(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        remove_span_hook(self)
+
+    def get_report(self):
+        """Get a report of the recorded spans in the order they started, with start times relative to when recording
+        started, and the number and total duration of the spans with each name.
+
+        :return dict:
+        """
+        spans = sorted(self.spans, key=lambda recorded_span: recorded_span.start)
+        totals = {}
+
+        for recorded_span in spans:
+            total = totals.setdefault(recorded_span.name, {"count": 0, "total_duration": 0.0})
+            total["count"] += 1
+            total["total_duration"] += recorded_span.duration
+
+        return {
+            "total_duration": time.perf_counter() - self._start,
+            "spans": [
+                recorded_span._asdict() | {"start": recorded_span.start - self._start} for recorded_span in spans
+            ],
+            "totals": totals,
+        }
+
+    def write_report(self, f):
+        """Write the report as JSON.
+
+        :param io.TextIOBase f: the file to write the report to
+        :return None:
+        """
+        json.dump(self.get_report(), f, indent=2, default=str)
+        f.write("\n")
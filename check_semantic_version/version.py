@@ -0,0 +1,48 @@
+import re
+from typing import NamedTuple
+
+
+class Version(NamedTuple):
+    """A semantic version without pre-release or build metadata information."""
+
+    major: int
+    minor: int
+    patch: int
+
+    @classmethod
+    def from_tag(cls, tag, tag_prefix=""):
+        """Parse a version from a git tag.
+
+        :param str tag: the name of the tag
+        :param str tag_prefix: the prefix expected before the version number in the tag (e.g. "v")
+        :return Version|None: the version, or `None` if the tag isn't a version tag with the given prefix
+        """
+        match = re.fullmatch(re.escape(tag_prefix) + r"(\d+)\.(\d+)\.(\d+)", tag)
+
+        if not match:
+            return None
+
+        return cls(*(int(number) for number in match.groups()))
+
+    def increment(self, action):
+        """Get the version resulting from applying a `git-mkver` action to this version.
+
+        :param str action: one of "IncrementMajor", "IncrementMinor", "IncrementPatch", or "NoIncrement"
+        :return Version:
+        """
+        if action == "IncrementMajor":
+            return Version(self.major + 1, 0, 0)
+
+        if action == "IncrementMinor":
+            return Version(self.major, self.minor + 1, 0)
+
+        if action == "IncrementPatch":
+            return Version(self.major, self.minor, self.patch + 1)
+
+        if action == "NoIncrement":
+            return self
+
+        raise ValueError(f"Unknown version increment action: {action!r}.")
+
+    def __str__(self):
+        return f"{self.major}.{self.minor}.{self.patch}"
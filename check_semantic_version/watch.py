@@ -0,0 +1,415 @@
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import time
+
+from check_semantic_version.check_semantic_version import (
+    _get_current_version,
+    _get_expected_semantic_version,
+    _report_result,
+    _run_stage,
+)
+from check_semantic_version.extractors import get_extractor
+from check_semantic_version.git import run_git
+
+logger = logging.getLogger(__name__)
+
+CURRENT_VERSION_STAGE = "current version lookup"
+EXPECTED_VERSION_STAGE = "expected version lookup"
+
+# Changes are only acted on once no more have been seen for this long, so a burst of changes (e.g. a commit updating a
+# ref, the reflog, and HEAD) triggers a single re-check.
+DEFAULT_DEBOUNCE_INTERVAL = 0.2
+
+# How often the files are checked for changes if inotify isn't available.
+POLLING_INTERVAL = 0.5
+
+# See `man 7 inotify`.
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+
+
+class VersionWatcher:
+    """Watch a package's version source file and its repository's HEAD, refs, packed refs, shallow file, and
+    `mkver.conf` file, re-checking the package's version whenever they change. Only the lookups affected by a change are
+    re-run: editing the version source file only re-reads the current version, and anything else (e.g. a new commit, an
+    amended commit, a new tag, or a changed `mkver.conf` file) only recalculates the expected version. The files the
+    current version is read from (e.g. the module a `setup.py` file imports its version from) are watched like the
+    version source file and are looked up again each time the current version is re-read.
+
+    On Linux, the files are watched with inotify; elsewhere, they're polled.
+
+    :param check_semantic_version.check_semantic_version.Package package: the package to check (its path is relative to the repository)
+    :param str|None base_ref: if given, only use the commits since the merge-base of this ref and HEAD
+    :param str repository_path: the path to the git repository
+    :param float debounce_interval: how long to wait for changes to stop before re-checking, in seconds
+    :return None:
+    """
+
+    def __init__(self, package, base_ref=None, repository_path=".", debounce_interval=DEFAULT_DEBOUNCE_INTERVAL):
+        self.package = package
+        self.version_source_type = os.path.split(package.path)[-1]
+        self.version_source_path = os.path.abspath(os.path.join(repository_path, package.path))
+        self.base_ref = base_ref
+        self.repository_path = repository_path
+        self.debounce_interval = debounce_interval
+        self.current_version = None
+        self.expected_semantic_version = None
+
+        git_directory, common_directory = run_git(
+            ["rev-parse", "--path-format=absolute", "--git-dir", "--git-common-dir"],
+            repository_path,
+        ).split()
+
+        self.refs_directory = os.path.join(common_directory, "refs")
+
+        self._repository_paths = {
+            os.path.join(git_directory, "HEAD"): EXPECTED_VERSION_STAGE,
+            os.path.join(common_directory, "packed-refs"): EXPECTED_VERSION_STAGE,
+            os.path.join(common_directory, "shallow"): EXPECTED_VERSION_STAGE,
+            os.path.join(os.path.abspath(repository_path), "mkver.conf"): EXPECTED_VERSION_STAGE,
+        }
+
+        self.watched_paths = {}
+        self._monitor = None
+        self._watch_source_paths()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def check(self, stages=(CURRENT_VERSION_STAGE, EXPECTED_VERSION_STAGE)):
+        """Re-run the given lookups, keeping the results of the others, and print whether the versions match. A lookup
+        that fails is logged and its result is left unknown until it next succeeds.
+
+        :param iter(str) stages: the lookups to re-run
+        :return bool: whether the versions match
+        """
+        start_time = time.perf_counter()
+
+        if CURRENT_VERSION_STAGE in stages:
+            try:
+                self.current_version = _run_stage(
+                    CURRENT_VERSION_STAGE,
+                    start_time,
+                    _get_current_version,
+                    path=self.version_source_path,
+                    version_source_type=self.version_source_type,
+                )
+            except Exception:
+                self.current_version = None
+
+            # The version might now be read from different files (e.g. if the module it's imported from has changed).
+            self._watch_source_paths()
+
+        if EXPECTED_VERSION_STAGE in stages:
+            try:
+                self.expected_semantic_version = _run_stage(
+                    EXPECTED_VERSION_STAGE,
+                    start_time,
+                    _get_expected_semantic_version,
+                    version_source_type=self.version_source_type,
+                    breaking_change_indicated_by=self.package.breaking_change_indicated_by,
+                    tag_prefix=self.package.tag_prefix,
+                    base_ref=self.base_ref,
+                    repository_path=self.repository_path,
+                )
+            except Exception:
+                self.expected_semantic_version = None
+
+        return _report_result(self.current_version, self.expected_semantic_version)
+
+    def wait_for_changes(self, timeout=None):
+        """Wait for the watched files to change and for the changes to stop for the debounce interval.
+
+        :param float|None timeout: the longest time to wait for the first change in seconds; if `None`, wait forever
+        :return set(str): the lookups affected by the changes (empty if the timeout was reached)
+        """
+        changed_paths = self._monitor.read_changes(timeout)
+
+        if not changed_paths:
+            return set()
+
+        while True:
+            more_changed_paths = self._monitor.read_changes(self.debounce_interval)
+
+            if not more_changed_paths:
+                break
+
+            changed_paths |= more_changed_paths
+
+        logger.debug("Changed: %r.", sorted(path for path in changed_paths if path))
+
+        # `None` means changes may have been missed (e.g. the inotify queue overflowed), so everything is re-run.
+        if None in changed_paths:
+            return {CURRENT_VERSION_STAGE, EXPECTED_VERSION_STAGE}
+
+        return {self.watched_paths.get(path, EXPECTED_VERSION_STAGE) for path in changed_paths}
+
+    def run(self, stop_event=None):
+        """Check the versions and then re-check them whenever the watched files change, until interrupted or the stop
+        event is set.
+
+        :param threading.Event|None stop_event: if given, stop watching when this is set
+        :return None:
+        """
+        self.check()
+
+        while not (stop_event and stop_event.is_set()):
+            stages = self.wait_for_changes(timeout=POLLING_INTERVAL)
+
+            if stages:
+                logger.info("Re-running the %s.", " and ".join(sorted(stages)))
+                self.check(stages)
+
+    def close(self):
+        """Stop watching the files.
+
+        :return None:
+        """
+        self._monitor.close()
+
+    def _watch_source_paths(self):
+        """Watch the files the current version is read from along with the repository's files, replacing the monitor
+        only if the files have changed. If the version can only be found by running code, just the version source file
+        is watched.
+
+        :return None:
+        """
+        try:
+            source_paths = get_extractor(self.version_source_type).get_source_paths(self.version_source_path)
+        except (OSError, ValueError):
+            source_paths = None
+
+        watched_paths = dict.fromkeys(source_paths or [self.version_source_path], CURRENT_VERSION_STAGE)
+        watched_paths.update(self._repository_paths)
+
+        if watched_paths == self.watched_paths:
+            return
+
+        self.watched_paths = watched_paths
+
+        if isinstance(self._monitor, _PollingMonitor):
+            self._monitor = _PollingMonitor(self.watched_paths, self.refs_directory)
+            return
+
+        if self._monitor:
+            self._monitor.close()
+
+        try:
+            self._monitor = _InotifyMonitor(self.watched_paths, self.refs_directory)
+        except OSError as e:
+            logger.warning("Inotify isn't available (%s). Polling for changes instead.", e)
+            self._monitor = _PollingMonitor(self.watched_paths, self.refs_directory)
+
+
+class _InotifyMonitor:
+    """Watch files for changes with inotify (through `ctypes`, as it isn't in the standard library). The directories
+    containing the files are watched rather than the files themselves because git and many editors replace files by
+    renaming new ones over them. The refs directory is watched recursively, adding watches to new subdirectories as
+    they're created.
+
+    :param dict(str, str) watched_paths: the absolute paths of the files to watch (mapped to anything)
+    :param str refs_directory: the path of the repository's refs directory
+    :raise OSError: if inotify isn't available (e.g. on platforms other than Linux)
+    :return None:
+    """
+
+    def __init__(self, watched_paths, refs_directory):
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "Inotify is only available on Linux.")
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._libc.inotify_init1.argtypes = [ctypes.c_int]
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._file_descriptor = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+
+        if self._file_descriptor < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+
+        self._watched_paths = set(watched_paths)
+        self._refs_directory = refs_directory
+        self._directories = {}
+
+        for directory in {os.path.dirname(path) for path in watched_paths}:
+            self._add_watch(directory)
+
+        self._add_watches_recursively(refs_directory)
+
+    def read_changes(self, timeout=None):
+        """Wait for changes to the watched files and read them.
+
+        :param float|None timeout: the longest time to wait in seconds; if `None`, wait forever
+        :return set(str|None): the paths of the changed files (empty if the timeout was reached), including `None` if changes may have been missed
+        """
+        if not select.select([self._file_descriptor], [], [], timeout)[0]:
+            return set()
+
+        changed_paths = set()
+
+        while True:
+            try:
+                buffer = os.read(self._file_descriptor, 64 * 1024)
+            except BlockingIOError:
+                return changed_paths
+
+            offset = 0
+
+            while offset < len(buffer):
+                watch_descriptor, mask, _, name_length = INOTIFY_EVENT_HEADER.unpack_from(buffer, offset)
+                offset += INOTIFY_EVENT_HEADER.size
+                name = buffer[offset : offset + name_length].rstrip(b"\0").decode("utf8", "surrogateescape")
+                offset += name_length
+
+                if mask & IN_Q_OVERFLOW:
+                    changed_paths.add(None)
+                    continue
+
+                directory = self._directories.get(watch_descriptor)
+
+                if directory is None:
+                    continue
+
+                path = os.path.join(directory, name)
+
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and self._is_in_refs_directory(path):
+                    # Refs may have been written to the new directory before it was watched.
+                    self._add_watches_recursively(path)
+                    changed_paths.add(path)
+                elif path in self._watched_paths:
+                    changed_paths.add(path)
+                elif self._is_in_refs_directory(path) and not name.endswith(".lock"):
+                    changed_paths.add(path)
+
+    def close(self):
+        """Stop watching the files.
+
+        :return None:
+        """
+        if self._file_descriptor >= 0:
+            os.close(self._file_descriptor)
+            self._file_descriptor = -1
+
+    def _add_watch(self, directory):
+        """Watch a directory if it exists.
+
+        :param str directory: the path of the directory
+        :return None:
+        """
+        watch_descriptor = self._libc.inotify_add_watch(self._file_descriptor, os.fsencode(directory), WATCH_MASK)
+
+        if watch_descriptor >= 0:
+            self._directories[watch_descriptor] = directory
+        elif ctypes.get_errno() != errno.ENOENT:
+            logger.warning("Couldn't watch %r: %s", directory, os.strerror(ctypes.get_errno()))
+
+    def _add_watches_recursively(self, directory):
+        """Watch a directory and all the directories in it.
+
+        :param str directory: the path of the directory
+        :return None:
+        """
+        for subdirectory, _, _ in os.walk(directory):
+            self._add_watch(subdirectory)
+
+    def _is_in_refs_directory(self, path):
+        """Check if a path is in the refs directory.
+
+        :param str path: the path
+        :return bool:
+        """
+        return path.startswith(self._refs_directory + os.sep)
+
+
+class _PollingMonitor:
+    """Watch files for changes by checking their modification times and sizes (and those of the files and directories
+    in the refs directory) at regular intervals.
+
+    :param dict(str, str) watched_paths: the absolute paths of the files to watch (mapped to anything)
+    :param str refs_directory: the path of the repository's refs directory
+    :return None:
+    """
+
+    def __init__(self, watched_paths, refs_directory):
+        self._watched_paths = list(watched_paths)
+        self._refs_directory = refs_directory
+        self._signature = self._get_signature()
+
+    def read_changes(self, timeout=None):
+        """Wait for changes to the watched files.
+
+        :param float|None timeout: the longest time to wait in seconds; if `None`, wait forever
+        :return set(str): the paths of the changed files (empty if the timeout was reached)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            signature = self._get_signature()
+
+            changed_paths = {
+                path
+                for path in self._signature.keys() | signature.keys()
+                if self._signature.get(path) != signature.get(path)
+            }
+
+            self._signature = signature
+
+            if changed_paths:
+                return changed_paths
+
+            if deadline is None:
+                time.sleep(POLLING_INTERVAL)
+                continue
+
+            remaining = deadline - time.monotonic()
+
+            if remaining <= 0:
+                return set()
+
+            time.sleep(min(POLLING_INTERVAL, remaining))
+
+    def close(self):
+        """Stop watching the files.
+
+        :return None:
+        """
+
+    def _get_signature(self):
+        """Get the modification times and sizes of the watched files and of the files and directories in the refs
+        directory.
+
+        :return dict(str, tuple(int, int)): the modification time and size of each path that exists
+        """
+        paths = list(self._watched_paths)
+
+        for directory, _, filenames in os.walk(self._refs_directory):
+            paths.append(directory)
+            paths.extend(os.path.join(directory, filename) for filename in filenames if not filename.endswith(".lock"))
+
+        signature = {}
+
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                signature[path] = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                pass
+
+        return signature
@@ -0,0 +1,68 @@
+import os
+import subprocess
+
+GIT_CONFIGURATION = [
+    "-c",
+    "user.name=Test User",
+    "-c",
+    "user.email=test@example.com",
+    "-c",
+    "commit.gpgsign=false",
+    "-c",
+    "tag.gpgsign=false",
+]
+
+
+def git(repository_path, *arguments):
+    """Run a git command in a test repository.
+
+    :param str repository_path: the path to the repository
+    :param str arguments: the arguments to pass to `git`
+    :return str: the command's standard output
+    """
+    process = subprocess.run(
+        ["git", *GIT_CONFIGURATION, *arguments],
+        cwd=repository_path,
+        capture_output=True,
+        check=True,
+    )
+
+    return process.stdout.decode("utf8").strip()
+
+
+def create_repository(repository_path, history):
+    """Create a git repository on a `main` branch from a list of operations. Each operation is a single-item dictionary
+    mapping one of "commit", "write" (write a unique line to the file at the given path and stage it for the next
+    commit), "tag", "branch" (create and check out a branch), "checkout", or "merge" (a no-fast-forward merge of the
+    named branch) to its argument.
+
+    :param str repository_path: the path to create the repository at
+    :param list(dict) history: the operations to perform
+    :return None:
+    """
+    os.makedirs(repository_path, exist_ok=True)
+    git(repository_path, "init", "--quiet", "--initial-branch=main")
+
+    for operation in history:
+        ((name, argument),) = operation.items()
+
+        if name == "commit":
+            git(repository_path, "commit", "--quiet", "--allow-empty", "-m", argument)
+        elif name == "write":
+            file_path = os.path.join(repository_path, argument)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+            with open(file_path, "a") as f:
+                f.write(f"{len(history)}-{os.urandom(4).hex()}\n")
+
+            git(repository_path, "add", argument)
+        elif name == "tag":
+            git(repository_path, "tag", argument)
+        elif name == "branch":
+            git(repository_path, "checkout", "--quiet", "-b", argument)
+        elif name == "checkout":
+            git(repository_path, "checkout", "--quiet", argument)
+        elif name == "merge":
+            git(repository_path, "merge", "--quiet", "--no-ff", "-m", f"Merge branch '{argument}'", argument)
+        else:
+            raise ValueError(f"Unknown repository operation: {name!r}.")
@@ -0,0 +1,227 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from check_semantic_version import cli
+from check_semantic_version.audit import audit_history, write_audit_report
+from check_semantic_version.configuration import Configuration
+from check_semantic_version.expected_version import get_expected_version
+from tests.base import create_repository, git
+
+TEST_DIRECTORY = os.path.abspath(os.path.dirname(__file__))
+
+
+class TestAudit(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.repository_path = self.temporary_directory.name
+        self.configuration = Configuration(version_source_type="setup.py")
+        self.configuration.generate()
+
+        create_repository(self.repository_path, [])
+        self._release("Initial commit", "1.0.0")
+        git(self.repository_path, "checkout", "--quiet", "-b", "feature")
+        git(self.repository_path, "commit", "--quiet", "--allow-empty", "-m", "FEA: Add a feature")
+        git(self.repository_path, "checkout", "--quiet", "main")
+        self._release("FIX: Fix a bug", "1.0.1")
+        git(self.repository_path, "checkout", "--quiet", "feature")
+        git(self.repository_path, "commit", "--quiet", "--allow-empty", "-m", "DOC: Update the documentation")
+        git(self.repository_path, "checkout", "--quiet", "main")
+
+        # The feature branch was forked before 1.0.1 but only its own commits count towards the merge's version.
+        git(self.repository_path, "merge", "--quiet", "--no-ff", "--no-commit", "feature")
+        self._release("Merge branch 'feature'", "1.1.0")
+
+        # This release's version source file wasn't updated.
+        git(self.repository_path, "commit", "--quiet", "--allow-empty", "-m", "FIX: Fix another bug")
+        git(self.repository_path, "tag", "1.1.1")
+
+        # This release skipped a version.
+        self._release("REF: Rename a module", "1.1.3")
+        git(self.repository_path, "commit", "--quiet", "--allow-empty", "-m", "FEA: Add another feature")
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def _release(self, message, version):
+        """Commit a `setup.py` file with the given version and tag the commit with it.
+
+        :param str message: the commit message
+        :param str version: the version
+        :return None:
+        """
+        with open(os.path.join(self.repository_path, "setup.py"), "w") as f:
+            f.write(f'from setuptools import setup\n\nsetup(name="package", version="{version}")\n')
+
+        git(self.repository_path, "add", "setup.py")
+        git(self.repository_path, "commit", "--quiet", "-m", message)
+        git(self.repository_path, "tag", version)
+
+    def test_expected_versions_match_get_expected_version(self):
+        """Test that the expected version of each commit is the same as calculating it from scratch at the commit
+        without the commit's own version tags.
+        """
+        records = list(audit_history(self.configuration, "setup.py", self.repository_path))
+        self.assertEqual(len(records), int(git(self.repository_path, "rev-list", "--count", "HEAD")))
+
+        for record in records:
+            with self.subTest(commit=record.commit):
+                git(self.repository_path, "checkout", "--quiet", "--detach", record.commit)
+
+                for tag in record.version_tags:
+                    git(self.repository_path, "tag", "--delete", tag)
+
+                try:
+                    expected_version = get_expected_version(
+                        self.configuration,
+                        repository_path=self.repository_path,
+                        use_checkpoint=False,
+                    )
+                finally:
+                    for tag in record.version_tags:
+                        git(self.repository_path, "tag", tag, record.commit)
+
+                self.assertEqual(record.expected_version, expected_version)
+
+    def test_disagreements_flagged(self):
+        """Test that version tags disagreeing with the expected version or with the version source file are flagged."""
+        records = list(audit_history(self.configuration, "setup.py", self.repository_path))
+
+        self.assertEqual(
+            [
+                (record.version_tags, record.expected_version, record.file_version, record.agrees)
+                for record in records
+                if record.version_tags
+            ],
+            [
+                (("1.0.0",), "0.0.1", "1.0.0", False),
+                (("1.0.1",), "1.0.1", "1.0.1", True),
+                (("1.1.0",), "1.1.0", "1.1.0", True),
+                (("1.1.1",), "1.1.1", "1.1.0", False),
+                (("1.1.3",), "1.1.2", "1.1.3", False),
+            ],
+        )
+
+        self.assertEqual(records[-1].expected_version, "1.2.0")
+        self.assertEqual(records[-1].last_version_tag, "1.1.3")
+
+    def test_version_source_file_without_python_modules(self):
+        """Test that the version is read from a version source file that can import Python modules when there aren't
+        any next to it.
+        """
+        configuration = Configuration(version_source_type="setup.cfg")
+        configuration.generate()
+
+        for version_source_path in ("setup.cfg", "package/setup.cfg"):
+            with self.subTest(version_source_path=version_source_path):
+                with tempfile.TemporaryDirectory() as repository_path:
+                    create_repository(repository_path, [])
+                    os.makedirs(os.path.join(repository_path, "package"))
+
+                    with open(os.path.join(repository_path, version_source_path), "w") as f:
+                        f.write("[metadata]\nname = package\nversion = 0.0.1\n")
+
+                    git(repository_path, "add", version_source_path)
+                    git(repository_path, "commit", "--quiet", "-m", "Initial commit")
+                    git(repository_path, "tag", "0.0.1")
+
+                    records = list(audit_history(configuration, version_source_path, repository_path))
+
+                self.assertEqual([(record.file_version, record.agrees) for record in records], [("0.0.1", True)])
+
+    def test_version_imported_from_package(self):
+        """Test that a version imported from a module in a package below the version source file's directory is read."""
+        with tempfile.TemporaryDirectory() as repository_path:
+            create_repository(repository_path, [])
+            os.makedirs(os.path.join(repository_path, "mypkg"))
+
+            with open(os.path.join(repository_path, "setup.py"), "w") as f:
+                f.write("from setuptools import setup\n\nfrom mypkg import __version__\n\nsetup(version=__version__)\n")
+
+            with open(os.path.join(repository_path, "mypkg", "__init__.py"), "w") as f:
+                f.write('__version__ = "0.0.1"\n')
+
+            git(repository_path, "add", "setup.py", "mypkg")
+            git(repository_path, "commit", "--quiet", "-m", "Initial commit")
+            git(repository_path, "tag", "0.0.1")
+
+            records = list(audit_history(self.configuration, "setup.py", repository_path))
+
+        self.assertEqual([(record.file_version, record.agrees) for record in records], [("0.0.1", True)])
+
+    def test_write_report(self):
+        """Test that reports are written as CSV and JSON Lines with a summary of the disagreements."""
+        records = list(audit_history(self.configuration, "setup.py", self.repository_path))
+
+        csv_report = io.StringIO()
+        summary = write_audit_report(records, csv_report, "csv")
+        self.assertEqual(summary, {"commits": 8, "tagged_commits": 5, "disagreements": 3})
+
+        rows = list(csv.DictReader(io.StringIO(csv_report.getvalue())))
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[0]["version_tags"], "1.0.0")
+        self.assertEqual(rows[-1]["file_version"], "")
+
+        jsonl_report = io.StringIO()
+        write_audit_report(records, jsonl_report, "jsonl")
+        lines = [json.loads(line) for line in jsonl_report.getvalue().splitlines()]
+        self.assertEqual(lines[-1]["expected_version"], "1.2.0")
+        self.assertIsNone(lines[-1]["agrees"])
+
+    def test_cli(self):
+        """Test that the audit subcommand writes a report and exits with an exit code of 1 if there are
+        disagreements.
+        """
+        original_working_directory = os.getcwd()
+        report_path = os.path.join(self.repository_path, "audit.jsonl")
+
+        try:
+            os.chdir(self.repository_path)
+
+            with patch("sys.stderr"):
+                with self.assertRaises(SystemExit) as e:
+                    cli.main(["audit", "setup.py", "--format", "jsonl", "--output", report_path])
+
+        finally:
+            os.chdir(original_working_directory)
+
+        self.assertEqual(e.exception.code, 1)
+
+        with open(report_path) as f:
+            self.assertEqual(len(f.readlines()), 8)
+
+    def test_cli_uses_mkver_conf_file(self):
+        """Test that the audit subcommand uses the repository's `mkver.conf` file instead of generating a
+        configuration.
+        """
+        with open(os.path.join(TEST_DIRECTORY, "mkver.conf")) as f:
+            configuration = f.read()
+
+        # None of the repository's tags have this prefix, so none of its commits are checked against version tags.
+        with open(os.path.join(self.repository_path, "mkver.conf"), "w") as f:
+            f.write(configuration.replace('tagPrefix: ""', 'tagPrefix: "v"'))
+
+        original_working_directory = os.getcwd()
+        report_path = os.path.join(self.repository_path, "audit.jsonl")
+
+        try:
+            os.chdir(self.repository_path)
+
+            with patch("sys.stderr"):
+                with self.assertRaises(SystemExit) as e:
+                    cli.main(["audit", "setup.py", "--format", "jsonl", "--output", report_path])
+
+        finally:
+            os.chdir(original_working_directory)
+
+        self.assertEqual(e.exception.code, 0)
+
+        with open(report_path) as f:
+            records = [json.loads(line) for line in f]
+
+        self.assertEqual(len(records), 8)
+        self.assertTrue(all(not record["version_tags"] for record in records))
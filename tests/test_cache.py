@@ -0,0 +1,85 @@
+import os
+import tempfile
+import time
+import unittest
+
+from check_semantic_version.cache import CACHE_FORMAT_VERSION, ResultCache, get_cache_key
+
+
+class TestResultCache(unittest.TestCase):
+    def test_get_missing_result(self):
+        """Test that `None` is returned for a key that isn't in the cache."""
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            self.assertIsNone(ResultCache(temporary_directory).get(get_cache_key("blah")))
+
+    def test_set_and_get(self):
+        """Test that a stored result can be retrieved, including by a different cache instance for the same directory."""
+        key = get_cache_key("abc", "def")
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            ResultCache(temporary_directory).set(key, {"current_version": "1.0.0"})
+            self.assertEqual(ResultCache(temporary_directory).get(key), {"current_version": "1.0.0"})
+            self.assertTrue(
+                os.path.exists(os.path.join(temporary_directory, CACHE_FORMAT_VERSION, key[:2], f"{key}.json"))
+            )
+
+    def test_unreadable_entry_ignored(self):
+        """Test that a corrupted cache entry is treated as missing."""
+        key = get_cache_key("abc")
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            cache = ResultCache(temporary_directory)
+            cache.set(key, {"current_version": "1.0.0"})
+
+            with open(cache._get_path(key), "w") as f:
+                f.write("{not json")
+
+            with self.assertLogs() as logging_context:
+                self.assertIsNone(cache.get(key))
+
+        self.assertIn("Ignoring unreadable cache entry", logging_context.output[0])
+
+    def test_unwritable_cache_ignored(self):
+        """Test that failing to store a result (e.g. because the cache directory can't be created) is ignored."""
+        key = get_cache_key("abc")
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            path = os.path.join(temporary_directory, "file")
+
+            with open(path, "w"):
+                pass
+
+            cache = ResultCache(os.path.join(path, "cache"))
+            cache.set(key, {"current_version": "1.0.0"})
+            self.assertIsNone(cache.get(key))
+
+    def test_least_recently_used_entries_evicted(self):
+        """Test that the least recently used entries are evicted when the cache grows beyond its maximum size."""
+        keys = [get_cache_key(str(index)) for index in range(3)]
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            cache = ResultCache(temporary_directory)
+
+            for key in keys[:2]:
+                cache.set(key, {"current_version": "1.0.0"})
+
+            entry_size = os.path.getsize(cache._get_path(keys[0]))
+            cache.max_size = entry_size * 2
+
+            # Make the first entry the most recently used.
+            past = time.time() - 60
+            os.utime(cache._get_path(keys[1]), (past, past))
+            cache.get(keys[0])
+
+            cache.set(keys[2], {"current_version": "1.0.0"})
+
+            self.assertIsNotNone(cache.get(keys[0]))
+            self.assertIsNone(cache.get(keys[1]))
+            self.assertIsNotNone(cache.get(keys[2]))
+
+
+class TestGetCacheKey(unittest.TestCase):
+    def test_different_splits_give_different_keys(self):
+        """Test that the same bytes split into different parts give different keys."""
+        self.assertNotEqual(get_cache_key("ab", "c"), get_cache_key("a", "bc"))
+        self.assertEqual(get_cache_key("ab", b"c"), get_cache_key("ab", "c"))
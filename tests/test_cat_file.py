@@ -0,0 +1,133 @@
+import os
+import signal
+import subprocess
+import tempfile
+import unittest
+
+from check_semantic_version.cat_file import CatFile, CatFilePool
+from check_semantic_version.exceptions import CalledProcessError
+from tests.base import create_repository, git
+
+
+class TestCatFile(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.repository_path = self.temporary_directory.name
+
+        create_repository(
+            self.repository_path,
+            [{"write": "setup.py"}, {"commit": "Initial commit"}, {"commit": "FEA: Add a feature\n\nWith details."}],
+        )
+
+        git(self.repository_path, "tag", "-a", "1.0.0", "-m", "Release 1.0.0")
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_read_commit(self):
+        """Test that commits are read and parsed."""
+        with CatFile(self.repository_path) as cat_file:
+            commit = cat_file.read_commit("HEAD")
+
+        self.assertEqual(commit.sha, git(self.repository_path, "rev-parse", "HEAD"))
+        self.assertEqual(commit.parents, (git(self.repository_path, "rev-parse", "HEAD~1"),))
+        self.assertEqual(commit.message, "FEA: Add a feature\n\nWith details.\n")
+        self.assertIsInstance(commit.committer_timestamp, int)
+
+    def test_read_tag(self):
+        """Test that annotated tags are read and parsed."""
+        with CatFile(self.repository_path) as cat_file:
+            tag = cat_file.read_tag("refs/tags/1.0.0")
+
+        self.assertEqual(tag.tag, "1.0.0")
+        self.assertEqual(tag.type, "commit")
+        self.assertEqual(tag.object, git(self.repository_path, "rev-parse", "HEAD"))
+        self.assertEqual(tag.message, "Release 1.0.0\n")
+
+    def test_read_many_pipelined(self):
+        """Test that many requests are answered in order, including for missing objects, and that only information is
+        read with `--batch-check`.
+        """
+        names = ["HEAD", "HEAD:setup.py", "does-not-exist"] * 300
+
+        with CatFile(self.repository_path) as cat_file:
+            objects = list(cat_file.read_many(names))
+
+        with CatFile(self.repository_path, contents=False) as cat_file:
+            information = cat_file.read("HEAD:setup.py")
+
+        self.assertEqual([git_object and git_object.type for git_object in objects[:3]], ["commit", "blob", None])
+        self.assertEqual(objects[3:], objects[:-3])
+        self.assertEqual(information.type, "blob")
+        self.assertIsNone(information.content)
+        self.assertEqual(information.size, objects[1].size)
+
+    def test_stopping_early_does_not_affect_later_requests(self):
+        """Test that unread responses from a batch that was only partly iterated over are discarded."""
+        with CatFile(self.repository_path) as cat_file:
+            objects = cat_file.read_many(["HEAD", "HEAD~1", "HEAD:setup.py"])
+            next(objects)
+            objects.close()
+
+            self.assertEqual(cat_file.read("HEAD:setup.py").type, "blob")
+
+    def test_timeout(self):
+        """Test that the process is killed and an error is raised if it doesn't respond in time."""
+        cat_file = CatFile(self.repository_path, timeout=0.2)
+        os.kill(cat_file._process.pid, signal.SIGSTOP)
+
+        with self.assertRaises(subprocess.TimeoutExpired):
+            cat_file.read("HEAD")
+
+        self.assertFalse(cat_file.alive)
+
+    def test_error_raised_if_process_exits(self):
+        """Test that an error including the process's return code is raised if the process exits unexpectedly."""
+        cat_file = CatFile(self.repository_path)
+        cat_file._process.kill()
+        cat_file._process.wait()
+
+        with self.assertRaises(CalledProcessError) as context:
+            cat_file.read("HEAD")
+
+        self.assertEqual(context.exception.returncode, -signal.SIGKILL)
+
+
+class TestCatFilePool(unittest.TestCase):
+    def test_processes_reused(self):
+        """Test that free processes are reused, that processes in use aren't shared, and that closing the pool shuts
+        down the idle processes.
+        """
+        pool = CatFilePool()
+
+        with tempfile.TemporaryDirectory() as repository_path:
+            create_repository(repository_path, [{"commit": "Initial commit"}])
+
+            with pool.acquire(repository_path) as first_cat_file:
+                with pool.acquire(repository_path) as second_cat_file:
+                    self.assertIsNot(first_cat_file, second_cat_file)
+
+            with pool.acquire(repository_path) as cat_file:
+                self.assertIn(cat_file, (first_cat_file, second_cat_file))
+                self.assertEqual(cat_file.read_commit("HEAD").message, "Initial commit\n")
+
+            pool.close()
+
+        self.assertFalse(first_cat_file.alive)
+        self.assertFalse(second_cat_file.alive)
+
+    def test_failed_processes_not_reused(self):
+        """Test that a process isn't returned to the pool if an error is raised while it's in use."""
+        pool = CatFilePool()
+
+        with tempfile.TemporaryDirectory() as repository_path:
+            create_repository(repository_path, [{"commit": "Initial commit"}])
+
+            with self.assertRaises(ValueError):
+                with pool.acquire(repository_path) as failed_cat_file:
+                    raise ValueError("Something went wrong.")
+
+            with pool.acquire(repository_path) as cat_file:
+                self.assertIsNot(cat_file, failed_cat_file)
+
+            pool.close()
@@ -1,12 +1,19 @@
+import json
 import logging
 import os
+import shutil
+import subprocess
+import tempfile
+import threading
 import unittest
 from unittest.mock import patch
 
 from check_semantic_version import check_semantic_version
+from tests.base import create_repository, git
 
 TEST_DIRECTORY = os.path.abspath(os.path.dirname(__file__))
 TEST_DATA_DIRECTORY = os.path.join(TEST_DIRECTORY, "test_package")
+REAL_SUBPROCESS_RUN = subprocess.run
 
 
 class MockCompletedProcess:
@@ -20,6 +27,326 @@ class MockCompletedProcess:
         self.stdout = stdout
 
 
+def _run_with_mock_git_mkver(command, *args, **kwargs):
+    """Run a command with `subprocess.run`, except for `git-mkver`, which always gives "0.3.9".
+
+    :param list(str) command: the command to run
+    :return subprocess.CompletedProcess|MockCompletedProcess:
+    """
+    if command[0] == "git-mkver":
+        return MockCompletedProcess(stdout=b"0.3.9")
+
+    return REAL_SUBPROCESS_RUN(command, *args, **kwargs)
+
+
+class TestCheckVersionsMatch(unittest.TestCase):
+    def test_cached_result_used(self):
+        """Test that a cached result is used instead of getting the versions again when nothing has changed, and that
+        it isn't used once the version source file changes.
+        """
+        original_working_directory = os.getcwd()
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            repository_path = os.path.join(temporary_directory, "repository")
+            cache_directory = os.path.join(temporary_directory, "cache")
+            create_repository(repository_path, [{"commit": "Initial commit"}, {"tag": "0.1.0"}, {"commit": "FEA: Add"}])
+
+            with open(os.path.join(repository_path, "setup.py"), "w") as f:
+                f.write('from setuptools import setup\n\nsetup(name="blah", version="0.2.0")\n')
+
+            try:
+                os.chdir(repository_path)
+
+                with patch("sys.stdout"):
+                    self.assertTrue(
+                        check_semantic_version.check_versions_match("setup.py", cache_directory=cache_directory)
+                    )
+
+                    with patch("check_semantic_version.check_semantic_version._get_current_version") as mock_current:
+                        self.assertTrue(
+                            check_semantic_version.check_versions_match("setup.py", cache_directory=cache_directory)
+                        )
+
+                    mock_current.assert_not_called()
+
+                    with open("setup.py", "a") as f:
+                        f.write("# A change.\n")
+
+                    with patch(
+                        "check_semantic_version.check_semantic_version._get_current_version",
+                        return_value="0.2.0",
+                    ) as mock_current:
+                        check_semantic_version.check_versions_match("setup.py", cache_directory=cache_directory)
+
+                    mock_current.assert_called_once()
+
+                    # A new tag invalidates the cached result too.
+                    git(repository_path, "tag", "0.3.0")
+                    self.assertFalse(
+                        check_semantic_version.check_versions_match("setup.py", cache_directory=cache_directory)
+                    )
+
+            finally:
+                os.chdir(original_working_directory)
+
+    def test_cached_result_not_used_after_imported_version_module_changes(self):
+        """Test that a cached result isn't used once the module a `setup.py` file imports its version from changes, or
+        once this package's version changes.
+        """
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            repository_path = os.path.join(temporary_directory, "repository")
+            cache_directory = os.path.join(temporary_directory, "cache")
+            create_repository(repository_path, [{"commit": "Initial commit"}, {"tag": "0.1.0"}, {"commit": "FEA: Add"}])
+            os.makedirs(os.path.join(repository_path, "package"))
+
+            with open(os.path.join(repository_path, "setup.py"), "w") as f:
+                f.write(
+                    "from setuptools import setup\n\nfrom package import __version__\n\nsetup(version=__version__)\n"
+                )
+
+            with open(os.path.join(repository_path, "package", "__init__.py"), "w") as f:
+                f.write('__version__ = "0.2.0"\n')
+
+            with patch("sys.stdout"):
+                self.assertTrue(
+                    check_semantic_version.check_versions_match(
+                        "setup.py",
+                        cache_directory=cache_directory,
+                        repository_path=repository_path,
+                    )
+                )
+
+                with patch("importlib.metadata.version", return_value="100.0.0"):
+                    with patch(
+                        "check_semantic_version.check_semantic_version._get_current_version",
+                        return_value="0.2.0",
+                    ) as mock_current:
+                        check_semantic_version.check_versions_match(
+                            "setup.py",
+                            cache_directory=cache_directory,
+                            repository_path=repository_path,
+                        )
+
+                mock_current.assert_called_once()
+
+                with open(os.path.join(repository_path, "package", "__init__.py"), "w") as f:
+                    f.write('__version__ = "0.3.0"\n')
+
+                self.assertFalse(
+                    check_semantic_version.check_versions_match(
+                        "setup.py",
+                        cache_directory=cache_directory,
+                        repository_path=repository_path,
+                    )
+                )
+
+    def test_result_not_cached_if_version_found_by_running_code(self):
+        """Test that the result isn't cached if the current version can only be found by running the version source
+        file, as the code could read any file.
+        """
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            repository_path = os.path.join(temporary_directory, "repository")
+            cache_directory = os.path.join(temporary_directory, "cache")
+            create_repository(repository_path, [{"commit": "Initial commit"}, {"tag": "0.1.0"}, {"commit": "FEA: Add"}])
+
+            with open(os.path.join(repository_path, "version.txt"), "w") as f:
+                f.write("0.2.0\n")
+
+            with open(os.path.join(repository_path, "setup.py"), "w") as f:
+                f.write(
+                    'from setuptools import setup\n\nwith open("version.txt") as f:\n    version = f.read().strip()\n\n'
+                    "setup(version=version)\n"
+                )
+
+            with patch("sys.stdout"):
+                self.assertTrue(
+                    check_semantic_version.check_versions_match(
+                        "setup.py",
+                        cache_directory=cache_directory,
+                        repository_path=repository_path,
+                    )
+                )
+
+            self.assertFalse(os.path.exists(cache_directory))
+
+    def test_lookups_run_concurrently(self):
+        """Test that the current version and expected version lookups run at the same time and that their timings are
+        logged.
+        """
+        expected_version_lookup_started = threading.Event()
+
+        def get_current_version(*args, **kwargs):
+            # This would time out if the lookups were run one after the other.
+            self.assertTrue(expected_version_lookup_started.wait(timeout=10))
+            return "0.3.9"
+
+        def get_expected_semantic_version(*args, **kwargs):
+            expected_version_lookup_started.set()
+            return "0.3.9"
+
+        with patch(
+            "check_semantic_version.check_semantic_version._get_current_version",
+            side_effect=get_current_version,
+        ):
+            with patch(
+                "check_semantic_version.check_semantic_version._get_expected_semantic_version",
+                side_effect=get_expected_semantic_version,
+            ):
+                with patch("sys.stdout"):
+                    with self.assertLogs(level=logging.INFO) as logging_context:
+                        self.assertTrue(check_semantic_version.check_versions_match("setup.py"))
+
+        logs = "\n".join(logging_context.output)
+        self.assertIn("Finished the current version lookup in", logs)
+        self.assertIn("Finished the expected version lookup in", logs)
+
+    def test_failed_lookup_attributed_in_logs(self):
+        """Test that an error in one of the lookups is re-raised and logged with the name of the lookup."""
+        with patch("check_semantic_version.check_semantic_version._get_current_version", return_value="0.3.9"):
+            with patch(
+                "check_semantic_version.check_semantic_version._get_expected_semantic_version",
+                side_effect=ValueError("No git repository."),
+            ):
+                with self.assertLogs(level=logging.ERROR) as logging_context:
+                    with self.assertRaises(ValueError):
+                        check_semantic_version.check_versions_match("setup.py")
+
+        self.assertIn("The expected version lookup failed after", logging_context.output[0])
+        self.assertIn("No git repository.", logging_context.output[0])
+
+    def test_many_packages_checked_in_one_report(self):
+        """Test that several packages given as a glob pattern and a path with options are checked together, that a
+        package whose version can't be read fails without stopping the others being checked, and that the overall
+        result only passes if every package passes.
+        """
+        original_working_directory = os.getcwd()
+
+        with tempfile.TemporaryDirectory() as repository_path:
+            create_repository(
+                repository_path,
+                [
+                    {"write": "packages/a/pyproject.toml"},
+                    {"write": "packages/b/pyproject.toml"},
+                    {"write": "c/package.json"},
+                    {"commit": "Initial commit"},
+                    {"tag": "1.0.0"},
+                    {"tag": "c-v0.1.0"},
+                    {"write": "packages/a/module.py"},
+                    {"commit": "FEA: Add a feature to a"},
+                ],
+            )
+
+            for directory, version in (("packages/a", "1.1.0"), ("packages/b", "1.0.0")):
+                with open(os.path.join(repository_path, directory, "pyproject.toml"), "w") as f:
+                    f.write(f'[project]\nname = "blah"\nversion = "{version}"\n')
+
+            with open(os.path.join(repository_path, "c", "package.json"), "w") as f:
+                f.write("not json")
+
+            try:
+                os.chdir(repository_path)
+
+                with patch("sys.stdout") as mock_stdout:
+                    match = check_semantic_version.check_versions_match(
+                        ["packages/*/pyproject.toml", "c/package.json,tag_prefix=c-v"]
+                    )
+
+            finally:
+                os.chdir(original_working_directory)
+
+        self.assertFalse(match)
+
+        messages = [call.args[0] for call in mock_stdout.method_calls if call.args and call.args[0].strip()]
+        self.assertIn("PASSED:", messages[0])
+        self.assertIn("packages/a/pyproject.toml: 1.1.0", messages[0])
+        self.assertIn("PASSED:", messages[1])
+        self.assertIn("packages/b/pyproject.toml: 1.0.0", messages[1])
+        self.assertIn("FAILED:", messages[2])
+        self.assertIn("c/package.json: The current version couldn't be read", messages[2])
+        self.assertIn("VERSION FAILED CHECKS:", messages[3])
+        self.assertIn("1 of 3 packages failed.", messages[3])
+
+    def test_single_package_in_subdirectory_uses_whole_history(self):
+        """Test that every commit counts towards the version of a single package that isn't at the repository root, but
+        only the commits changing files in each package's directory count when several packages are checked.
+        """
+        with tempfile.TemporaryDirectory() as repository_path:
+            create_repository(
+                repository_path,
+                [
+                    {"write": "a/setup.py"},
+                    {"write": "b/setup.py"},
+                    {"commit": "Initial commit"},
+                    {"tag": "1.0.0"},
+                    {"write": "README.md"},
+                    {"commit": "FEA: Add a feature to the documentation"},
+                ],
+            )
+
+            for directory, version in (("a", "1.1.0"), ("b", "1.1.0")):
+                with open(os.path.join(repository_path, directory, "setup.py"), "w") as f:
+                    f.write(f'from setuptools import setup\n\nsetup(name="{directory}", version="{version}")\n')
+
+            with patch("sys.stdout"):
+                self.assertTrue(
+                    check_semantic_version.check_versions_match("a/setup.py", repository_path=repository_path)
+                )
+
+                self.assertFalse(
+                    check_semantic_version.check_versions_match(
+                        ["a/setup.py", "b/setup.py"], repository_path=repository_path
+                    )
+                )
+
+
+class TestParsePackageSpecification(unittest.TestCase):
+    def test_path_without_options(self):
+        """Test that a path without options is given the default options."""
+        self.assertEqual(
+            check_semantic_version.parse_package_specification("setup.py", breaking_change_indicated_by="minor"),
+            [check_semantic_version.Package(path="setup.py", breaking_change_indicated_by="minor")],
+        )
+
+    def test_path_with_options(self):
+        """Test that per-path options override the defaults."""
+        self.assertEqual(
+            check_semantic_version.parse_package_specification(
+                "a/setup.py,tag_prefix=a-v,breaking_change_indicated_by=patch"
+            ),
+            [check_semantic_version.Package(path="a/setup.py", tag_prefix="a-v", breaking_change_indicated_by="patch")],
+        )
+
+    def test_error_raised_for_unknown_option(self):
+        """Test that an error is raised if a specification has an unknown or malformed option."""
+        for specification in ("setup.py,prefix=a-", "setup.py,tag_prefix"):
+            with self.subTest(specification=specification):
+                with self.assertRaises(ValueError):
+                    check_semantic_version.parse_package_specification(specification)
+
+    def test_glob_pattern_expanded(self):
+        """Test that a glob pattern is expanded into a package for each matching file and that an error is raised if
+        it doesn't match any files.
+        """
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            for name in ("b", "a"):
+                os.makedirs(os.path.join(temporary_directory, name))
+                open(os.path.join(temporary_directory, name, "setup.py"), "w").close()
+
+            packages = check_semantic_version.parse_package_specification(
+                os.path.join(temporary_directory, "*", "setup.py") + ",tag_prefix=v"
+            )
+
+            with self.assertRaises(ValueError):
+                check_semantic_version.parse_package_specification(os.path.join(temporary_directory, "*", "setup.cfg"))
+
+        self.assertEqual(
+            [package.path for package in packages],
+            [os.path.join(temporary_directory, name, "setup.py") for name in ("a", "b")],
+        )
+
+        self.assertTrue(all(package.tag_prefix == "v" for package in packages))
+
+
 class TestGetCurrentVersion(unittest.TestCase):
     def test_error_raised_if_unsupported_version_source_provided(self):
         """Ensure an error is raised if an unsupported version source is provided."""
@@ -32,6 +359,76 @@ class TestGetCurrentVersion(unittest.TestCase):
         version = check_semantic_version._get_current_version(path, version_source_type="setup.py")
         self.assertEqual(version, "0.3.4")
 
+    def test_get_current_version_for_setup_py_does_not_execute_static_setup_py(self):
+        """Test that the version is read from a `setup.py` file with a literal version without executing it."""
+        path = os.path.join(TEST_DATA_DIRECTORY, "setup.py")
+
+        with self.assertLogs(level=logging.INFO) as logging_context:
+            with patch("subprocess.run") as mock_run:
+                version = check_semantic_version._get_current_version(path, version_source_type="setup.py")
+
+        self.assertEqual(version, "0.3.4")
+        mock_run.assert_not_called()
+        self.assertIn("Current version (read statically): 0.3.4", logging_context.output[-1])
+
+    def test_get_current_version_for_setup_py_with_module_level_constant(self):
+        """Test that a version given as a module-level constant in a `setup.py` file is read statically."""
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            path = os.path.join(temporary_directory, "setup.py")
+
+            with open(path, "w") as f:
+                f.write('import setuptools\n\nVERSION = "1.0.2"\n\nsetuptools.setup(name="blah", version=VERSION)\n')
+
+            with patch("subprocess.run") as mock_run:
+                version = check_semantic_version._get_current_version(path, version_source_type="setup.py")
+
+        self.assertEqual(version, "1.0.2")
+        mock_run.assert_not_called()
+
+    def test_get_current_version_for_setup_py_with_imported_version(self):
+        """Test that a `__version__` variable imported from a local package into a `setup.py` file is read statically,
+        including when the package itself imports it from a submodule.
+        """
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            package_directory = os.path.join(temporary_directory, "src", "blah")
+            os.makedirs(package_directory)
+
+            with open(os.path.join(package_directory, "__init__.py"), "w") as f:
+                f.write("from ._version import __version__\n")
+
+            with open(os.path.join(package_directory, "_version.py"), "w") as f:
+                f.write('__version__: str = "3.2.1"\n')
+
+            for setup_py in (
+                "from setuptools import setup\nfrom blah import __version__\nsetup(version=__version__)\n",
+                "from setuptools import setup\nimport blah\nsetup(version=blah.__version__)\n",
+            ):
+                with self.subTest(setup_py=setup_py):
+                    path = os.path.join(temporary_directory, "setup.py")
+
+                    with open(path, "w") as f:
+                        f.write(setup_py)
+
+                    with patch("subprocess.run") as mock_run:
+                        version = check_semantic_version._get_current_version(path, version_source_type="setup.py")
+
+                    self.assertEqual(version, "3.2.1")
+                    mock_run.assert_not_called()
+
+    def test_get_current_version_for_setup_py_with_dynamic_version_falls_back_to_executing_it(self):
+        """Test that a `setup.py` file with a dynamically-computed version is executed to get the version."""
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            path = os.path.join(temporary_directory, "setup.py")
+
+            with open(path, "w") as f:
+                f.write('from setuptools import setup\n\nsetup(name="blah", version=".".join(["1", "7", "0"]))\n')
+
+            with self.assertLogs(level=logging.INFO) as logging_context:
+                version = check_semantic_version._get_current_version(path, version_source_type="setup.py")
+
+        self.assertEqual(version, "1.7.0")
+        self.assertIn("is dynamic. Falling back to executing it.", logging_context.output[1])
+
     def test_get_current_version_for_pyproject_toml(self):
         """Test that the current version can be extracted from a `pyproject.toml` file."""
         path = os.path.join(TEST_DATA_DIRECTORY, "pyproject.toml")
@@ -47,33 +444,202 @@ class TestGetCurrentVersion(unittest.TestCase):
 
         self.assertEqual(version, "0.6.3")
 
+    def test_get_current_version_for_pep_621_pyproject_toml(self):
+        """Test that the current version can be extracted from the `[project]` table of a `pyproject.toml` file without
+        running Poetry.
+        """
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            path = os.path.join(temporary_directory, "pyproject.toml")
+
+            with open(path, "w") as f:
+                f.write('[project]\nname = "blah"\nversion = "2.1.0"\n\n[tool.poetry]\nversion = "0.0.1"\n')
+
+            with patch("subprocess.run") as mock_run:
+                version = check_semantic_version._get_current_version(path, version_source_type="pyproject.toml")
+
+        self.assertEqual(version, "2.1.0")
+        mock_run.assert_not_called()
+
+    def test_get_current_version_for_pyproject_toml_with_dynamic_version_falls_back_to_poetry(self):
+        """Test that Poetry is used to get the current version from a `pyproject.toml` file with a dynamic version."""
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            path = os.path.join(temporary_directory, "pyproject.toml")
+
+            with open(path, "w") as f:
+                f.write('[project]\nname = "blah"\ndynamic = ["version"]\n')
+
+            with patch("subprocess.run", return_value=MockCompletedProcess(stdout=b"1.2.3\n")) as mock_run:
+                version = check_semantic_version._get_current_version(path, version_source_type="pyproject.toml")
+
+        self.assertEqual(version, "1.2.3")
+        self.assertEqual(mock_run.call_args.args[0][:3], ["poetry", "version", "-s"])
+
     def test_get_current_version_for_package_json(self):
         """Test that the current version can be extracted from a top-level `package.json` file."""
         path = os.path.join(TEST_DATA_DIRECTORY, "package.json")
         version = check_semantic_version._get_current_version(path, version_source_type="package.json")
         self.assertEqual(version, "1.5.3")
 
+    def test_get_current_version_for_package_json_without_version(self):
+        """Test that "null" is returned for a `package.json` file without a version, matching `jq`'s output."""
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            path = os.path.join(temporary_directory, "package.json")
+
+            with open(path, "w") as f:
+                json.dump({"name": "blah"}, f)
+
+            version = check_semantic_version._get_current_version(path, version_source_type="package.json")
+
+        self.assertEqual(version, "null")
+
+    def test_get_current_version_for_package_json_with_repeated_version(self):
+        """Test that the last top-level version is used if a `package.json` file repeats the key (as `jq` does) and that
+        versions of dependencies are ignored.
+        """
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            path = os.path.join(temporary_directory, "package.json")
+
+            with open(path, "w") as f:
+                f.write('{"version": "1.0.0", "dependencies": {"blah": {"version": "9.9.9"}}, "version": "4.0.1"}')
+
+            version = check_semantic_version._get_current_version(path, version_source_type="package.json")
+
+        self.assertEqual(version, "4.0.1")
+
 
 class TestGetExpectedSemanticVersion(unittest.TestCase):
-    def test_get_expected_semantic_version(self):
-        """Test that the expected semantic version can be parsed from a successful `git-mkver` command."""
-        with patch("subprocess.run", return_value=MockCompletedProcess(stdout=b"0.3.9")):
-            version = check_semantic_version._get_expected_semantic_version(
-                version_source_type="setup.py",
-                breaking_change_indicated_by="minor",
+    def test_get_expected_semantic_version_with_mkver_conf_file(self):
+        """Test that the expected semantic version is calculated in-process with a `mkver.conf` file in the repository
+        and that a warning explains why the `breaking_change_indicated_by` input is ignored.
+        """
+        with tempfile.TemporaryDirectory() as repository_path:
+            create_repository(
+                repository_path,
+                [{"commit": "Initial commit"}, {"tag": "0.3.8"}, {"commit": "BREAKING CHANGE: Remove something"}],
             )
-            self.assertEqual(version, "0.3.9")
 
-    def test_mkver_conf_file_generated_if_not_present_in_current_working_directory(self):
-        """Test that a `mkver.conf` file is generated if one is not already present in the current working directory."""
+            shutil.copy(os.path.join(TEST_DIRECTORY, "mkver.conf"), repository_path)
+
+            with self.assertLogs(level=logging.WARNING) as logging_context:
+                with patch("subprocess.run", wraps=subprocess.run) as mock_run:
+                    version = check_semantic_version._get_expected_semantic_version(
+                        version_source_type="setup.py",
+                        breaking_change_indicated_by="minor",
+                        repository_path=repository_path,
+                    )
+
+        self.assertEqual(version, "1.0.0")
+        self.assertNotIn("git-mkver", [call.args[0][0] for call in mock_run.call_args_list])
+
+        self.assertEqual(
+            logging_context.records[0].message,
+            f"The commit message actions in the `mkver.conf` file at {os.path.join(repository_path, 'mkver.conf')!r} "
+            "make breaking changes increment the major number. Ignoring the `breaking_change_indicated_by` input "
+            "('minor').",
+        )
+
+    def test_git_mkver_used_if_mkver_conf_file_uses_unsupported_features(self):
+        """Test that `git-mkver` is used if the `mkver.conf` file uses features that can't be calculated in-process."""
+        with tempfile.TemporaryDirectory() as repository_path:
+            create_repository(repository_path, [{"commit": "Initial commit"}])
+            config_path = os.path.join(repository_path, "mkver.conf")
+
+            with open(config_path, "w") as f:
+                f.write('branches: [{pattern: "main", includeBuildMetaData: true}]\n')
+
+            with self.assertLogs(level=logging.WARNING) as logging_context:
+                with patch("subprocess.run", side_effect=_run_with_mock_git_mkver) as mock_run:
+                    version = check_semantic_version._get_expected_semantic_version(
+                        version_source_type="setup.py",
+                        breaking_change_indicated_by="major",
+                        repository_path=repository_path,
+                    )
+
+        self.assertEqual(version, "0.3.9")
+        self.assertEqual(mock_run.call_args.args[0], ["git-mkver", "-c", config_path, "next"])
+        self.assertIn("uses the 'branches' section", logging_context.records[0].message)
+
+    def test_many_packages_checked_in_one_pass_with_mkver_conf_file(self):
+        """Test that the expected versions of several packages are calculated in a single in-process pass with a
+        `mkver.conf` file in the repository.
+        """
+        with tempfile.TemporaryDirectory() as repository_path:
+            create_repository(
+                repository_path,
+                [
+                    {"write": "a/setup.py"},
+                    {"write": "b/setup.py"},
+                    {"commit": "Initial commit"},
+                    {"tag": "0.3.8"},
+                    {"write": "a/module.py"},
+                    {"commit": "FEA: Add a feature to a"},
+                ],
+            )
+
+            shutil.copy(os.path.join(TEST_DIRECTORY, "mkver.conf"), repository_path)
+
+            with patch("subprocess.run", wraps=subprocess.run) as mock_run:
+                versions = check_semantic_version._get_expected_semantic_versions(
+                    [
+                        check_semantic_version.Package(path=os.path.join(repository_path, "a", "setup.py")),
+                        check_semantic_version.Package(path=os.path.join(repository_path, "b", "setup.py")),
+                    ],
+                    repository_path=repository_path,
+                )
+
+        self.assertEqual(versions, ["0.4.0", "0.3.8"])
+        self.assertNotIn("git-mkver", [call.args[0][0] for call in mock_run.call_args_list])
+
+    def test_ignored_tag_prefix_warned_about_with_mkver_conf_file(self):
+        """Test that a warning is logged if a package's tag prefix is ignored because there's a `mkver.conf` file in the
+        repository.
+        """
+        with tempfile.TemporaryDirectory() as repository_path:
+            create_repository(
+                repository_path,
+                [{"write": "a/setup.py"}, {"write": "b/setup.py"}, {"commit": "Initial commit"}, {"tag": "0.3.8"}],
+            )
+
+            shutil.copy(os.path.join(TEST_DIRECTORY, "mkver.conf"), repository_path)
+
+            with self.assertLogs(level=logging.WARNING) as logging_context:
+                versions = check_semantic_version._get_expected_semantic_versions(
+                    [
+                        check_semantic_version.Package(path=os.path.join(repository_path, "a", "setup.py")),
+                        check_semantic_version.Package(
+                            path=os.path.join(repository_path, "b", "setup.py"),
+                            tag_prefix="b-v",
+                        ),
+                    ],
+                    repository_path=repository_path,
+                )
+
+        self.assertEqual(versions, ["0.3.8", "0.3.8"])
+
+        self.assertEqual(
+            [message for message in logging_context.output if "tag prefix" in message],
+            [
+                "WARNING:check_semantic_version.check_semantic_version:The `mkver.conf` file at "
+                f"{os.path.join(repository_path, 'mkver.conf')!r} sets the tag prefix to ''. Ignoring the `tag_prefix` "
+                "input ('b-v')."
+            ],
+        )
+
+    def test_configuration_generated_if_mkver_conf_file_not_present_in_current_working_directory(self):
+        """Test that a configuration is generated and the expected version is calculated in-process if there isn't a
+        `mkver.conf` file in the current working directory.
+        """
         original_working_directory = os.getcwd()
 
         try:
             os.chdir(TEST_DATA_DIRECTORY)
 
             with self.assertLogs(level=logging.WARNING) as logging_context:
-                with patch("subprocess.run", return_value=MockCompletedProcess(stdout=b"0.3.9")):
-                    check_semantic_version._get_expected_semantic_version(
+                with patch(
+                    "check_semantic_version.check_semantic_version.get_expected_version",
+                    return_value="0.3.9",
+                ) as mock_get_expected_version:
+                    version = check_semantic_version._get_expected_semantic_version(
                         "setup.py",
                         breaking_change_indicated_by="minor",
                     )
@@ -81,4 +647,8 @@ class TestGetExpectedSemanticVersion(unittest.TestCase):
         finally:
             os.chdir(original_working_directory)
 
+        self.assertEqual(version, "0.3.9")
         self.assertEqual(logging_context.records[0].message, "No `mkver.conf` file found. Generating one instead.")
+
+        configuration = mock_get_expected_version.call_args.args[0]
+        self.assertEqual(configuration.commit_message_actions[0]["action"], "IncrementMinor")
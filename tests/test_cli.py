@@ -1,14 +1,24 @@
+import io
 import os
+import subprocess
+import sys
 import unittest
 from unittest.mock import patch
 
 from check_semantic_version import cli
+from check_semantic_version.daemon import SOCKET_PATH_ENVIRONMENT_VARIABLE
 
 TEST_DIRECTORY = os.path.abspath(os.path.dirname(__file__))
 TEST_DATA_DIRECTORY = os.path.join(TEST_DIRECTORY, "test_package")
 
 
 class TestCLI(unittest.TestCase):
+    def setUp(self):
+        # Make sure checks are run in-process even if a daemon is running on this machine.
+        patcher = patch.dict(os.environ, {SOCKET_PATH_ENVIRONMENT_VARIABLE: os.path.join(TEST_DIRECTORY, "no.sock")})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_cli_with_matching_versions(self):
         """Test that the correct message and error message are returned if the current version and the expected version
         are the same.
@@ -74,3 +84,74 @@ class TestCLI(unittest.TestCase):
                         "The current version (0.5.3) is different from the expected semantic version (0.3.9).",
                         message,
                     )
+
+    def test_cli_with_many_paths(self):
+        """Test that several paths and a trailing `breaking_change_indicated_by` argument are passed through."""
+        with patch("check_semantic_version.cli.check_versions_match", return_value=True) as mock_check_versions_match:
+            with self.assertRaises(SystemExit) as e:
+                cli.main(["a/setup.py", "b/package.json,tag_prefix=b-", "minor"])
+
+        self.assertEqual(e.exception.code, 0)
+
+        mock_check_versions_match.assert_called_once_with(
+            ["a/setup.py", "b/package.json,tag_prefix=b-"],
+            "minor",
+            cache_directory=None,
+            base_ref=None,
+        )
+
+    def test_breaking_change_indicated_by_option(self):
+        """Test that the `--breaking-change-indicated-by` option is passed through and that a path matching one of its
+        choices isn't mistaken for the deprecated positional argument when it's given.
+        """
+        with patch("check_semantic_version.cli.check_versions_match", return_value=True) as mock_check_versions_match:
+            with self.assertRaises(SystemExit) as e:
+                cli.main(["a/setup.py", "patch", "--breaking-change-indicated-by", "minor"])
+
+        self.assertEqual(e.exception.code, 0)
+
+        mock_check_versions_match.assert_called_once_with(
+            ["a/setup.py", "patch"],
+            "minor",
+            cache_directory=None,
+            base_ref=None,
+        )
+
+    def test_slow_modules_not_imported_at_start_up(self):
+        """Test that importing the CLI doesn't import the modules only some commands need or configure logging."""
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import logging, sys, check_semantic_version.cli; "
+                "print(sorted(name for name in ('pyhocon', 'importlib.metadata', 'check_semantic_version.audit', "
+                "'check_semantic_version.fleet') if name in sys.modules)); print(len(logging.getLogger().handlers))",
+            ],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+
+        self.assertEqual(process.stdout.splitlines(), ["[]", "0"])
+
+    def test_version(self):
+        """Test that the `--version` option prints the version of the CLI."""
+        with patch("sys.stdout", new_callable=io.StringIO) as mock_stdout:
+            with self.assertRaises(SystemExit) as e:
+                cli.main(["--version"])
+
+        self.assertEqual(e.exception.code, 0)
+        self.assertRegex(mock_stdout.getvalue(), r"^\d+\.\d+\.\d+\n$")
+
+    def test_subcommands_run_as_module(self):
+        """Test that every subcommand can be run with `python -m check_semantic_version.cli`."""
+        for subcommand in ("audit", "fleet", "serve"):
+            with self.subTest(subcommand=subcommand):
+                process = subprocess.run(
+                    [sys.executable, "-m", "check_semantic_version.cli", subcommand, "--help"],
+                    capture_output=True,
+                    text=True,
+                )
+
+                self.assertEqual(process.returncode, 0, process.stderr)
+                self.assertIn(f"check-semantic-version {subcommand}", process.stdout)
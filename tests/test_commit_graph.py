@@ -0,0 +1,116 @@
+import itertools
+import subprocess
+import tempfile
+import unittest
+
+from check_semantic_version.cat_file import CatFile
+from check_semantic_version.commit_graph import CommitGraph
+from check_semantic_version.object_store import ObjectStore
+from check_semantic_version.tag_index import TagIndex
+from tests.base import create_repository, git
+
+HISTORY = [
+    {"commit": "Initial commit"},
+    {"tag": "1.0.0"},
+    {"branch": "first"},
+    {"commit": "FEA: Add a feature"},
+    {"checkout": "main"},
+    {"branch": "second"},
+    {"commit": "FIX: Fix a bug"},
+    {"checkout": "main"},
+    {"branch": "third"},
+    {"commit": "DOC: Update the documentation"},
+    {"tag": "2.0.0"},
+    {"checkout": "main"},
+    {"commit": "REF: Tidy up"},
+    {"merge": "first"},
+]
+
+
+class TestCommitGraph(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.repository_path = self.temporary_directory.name
+        create_repository(self.repository_path, HISTORY)
+
+        # An octopus merge has its extra parents stored in the commit-graph's extra edge list.
+        git(self.repository_path, "merge", "--quiet", "--no-ff", "-m", "Merge branches", "second", "third")
+        git(self.repository_path, "commit-graph", "write", "--reachable")
+        self.common_directory = git(self.repository_path, "rev-parse", "--path-format=absolute", "--git-common-dir")
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def _assert_same_as_git(self, commit_graph):
+        """Check that the commit-graph's parents and ancestry agree with `git` for every pair of commits.
+
+        :param check_semantic_version.commit_graph.CommitGraph commit_graph:
+        :return None:
+        """
+        rev_list = [line.split() for line in git(self.repository_path, "rev-list", "--parents", "--all").splitlines()]
+
+        with CatFile(self.repository_path) as cat_file:
+
+            def read_parents(sha):
+                return cat_file.read_commit(sha).parents
+
+            for sha, *parents in rev_list:
+                position = commit_graph.find(sha)
+
+                if position is not None:
+                    self.assertEqual(commit_graph.get_sha(position), sha)
+                    self.assertEqual(
+                        [commit_graph.get_sha(parent) for parent in commit_graph.get_parents(position)], parents
+                    )
+
+            for ancestor, descendant in itertools.product([line[0] for line in rev_list], repeat=2):
+                with self.subTest(ancestor=ancestor, descendant=descendant):
+                    expected = not subprocess.run(
+                        ["git", "merge-base", "--is-ancestor", ancestor, descendant],
+                        cwd=self.repository_path,
+                    ).returncode
+
+                    self.assertEqual(commit_graph.is_ancestor(ancestor, descendant, read_parents), expected)
+
+    def test_single_file(self):
+        """Test that a single commit-graph file is read correctly, including commits made since it was written."""
+        git(self.repository_path, "commit", "--quiet", "--allow-empty", "-m", "FIX: A commit not in the commit-graph")
+        commit_graph = CommitGraph.load(self.common_directory)
+        self.assertIsNone(commit_graph.find(git(self.repository_path, "rev-parse", "HEAD")))
+        self._assert_same_as_git(commit_graph)
+
+        # Generations always increase from parents to children.
+        for position in range(commit_graph.number_of_commits):
+            for parent in commit_graph.get_parents(position):
+                self.assertLess(commit_graph.get_generation(parent), commit_graph.get_generation(position))
+
+        commit_graph.close()
+
+    def test_split_chain(self):
+        """Test that a chain of split commit-graph files is read correctly."""
+        git(self.repository_path, "commit", "--quiet", "--allow-empty", "-m", "FIX: A commit in a new layer")
+        git(self.repository_path, "commit-graph", "write", "--reachable", "--split=no-merge")
+        commit_graph = CommitGraph.load(self.common_directory)
+        self.assertEqual(len(commit_graph._layers), 2)
+        self._assert_same_as_git(commit_graph)
+        commit_graph.close()
+
+    def test_no_commit_graph(self):
+        """Test that `None` is returned if the repository doesn't have a commit-graph."""
+        with tempfile.TemporaryDirectory() as repository_path:
+            create_repository(repository_path, [{"commit": "Initial commit"}])
+            self.assertIsNone(
+                CommitGraph.load(git(repository_path, "rev-parse", "--path-format=absolute", "--git-common-dir"))
+            )
+
+    def test_tag_index_uses_commit_graph(self):
+        """Test that the tag index resolves reachability with the commit-graph for both git backends."""
+        with ObjectStore(self.repository_path) as object_store:
+            for tag_index in (
+                TagIndex(self.repository_path, use_cache=False),
+                TagIndex(self.repository_path, use_cache=False, object_store=object_store),
+            ):
+                self.assertIsNotNone(tag_index.commit_graph)
+                self.assertEqual(tag_index.get_last_reachable_tag().name, "2.0.0")
+                self.assertEqual(tag_index.get_last_reachable_tag("first").name, "1.0.0")
+                self.assertFalse(tag_index.is_ancestor("0" * 40))
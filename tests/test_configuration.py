@@ -1,11 +1,17 @@
 import json
+import os
 import tempfile
 from unittest import TestCase
+from unittest.mock import patch
 
 from pyhocon import ConfigFactory, HOCONConverter
 
+from check_semantic_version import configuration as configuration_module
 from check_semantic_version.configuration import Configuration
 
+TEST_DIRECTORY = os.path.abspath(os.path.dirname(__file__))
+EXAMPLES_DIRECTORY = os.path.join(os.path.dirname(TEST_DIRECTORY), "examples")
+
 
 class TestConfiguration(TestCase):
     def test_generate_with_setup_py_version_source(self):
@@ -129,3 +135,122 @@ class TestConfiguration(TestCase):
                 ],
             },
         )
+
+
+class TestConfigurationFromFile(TestCase):
+    def test_from_file(self):
+        """Test that a `mkver.conf` file is compiled into the same form as a generated configuration."""
+        configuration = Configuration.from_file(os.path.join(TEST_DIRECTORY, "mkver.conf"), "setup.py")
+
+        self.assertEqual(configuration.tag_prefix, "")
+        self.assertEqual(configuration.breaking_change_indicated_by, "major")
+        self.assertEqual(configuration.when_no_valid_commit_messages, "IncrementPatch")
+        self.assertEqual(configuration.unsupported_features, [])
+        self.assertEqual(configuration._configuration["defaults"]["patches"], ["setup.py"])
+        self.assertEqual(configuration._configuration["patches"][0]["filePatterns"], ["setup.cfg"])
+
+        self.assertEqual(
+            configuration.commit_message_actions,
+            [
+                {"pattern": "BREAKING CHANGE|BREAKING-CHANGE", "action": "IncrementMajor"},
+                {"pattern": "FEA:", "action": "IncrementMinor"},
+            ],
+        )
+
+    def test_from_file_matches_generated_configuration(self):
+        """Test that loading a written generated configuration gives the same configuration back."""
+        generated = Configuration(version_source_type="pyproject.toml", breaking_change_indicated_by="minor")
+        generated.generate()
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            path = os.path.join(temporary_directory, "mkver.conf")
+            generated.write(path)
+            loaded = Configuration.from_file(path, "pyproject.toml")
+
+        self.assertEqual(loaded._configuration, generated._configuration)
+        self.assertEqual(loaded.digest, generated.digest)
+        self.assertEqual(loaded.breaking_change_indicated_by, "minor")
+
+    def test_breaking_change_number_of_beta_example(self):
+        """Test that the number breaking changes increment is worked out from the commit message actions."""
+        configuration = Configuration.from_file(os.path.join(EXAMPLES_DIRECTORY, "mkver-for-beta-versions.conf"), "x")
+        self.assertEqual(configuration.breaking_change_indicated_by, "minor")
+
+    def test_compiled_configuration_cached(self):
+        """Test that the compiled configuration is cached so the file is only parsed again once it changes."""
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            path = os.path.join(temporary_directory, "mkver.conf")
+            cache_directory = os.path.join(temporary_directory, "cache")
+
+            with open(os.path.join(TEST_DIRECTORY, "mkver.conf")) as f:
+                contents = f.read()
+
+            with open(path, "w") as f:
+                f.write(contents)
+
+            with patch(
+                "check_semantic_version.configuration._compile_configuration",
+                wraps=configuration_module._compile_configuration,
+            ) as mock_compile_configuration:
+                first = Configuration.from_file(path, "setup.py", cache_directory=cache_directory)
+                second = Configuration.from_file(path, "setup.py", cache_directory=cache_directory)
+                self.assertEqual(mock_compile_configuration.call_count, 1)
+                self.assertEqual(first._configuration, second._configuration)
+
+                with open(path, "w") as f:
+                    f.write(contents.replace('tagPrefix: ""', 'tagPrefix: "v"'))
+
+                third = Configuration.from_file(path, "setup.py", cache_directory=cache_directory)
+
+            self.assertEqual(mock_compile_configuration.call_count, 2)
+            self.assertEqual(third.tag_prefix, "v")
+            self.assertEqual(len(os.listdir(cache_directory)), 2)
+
+    def test_invalid_files_rejected(self):
+        """Test that files that can't be parsed or aren't valid `git-mkver` configurations are rejected."""
+        cases = [
+            ("defaults {", "couldn't be parsed"),
+            ("tagPrefix: [1]", "`tagPrefix` must be a string"),
+            ("defaults.whenNoValidCommitMessages: IncrementEverything", "`defaults.whenNoValidCommitMessages` must be"),
+            ("patches: [{name: a}]", "each patch must have"),
+            ("defaults.patches: [a]", "the default patch 'a' isn't defined"),
+            ('commitMessageActions: [{pattern: "FEA:", action: Increment}]', "the action of the pattern 'FEA:'"),
+            ("commitMessageActions: [{action: IncrementMinor}]", "must have a `pattern` string"),
+        ]
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            path = os.path.join(temporary_directory, "mkver.conf")
+
+            for contents, message in cases:
+                with self.subTest(contents=contents):
+                    with open(path, "w") as f:
+                        f.write(contents)
+
+                    with self.assertRaises(ValueError) as context:
+                        Configuration.from_file(path, "setup.py")
+
+                    self.assertIn(message, str(context.exception))
+
+    def test_unsupported_features(self):
+        """Test that features only `git-mkver` supports are reported."""
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            path = os.path.join(temporary_directory, "mkver.conf")
+
+            with open(path, "w") as f:
+                f.write(
+                    'branches: [{pattern: "main"}]\n'
+                    "defaults.includeBuildMetaData: true\n"
+                    'commitMessageActions: [{pattern: "(?<x>FEA)", action: IncrementMinor}]\n'
+                )
+
+            configuration = Configuration.from_file(path, "setup.py")
+
+        self.assertEqual(
+            configuration.unsupported_features,
+            [
+                "the 'branches' section",
+                "build metadata (`includeBuildMetaData` isn't set to `false`)",
+                "`git-mkver`'s default `whenNoValidCommitMessages` action",
+                "the pattern '(?<x>FEA)', which isn't a valid Python regular expression",
+            ],
+        )
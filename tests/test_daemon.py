@@ -0,0 +1,192 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from check_semantic_version import cli
+from check_semantic_version.check_semantic_version import check_versions_match
+from check_semantic_version.daemon import SOCKET_PATH_ENVIRONMENT_VARIABLE, CheckServer, request_check
+from tests.base import create_repository, git
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.repository_path = os.path.join(self.temporary_directory.name, "repository")
+        self.socket_path = os.path.join(self.temporary_directory.name, "daemon.sock")
+
+        create_repository(self.repository_path, [{"commit": "Initial commit"}, {"tag": "0.1.0"}])
+        self._write_version("0.1.1")
+        git(self.repository_path, "add", "package.json")
+        git(self.repository_path, "commit", "--quiet", "-m", "FIX: Fix a bug")
+
+        self.server = CheckServer(self.socket_path)
+        self.server_thread = threading.Thread(target=self.server.serve_forever)
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server_thread.join()
+        self.server.server_close()
+        self.temporary_directory.cleanup()
+
+    def _write_version(self, version):
+        """Write a `package.json` file with the given version to the repository.
+
+        :param str version: the version
+        :return None:
+        """
+        with open(os.path.join(self.repository_path, "package.json"), "w") as f:
+            json.dump({"name": "package", "version": version}, f)
+
+    def _request_check(self):
+        """Ask the daemon to check the repository's `package.json` file.
+
+        :return dict|None: the daemon's response
+        """
+        return request_check("package.json", repository_path=self.repository_path, socket_path=self.socket_path)
+
+    def test_check_answered(self):
+        """Test that the daemon runs checks and sends back their results and output."""
+        response = self._request_check()
+        self.assertTrue(response["passed"])
+        self.assertIsNone(response["error"])
+        self.assertIn("The current version is the same as the expected semantic version: 0.1.1.", response["output"])
+        self.assertEqual(oct(os.stat(self.socket_path).st_mode & 0o777), oct(0o600))
+
+    def test_result_reused_until_state_changes(self):
+        """Test that repeated requests are answered from memory until a new commit is made or the version source file
+        changes.
+        """
+        with patch("check_semantic_version.daemon.RACY_REFS_INTERVAL", 0):
+            with patch(
+                "check_semantic_version.daemon.check_versions_match",
+                wraps=check_versions_match,
+            ) as mock_check_versions_match:
+                self.assertTrue(self._request_check()["passed"])
+                self.assertTrue(self._request_check()["passed"])
+                self.assertEqual(mock_check_versions_match.call_count, 1)
+
+                git(self.repository_path, "commit", "--quiet", "--allow-empty", "-m", "FEA: Add a feature")
+                self.assertFalse(self._request_check()["passed"])
+                self.assertEqual(mock_check_versions_match.call_count, 2)
+
+                self._write_version("0.2.0")
+                self.assertTrue(self._request_check()["passed"])
+                self.assertEqual(mock_check_versions_match.call_count, 3)
+
+    def test_result_not_reused_after_imported_version_module_changes(self):
+        """Test that a result is recalculated when the module a `setup.py` file imports its version from changes."""
+        os.makedirs(os.path.join(self.repository_path, "package"))
+
+        with open(os.path.join(self.repository_path, "setup.py"), "w") as f:
+            f.write("from setuptools import setup\nfrom package import __version__\n\nsetup(version=__version__)\n")
+
+        for version, passed in (("0.1.1", True), ("0.10.0", False)):
+            with self.subTest(version=version):
+                with open(os.path.join(self.repository_path, "package", "__init__.py"), "w") as f:
+                    f.write(f'__version__ = "{version}"\n')
+
+                with patch("check_semantic_version.daemon.RACY_REFS_INTERVAL", 0):
+                    response = request_check(
+                        "setup.py",
+                        repository_path=self.repository_path,
+                        socket_path=self.socket_path,
+                    )
+
+                self.assertEqual(response["passed"], passed)
+
+    def test_dynamic_version_run_in_repository_and_not_reused(self):
+        """Test that a `setup.py` file reading a file relative to the working directory is executed in its own
+        directory rather than the daemon's, and that its result isn't reused as the code could read any file.
+        """
+        with open(os.path.join(self.repository_path, "version.txt"), "w") as f:
+            f.write("0.1.1\n")
+
+        with open(os.path.join(self.repository_path, "setup.py"), "w") as f:
+            f.write(
+                'from setuptools import setup\n\nwith open("version.txt") as f:\n    version = f.read().strip()\n\n'
+                "setup(version=version)\n"
+            )
+
+        with patch("check_semantic_version.daemon.RACY_REFS_INTERVAL", 0):
+            with patch("check_semantic_version.daemon.check_versions_match", wraps=check_versions_match) as mock:
+                for _ in range(2):
+                    response = request_check(
+                        "setup.py",
+                        repository_path=self.repository_path,
+                        socket_path=self.socket_path,
+                    )
+
+                    self.assertEqual((response["passed"], response["error"]), (True, None))
+
+        self.assertEqual(mock.call_count, 2)
+
+    def test_recently_changed_state_not_reused(self):
+        """Test that results aren't reused if the files they depend on changed too recently to tell if they've changed
+        again.
+        """
+        with patch("check_semantic_version.daemon.check_versions_match", wraps=check_versions_match) as mock:
+            self._request_check()
+            self._request_check()
+
+        self.assertEqual(mock.call_count, 2)
+
+    def test_errors_sent_to_client(self):
+        """Test that errors raised by checks are sent back to the client."""
+        response = request_check("setup.lock", repository_path=self.repository_path, socket_path=self.socket_path)
+        self.assertIsNone(response["passed"])
+        self.assertIn("ValueError: Unsupported version source", response["error"])
+
+    def test_no_daemon(self):
+        """Test that `None` is returned if there's no daemon to answer, including if a daemon left a stale socket."""
+        stale_socket_path = os.path.join(self.temporary_directory.name, "stale.sock")
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale_socket:
+            stale_socket.bind(stale_socket_path)
+
+        for socket_path in (os.path.join(self.temporary_directory.name, "missing.sock"), stale_socket_path):
+            with self.subTest(socket_path=socket_path):
+                self.assertIsNone(request_check("package.json", socket_path=socket_path))
+
+        # A new daemon replaces the stale socket but refuses to replace a running daemon's socket.
+        CheckServer(stale_socket_path).server_close()
+
+        with self.assertRaises(OSError):
+            CheckServer(self.socket_path)
+
+    def test_hung_daemon_times_out(self):
+        """Test that `None` is returned if the daemon accepts a request but doesn't answer within the timeout."""
+        hung_socket_path = os.path.join(self.temporary_directory.name, "hung.sock")
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as hung_socket:
+            hung_socket.bind(hung_socket_path)
+            hung_socket.listen()
+
+            with self.assertLogs(level="WARNING") as logging_context:
+                response = request_check("package.json", socket_path=hung_socket_path, timeout=0.1)
+
+        self.assertIsNone(response)
+        self.assertIn("The daemon didn't answer within 0.1 seconds", logging_context.output[0])
+
+    def test_cli_uses_daemon(self):
+        """Test that the CLI sends checks to a running daemon instead of running them in-process."""
+        original_working_directory = os.getcwd()
+
+        try:
+            os.chdir(self.repository_path)
+
+            with patch.dict(os.environ, {SOCKET_PATH_ENVIRONMENT_VARIABLE: self.socket_path}):
+                with patch("check_semantic_version.cli.check_versions_match") as mock_check_versions_match:
+                    with patch("sys.stdout"):
+                        with self.assertRaises(SystemExit) as e:
+                            cli.main(["package.json"])
+
+        finally:
+            os.chdir(original_working_directory)
+
+        self.assertEqual(e.exception.code, 0)
+        mock_check_versions_match.assert_not_called()
@@ -0,0 +1,416 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from check_semantic_version.configuration import Configuration
+from check_semantic_version.expected_version import Version, get_expected_version, get_expected_versions
+from check_semantic_version.git import iter_commits
+from tests.base import create_repository, git
+
+TEST_DIRECTORY = os.path.abspath(os.path.dirname(__file__))
+
+with open(os.path.join(TEST_DIRECTORY, "conformance", "expected_versions.json")) as f:
+    CONFORMANCE_CASES = json.load(f)
+
+
+def _create_configuration(case):
+    """Create a generated configuration for a conformance case.
+
+    :param dict case: the conformance case
+    :return check_semantic_version.configuration.Configuration:
+    """
+    configuration = Configuration(
+        version_source_type="setup.py",
+        breaking_change_indicated_by=case.get("breaking_change_indicated_by", "major"),
+        tag_prefix=case.get("tag_prefix", ""),
+    )
+
+    configuration.generate()
+    return configuration
+
+
+class TestVersion(unittest.TestCase):
+    def test_from_tag(self):
+        """Test that versions are parsed from tags with and without prefixes and that other tags are ignored."""
+        self.assertEqual(Version.from_tag("1.2.3"), Version(1, 2, 3))
+        self.assertEqual(Version.from_tag("v10.0.21", tag_prefix="v"), Version(10, 0, 21))
+        self.assertIsNone(Version.from_tag("1.2.3", tag_prefix="v"))
+        self.assertIsNone(Version.from_tag("1.2.3-rc1"))
+        self.assertIsNone(Version.from_tag("latest"))
+
+    def test_increment(self):
+        """Test that each action increments the version correctly."""
+        version = Version(1, 2, 3)
+        self.assertEqual(version.increment("IncrementMajor"), Version(2, 0, 0))
+        self.assertEqual(version.increment("IncrementMinor"), Version(1, 3, 0))
+        self.assertEqual(version.increment("IncrementPatch"), Version(1, 2, 4))
+        self.assertEqual(version.increment("NoIncrement"), version)
+
+        with self.assertRaises(ValueError):
+            version.increment("IncrementEverything")
+
+
+class TestGetExpectedVersion(unittest.TestCase):
+    def test_conformance_corpus(self):
+        """Test that the expected version is calculated correctly for each case in the conformance corpus with both
+        git backends.
+        """
+        for case in CONFORMANCE_CASES:
+            with self.subTest(case=case["name"]):
+                with tempfile.TemporaryDirectory() as repository_path:
+                    create_repository(repository_path, case["history"])
+                    version = get_expected_version(_create_configuration(case), repository_path=repository_path)
+
+                    python_backend_version = get_expected_version(
+                        _create_configuration(case),
+                        repository_path=repository_path,
+                        use_checkpoint=False,
+                        backend="python",
+                    )
+
+                self.assertEqual(version, case["expected_version"])
+                self.assertEqual(python_backend_version, case["expected_version"])
+
+    @unittest.skipUnless(shutil.which("git-mkver"), "`git-mkver` isn't installed.")
+    def test_conformance_corpus_against_git_mkver(self):
+        """Test that the in-process calculation gives the same result as `git-mkver` for each case in the conformance
+        corpus.
+        """
+        for case in CONFORMANCE_CASES:
+            with self.subTest(case=case["name"]):
+                with tempfile.TemporaryDirectory() as repository_path:
+                    create_repository(repository_path, case["history"])
+                    configuration = _create_configuration(case)
+                    config_path = os.path.join(repository_path, ".git", "mkver.conf")
+                    configuration.write(config_path)
+
+                    process = subprocess.run(
+                        ["git-mkver", "-c", config_path, "next"],
+                        cwd=repository_path,
+                        capture_output=True,
+                        check=True,
+                    )
+
+                    version = get_expected_version(configuration, repository_path=repository_path)
+
+                self.assertEqual(version, process.stdout.decode().strip())
+
+    def test_error_raised_if_commit_message_matches_fail_action(self):
+        """Test that an error is raised if a commit message matches a pattern with the "Fail" action."""
+        configuration = _create_configuration({})
+        configuration._configuration["commitMessageActions"].append({"pattern": "WIP:", "action": "Fail"})
+
+        with tempfile.TemporaryDirectory() as repository_path:
+            create_repository(repository_path, [{"commit": "Initial commit"}, {"commit": "WIP: Do something"}])
+
+            with self.assertRaises(ValueError):
+                get_expected_version(configuration, repository_path=repository_path)
+
+
+class TestGetExpectedVersions(unittest.TestCase):
+    def test_only_commits_changing_each_package_count(self):
+        """Test that each package's expected version only accounts for commits changing files in its directory since
+        its own last version tag.
+        """
+        with tempfile.TemporaryDirectory() as repository_path:
+            create_repository(
+                repository_path,
+                [
+                    {"write": "a/setup.py"},
+                    {"write": "b/setup.py"},
+                    {"commit": "Initial commit"},
+                    {"tag": "a-1.0.0"},
+                    {"tag": "b-2.0.0"},
+                    {"write": "a/module.py"},
+                    {"commit": "FEA: Add a feature to a"},
+                    {"write": "b/module.py"},
+                    {"commit": "FIX: Fix b"},
+                    {"tag": "b-2.0.1"},
+                    {"write": "b/module.py"},
+                    {"commit": "DOC: Update b's documentation"},
+                    {"write": "README.md"},
+                    {"commit": "REF: Rename\n\nBREAKING CHANGE: Old name gone"},
+                ],
+            )
+
+            packages = [
+                (_create_configuration({"tag_prefix": "a-"}), "a"),
+                (_create_configuration({"tag_prefix": "b-"}), "b"),
+                (_create_configuration({"tag_prefix": "c-"}), "c"),
+                (_create_configuration({"tag_prefix": "b-"}), ""),
+            ]
+
+            versions = get_expected_versions(packages, repository_path=repository_path)
+
+        self.assertEqual(versions, ["1.1.0", "2.0.2", "0.0.0", "3.0.0"])
+
+    def test_commits_from_merged_branches_older_than_tag_counted(self):
+        """Test that commits changing a package on a branch merged after the package's last version tag are counted
+        even though they were made before the tag.
+        """
+        with tempfile.TemporaryDirectory() as repository_path:
+            create_repository(
+                repository_path,
+                [
+                    {"write": "a/setup.py"},
+                    {"commit": "Initial commit"},
+                    {"tag": "1.0.0"},
+                    {"branch": "feature"},
+                    {"write": "a/module.py"},
+                    {"commit": "FEA: Add a feature"},
+                    {"checkout": "main"},
+                    {"write": "a/setup.py"},
+                    {"commit": "FIX: Fix a bug"},
+                    {"tag": "1.0.1"},
+                    {"merge": "feature"},
+                ],
+            )
+
+            versions = get_expected_versions([(_create_configuration({}), "a")], repository_path=repository_path)
+
+        self.assertEqual(versions, ["1.1.0"])
+
+
+class TestCheckpoints(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.repository_path = self.temporary_directory.name
+        self.configuration = _create_configuration({})
+        create_repository(self.repository_path, [{"commit": "Initial commit"}, {"tag": "1.0.0"}, {"commit": "FIX: a"}])
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def _get_range_since_tag(self, tag):
+        """Get the revision range from the tag's commit to HEAD.
+
+        :param str tag: the name of the tag
+        :return str:
+        """
+        return f"{git(self.repository_path, 'rev-parse', tag)}..HEAD"
+
+    def _get_expected_version(self):
+        """Get the expected version of the test repository, recording the revision ranges scanned.
+
+        :return (str, list(str)): the expected version and the revision ranges scanned
+        """
+        with patch("check_semantic_version.expected_version.iter_commits", wraps=iter_commits) as mock_iter_commits:
+            version = get_expected_version(self.configuration, repository_path=self.repository_path)
+
+        return version, [call.args[0] for call in mock_iter_commits.call_args_list]
+
+    def test_only_new_commits_scanned(self):
+        """Test that only the commits made since the last calculation are scanned and that the result accounts for
+        the commits scanned previously.
+        """
+        version, revision_ranges = self._get_expected_version()
+        self.assertEqual(version, "1.0.1")
+        self.assertEqual(revision_ranges, [self._get_range_since_tag("1.0.0")])
+
+        checkpoint_commit = git(self.repository_path, "rev-parse", "HEAD")
+        git(self.repository_path, "commit", "--allow-empty", "-m", "FEA: Add a feature")
+        version, revision_ranges = self._get_expected_version()
+        self.assertEqual(version, "1.1.0")
+        self.assertEqual(revision_ranges, [f"{checkpoint_commit}..HEAD"])
+
+        # With no new commits, nothing changes.
+        checkpoint_commit = git(self.repository_path, "rev-parse", "HEAD")
+        version, revision_ranges = self._get_expected_version()
+        self.assertEqual(version, "1.1.0")
+        self.assertEqual(revision_ranges, [f"{checkpoint_commit}..HEAD"])
+
+    def test_new_version_tag_found_after_checkpoint(self):
+        """Test that a version tag on a commit made since the checkpoint becomes the new base version."""
+        self._get_expected_version()
+        git(self.repository_path, "commit", "--allow-empty", "-m", "FEA: Add a feature")
+        git(self.repository_path, "tag", "1.1.0")
+        git(self.repository_path, "commit", "--allow-empty", "-m", "DOC: Update the documentation")
+
+        version, revision_ranges = self._get_expected_version()
+        self.assertEqual(version, "1.1.1")
+        self.assertEqual(revision_ranges, [self._get_range_since_tag("1.1.0")])
+
+    def test_checkpoint_invalidated_when_tags_change(self):
+        """Test that the checkpoint isn't used if a tag is added to a commit before it."""
+        self._get_expected_version()
+        git(self.repository_path, "tag", "2.0.0", "HEAD")
+        git(self.repository_path, "commit", "--allow-empty", "-m", "FIX: b")
+
+        version, revision_ranges = self._get_expected_version()
+        self.assertEqual(version, "2.0.1")
+        self.assertEqual(revision_ranges, [self._get_range_since_tag("2.0.0")])
+
+    def test_checkpoint_invalidated_when_history_rewritten(self):
+        """Test that the checkpoint isn't used if its commit is no longer an ancestor of HEAD."""
+        git(self.repository_path, "commit", "--allow-empty", "-m", "FEA: Add a feature")
+        self.assertEqual(self._get_expected_version()[0], "1.1.0")
+
+        git(self.repository_path, "commit", "--amend", "--allow-empty", "-m", "DOC: Update the documentation")
+
+        with self.assertLogs() as logging_context:
+            version, revision_ranges = self._get_expected_version()
+
+        self.assertEqual(version, "1.0.1")
+        self.assertEqual(revision_ranges, [self._get_range_since_tag("1.0.0")])
+        self.assertIn("History has been rewritten since the checkpoint", "\n".join(logging_context.output))
+
+    def test_checkpoint_invalidated_when_merge_makes_higher_tag_reachable(self):
+        """Test that the checkpoint isn't used if a merge makes an existing, higher version tag reachable from HEAD."""
+        git(self.repository_path, "checkout", "--quiet", "-b", "release", "1.0.0")
+        git(self.repository_path, "commit", "--allow-empty", "-m", "FEA: Add a feature")
+        git(self.repository_path, "tag", "1.1.0")
+        git(self.repository_path, "checkout", "--quiet", "main")
+        git(self.repository_path, "commit", "--allow-empty", "-m", "FIX: y")
+        self.assertEqual(self._get_expected_version()[0], "1.0.1")
+
+        git(self.repository_path, "merge", "--quiet", "--no-ff", "-m", "Merge branch 'release'", "release")
+
+        with self.assertLogs() as logging_context:
+            version, revision_ranges = self._get_expected_version()
+
+        self.assertEqual(version, "1.1.1")
+        self.assertEqual(version, get_expected_version(self.configuration, self.repository_path, use_checkpoint=False))
+        self.assertEqual(revision_ranges, [self._get_range_since_tag("1.1.0")])
+        self.assertIn("The last version tag has changed since the checkpoint", "\n".join(logging_context.output))
+
+    def test_checkpoint_not_used_for_different_configuration(self):
+        """Test that a checkpoint saved for one configuration isn't used for another."""
+        git(self.repository_path, "commit", "--allow-empty", "-m", "REF: Rename\n\nBREAKING CHANGE: Old name gone")
+        self.assertEqual(self._get_expected_version()[0], "2.0.0")
+
+        self.configuration = _create_configuration({"breaking_change_indicated_by": "minor"})
+        version, revision_ranges = self._get_expected_version()
+        self.assertEqual(version, "1.1.0")
+        self.assertEqual(revision_ranges, [self._get_range_since_tag("1.0.0")])
+
+
+class TestPullRequestRange(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.origin_path = os.path.join(self.temporary_directory.name, "origin")
+        self.configuration = _create_configuration({})
+
+        create_repository(
+            self.origin_path,
+            [
+                {"commit": "Initial commit"},
+                {"tag": "1.0.0"},
+                *[{"commit": "DOC: Update the README"}] * 5,
+                {"commit": "FIX: Fix a bug"},
+                {"tag": "1.0.1"},
+                {"branch": "feature"},
+                {"commit": "FEA: Add a feature"},
+                {"commit": "DOC: Update the documentation"},
+                {"checkout": "main"},
+                {"commit": "REF: Rename a module\n\nBREAKING CHANGE: Old name gone"},
+                {"commit": "TST: Add a test"},
+                {"checkout": "feature"},
+            ],
+        )
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def _clone(self, depth):
+        """Make a shallow clone of the origin repository with both its branches, checked out on the feature branch.
+
+        :param int depth: the number of commits of each branch's history to fetch
+        :return str: the path to the clone
+        """
+        clone_path = os.path.join(self.temporary_directory.name, f"clone-{depth}")
+
+        git(
+            self.temporary_directory.name,
+            "clone",
+            "--quiet",
+            "--no-single-branch",
+            f"--depth={depth}",
+            "--branch=feature",
+            f"file://{self.origin_path}",
+            clone_path,
+        )
+
+        return clone_path
+
+    def test_only_commits_since_merge_base_scanned(self):
+        """Test that only the commits since the merge-base are scanned and that the last version tag reachable from the
+        merge-base is used as the base version.
+        """
+        with patch("check_semantic_version.expected_version.iter_commits", wraps=iter_commits) as mock_iter_commits:
+            version = get_expected_version(self.configuration, repository_path=self.origin_path, base_ref="main")
+
+        merge_base = git(self.origin_path, "rev-parse", "1.0.1")
+        self.assertEqual(version, "1.1.0")
+        self.assertEqual([call.args[0] for call in mock_iter_commits.call_args_list], [f"{merge_base}..HEAD"])
+
+    def test_shallow_clone_including_merge_base(self):
+        """Test that a shallow clone deepened to the merge-base is enough if the merge-base has a version tag."""
+        clone_path = self._clone(depth=3)
+        self.assertEqual(git(clone_path, "rev-parse", "--is-shallow-repository"), "true")
+
+        self.assertEqual(
+            get_expected_version(self.configuration, repository_path=clone_path, base_ref="origin/main"),
+            "1.1.0",
+        )
+
+        self.assertEqual(
+            get_expected_versions([(self.configuration, "")], repository_path=clone_path, base_ref="origin/main"),
+            ["1.1.0"],
+        )
+
+    def test_shallow_clone_with_both_git_backends(self):
+        """Test that the expected version is the same with both git backends in shallow clones, whose history stops at
+        the commits whose parents are missing.
+        """
+        for depth, expected_version in ((2, "0.1.0"), (3, "1.1.0")):
+            with self.subTest(depth=depth):
+                clone_path = self._clone(depth=depth)
+
+                for backend in ("git", "python"):
+                    version = get_expected_version(
+                        self.configuration,
+                        repository_path=clone_path,
+                        use_checkpoint=False,
+                        backend=backend,
+                    )
+
+                    self.assertEqual(version, expected_version)
+
+    def test_error_raised_if_merge_base_missing_from_shallow_clone(self):
+        """Test that an error saying how many commits are missing is raised if a shallow clone doesn't include the
+        merge-base.
+        """
+        clone_path = self._clone(depth=2)
+
+        with self.assertRaises(ValueError) as context:
+            get_expected_version(self.configuration, repository_path=clone_path, base_ref="origin/main")
+
+        self.assertIn("the merge-base of HEAD and 'origin/main' can't be found", str(context.exception))
+        self.assertIn("at least 1 more", str(context.exception))
+
+    def test_error_raised_if_last_version_tag_missing_from_shallow_clone(self):
+        """Test that an error is raised if the merge-base doesn't have a version tag and the history between it and
+        the last version tag is missing from a shallow clone.
+        """
+        git(self.origin_path, "tag", "--delete", "1.0.1")
+        clone_path = self._clone(depth=3)
+
+        with self.assertRaises(ValueError) as context:
+            get_expected_version(self.configuration, repository_path=clone_path, base_ref="origin/main")
+
+        self.assertIn("the last version tag can't be found", str(context.exception))
+        self.assertIn("at least 1 more", str(context.exception))
+
+    def test_error_raised_if_no_common_history(self):
+        """Test that an error is raised if HEAD has no merge-base with the base ref."""
+        git(self.origin_path, "checkout", "--quiet", "--orphan", "unrelated")
+        git(self.origin_path, "commit", "--quiet", "--allow-empty", "-m", "Unrelated commit")
+
+        with self.assertRaises(ValueError) as context:
+            get_expected_version(self.configuration, repository_path=self.origin_path, base_ref="main")
+
+        self.assertEqual(str(context.exception), "HEAD and 'main' have no common history.")
@@ -0,0 +1,270 @@
+import json
+import os
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from check_semantic_version.check_semantic_version import _get_current_version
+from check_semantic_version.configuration import Configuration
+from check_semantic_version.extractors import EXTRACTORS, get_extractor, get_supported_version_source_files
+
+
+class TestRegistry(unittest.TestCase):
+    def test_get_extractor(self):
+        """Test that extractors are found by name or by the name of a file matching their patterns, with `setup.py`
+        files matched before other Python modules.
+        """
+        for version_source_type, name in (
+            ("setup.py", "setup.py"),
+            ("setup.cfg", "setup.cfg"),
+            ("Cargo.toml", "Cargo.toml"),
+            ("VERSION.txt", "VERSION"),
+            ("__init__.py", "__version__"),
+            ("_version.py", "__version__"),
+            ("__version__", "__version__"),
+        ):
+            with self.subTest(version_source_type=version_source_type):
+                self.assertEqual(get_extractor(version_source_type).name, name)
+
+    def test_unsupported_version_source_type(self):
+        """Test that an error listing the supported files is raised for an unsupported version source type."""
+        with self.assertRaises(ValueError) as context:
+            get_extractor("setup.lock")
+
+        self.assertIn("Unsupported version source received: 'setup.lock'", str(context.exception))
+        self.assertIn(repr(get_supported_version_source_files()), str(context.exception))
+
+    def test_generated_configuration_uses_extractor_patch(self):
+        """Test that generated configurations use the patch of the version source type's extractor."""
+        for version_source_type in ("Cargo.toml", "__init__.py"):
+            with self.subTest(version_source_type=version_source_type):
+                configuration = Configuration(version_source_type=version_source_type)
+                configuration.generate()
+                extractor = get_extractor(version_source_type)
+
+                self.assertEqual(configuration._configuration["patches"], [extractor.patch])
+                self.assertEqual(configuration._configuration["defaults"]["patches"], [extractor.name])
+
+    def test_patches_are_valid_mkver_patches(self):
+        """Test that every extractor's patch has a name, file patterns, and replacements including the version."""
+        for name, extractor in EXTRACTORS.items():
+            with self.subTest(name=name):
+                self.assertEqual(extractor.patch["name"], name)
+                self.assertTrue(extractor.patch["filePatterns"])
+
+                for replacement in extractor.patch["replacements"]:
+                    self.assertIn("{VersionRegex}", replacement["find"])
+                    self.assertIn("{Version}", replacement["replace"])
+
+    def test_example_files_contain_version(self):
+        """Test that every extractor has an example file that its version is read from."""
+        for name, extractor in EXTRACTORS.items():
+            with self.subTest(name=name), tempfile.TemporaryDirectory() as directory:
+                path, template = extractor.example_file
+                path = os.path.join(directory, path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+
+                with open(path, "w") as f:
+                    f.write(template.format(version="1.2.3"))
+
+                self.assertEqual(_get_current_version(path, name), "1.2.3")
+
+
+class ExtractorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = self.temporary_directory.name
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def _write(self, path, contents):
+        """Write a file in the temporary directory.
+
+        :param str path: the path of the file relative to the temporary directory
+        :param str contents: the contents of the file
+        :return str: the absolute path of the file
+        """
+        path = os.path.join(self.directory, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(contents)
+
+        return path
+
+    def _get_version_without_subprocess(self, path, version_source_type=None):
+        """Get the current version of a version source file, checking that no subprocess is run.
+
+        :param str path: the path to the version source file
+        :param str|None version_source_type: the version source type; if `None`, the file's name is used
+        :return str|None: the version
+        """
+        with patch("subprocess.run") as mock_run:
+            version = _get_current_version(path, version_source_type or os.path.basename(path))
+
+        mock_run.assert_not_called()
+        return version
+
+
+class TestSetupPyExtractor(ExtractorTestCase):
+    def test_name_bound_more_than_once_falls_back_to_executing_it(self):
+        """Test that a `setup.py` file is executed if the name given as the version is bound anywhere other than by a
+        single top-level assignment before the `setup` call.
+        """
+        for body, expected_version in (
+            ('V = "1.0.0"\nif True:\n    V = "2.0.0"\n\nsetup(version=V)\n', "2.0.0"),
+            ('V = "1.0.0"\nV += ".post1"\n\nsetup(version=V)\n', "1.0.0.post1"),
+            ('V = "1.0.0"\n\ndef f():\n    global V\n    V = "2.0.0"\n\nf()\nsetup(version=V)\n', "2.0.0"),
+            ('V = "1.0.0"\nsetup(version=V)\nV = "9.9.9"\n', "1.0.0"),
+        ):
+            with self.subTest(body=body):
+                path = self._write("setup.py", f"from setuptools import setup\n\n{body}")
+
+                with patch("subprocess.run", wraps=subprocess.run) as mock_run:
+                    version = _get_current_version(path, "setup.py")
+
+                self.assertEqual(version, expected_version)
+                self.assertEqual(mock_run.call_args.args[0][1:], [path, "--version"])
+
+    def test_source_paths(self):
+        """Test that the source paths of a `setup.py` file include the modules its version is imported from, and that
+        there are none if the version can only be found by executing it.
+        """
+        self._write("blah/__init__.py", "from blah._version import __version__\n")
+        self._write("blah/_version.py", '__version__ = "0.9.1"\n')
+        path = self._write(
+            "setup.py", "from setuptools import setup\nfrom blah import __version__\nsetup(version=__version__)\n"
+        )
+
+        self.assertEqual(
+            get_extractor("setup.py").get_source_paths(path),
+            sorted(
+                [
+                    path,
+                    os.path.join(self.directory, "blah", "__init__.py"),
+                    os.path.join(self.directory, "blah", "_version.py"),
+                ]
+            ),
+        )
+
+        path = self._write("setup.py", 'from setuptools import setup\n\nsetup(version=open("VERSION").read())\n')
+        self.assertIsNone(get_extractor("setup.py").get_source_paths(path))
+
+    def test_only_setup_calls_matched(self):
+        """Test that only calls to `setup` or `setuptools.setup` are used to read the version."""
+        path = self._write(
+            "setup.py",
+            "from setuptools import setup\n\n\nclass Other:\n    def setup(self, **kwargs):\n        pass\n\n\n"
+            'Other().setup(version="0.0.1")\nsetup(name="blah", version="1.2.0")\n',
+        )
+
+        self.assertEqual(self._get_version_without_subprocess(path), "1.2.0")
+
+
+class TestSetupCfgExtractor(ExtractorTestCase):
+    def test_literal_version(self):
+        """Test that a literal version in the `[metadata]` section is read in-process."""
+        path = self._write("setup.cfg", "[metadata]\nname = blah\nversion = 1.4.2\n")
+        self.assertEqual(self._get_version_without_subprocess(path), "1.4.2")
+
+    def test_attr_version(self):
+        """Test that an `attr:` version is resolved statically, including from a `src` layout."""
+        self._write("src/blah/__init__.py", "from blah._version import __version__\n")
+        self._write("src/blah/_version.py", '__version__ = "0.9.1"\n')
+        path = self._write("setup.cfg", "[metadata]\nversion = attr: blah.__version__\n")
+        self.assertEqual(self._get_version_without_subprocess(path), "0.9.1")
+
+    def test_file_version(self):
+        """Test that a `file:` version is read from the file."""
+        self._write("VERSION", "2.0.0\n")
+        path = self._write("setup.cfg", "[metadata]\nversion = file: VERSION\n")
+        self.assertEqual(self._get_version_without_subprocess(path), "2.0.0")
+
+    def test_dynamic_version_falls_back_to_setuptools(self):
+        """Test that `setuptools` is used if the version can't be resolved statically."""
+        self._write("blah/__init__.py", 'import os\n\n__version__ = os.environ.get("X", "3.1.4")\n')
+        path = self._write("setup.cfg", "[metadata]\nname = blah\nversion = attr: blah.__version__\n")
+
+        with patch("subprocess.run", wraps=subprocess.run) as mock_run:
+            version = _get_current_version(path, "setup.cfg")
+
+        self.assertEqual(version, "3.1.4")
+        self.assertIn("read_configuration", mock_run.call_args.args[0][2])
+
+
+class TestCargoTomlExtractor(ExtractorTestCase):
+    def test_package_version(self):
+        """Test that the version in the `[package]` table is read in-process."""
+        path = self._write("Cargo.toml", '[package]\nname = "blah"\nversion = "0.12.0"\nedition = "2021"\n')
+        self.assertEqual(self._get_version_without_subprocess(path), "0.12.0")
+
+    def test_workspace_version(self):
+        """Test that a version inherited from the workspace is read from the workspace's `Cargo.toml` file."""
+        self._write("Cargo.toml", '[workspace]\nmembers = ["crates/*"]\n\n[workspace.package]\nversion = "5.0.1"\n')
+        path = self._write("crates/blah/Cargo.toml", '[package]\nname = "blah"\nversion.workspace = true\n')
+        self.assertEqual(self._get_version_without_subprocess(path), "5.0.1")
+
+    def test_missing_version_falls_back_to_cargo(self):
+        """Test that Cargo is used if the version can't be read from the file."""
+        path = self._write("Cargo.toml", '[package]\nname = "blah"\n')
+
+        metadata = {
+            "packages": [
+                {"name": "other", "version": "1.0.0", "manifest_path": "/elsewhere/Cargo.toml"},
+                {"name": "blah", "version": "0.0.0", "manifest_path": path},
+            ]
+        }
+
+        with patch(
+            "subprocess.run",
+            return_value=subprocess.CompletedProcess([], 0, stdout=json.dumps(metadata).encode("utf8")),
+        ) as mock_run:
+            version = _get_current_version(path, "Cargo.toml")
+
+        self.assertEqual(version, "0.0.0")
+        self.assertEqual(mock_run.call_args.args[0][:2], ["cargo", "metadata"])
+
+
+class TestVersionFileExtractor(ExtractorTestCase):
+    def test_version_file(self):
+        """Test that the first non-empty line of a `VERSION` file is read."""
+        for filename in ("VERSION", "VERSION.txt"):
+            with self.subTest(filename=filename):
+                path = self._write(filename, "\n  1.2.3  \nignored\n")
+                self.assertEqual(self._get_version_without_subprocess(path), "1.2.3")
+
+    def test_empty_version_file(self):
+        """Test that an error is raised for an empty `VERSION` file as there's no fallback."""
+        path = self._write("VERSION", "\n")
+
+        with self.assertRaises(ValueError):
+            _get_current_version(path, "VERSION")
+
+
+class TestModuleVersionExtractor(ExtractorTestCase):
+    def test_literal_version(self):
+        """Test that a literal `__version__` in a module is read in-process."""
+        path = self._write("blah/__init__.py", '"""A package."""\n\n__version__ = "0.4.0"\n')
+        self.assertEqual(self._get_version_without_subprocess(path), "0.4.0")
+
+    def test_imported_version(self):
+        """Test that a `__version__` imported from another module of the package is read in-process."""
+        self._write("blah/_version.py", 'VERSION = "7.0.0"\n__version__: str = VERSION\n')
+
+        for import_statement in ("from ._version import __version__", "from blah._version import __version__"):
+            with self.subTest(import_statement=import_statement):
+                path = self._write("blah/__init__.py", f"{import_statement}\n")
+                self.assertEqual(self._get_version_without_subprocess(path), "7.0.0")
+
+    def test_dynamic_version_falls_back_to_importing_module(self):
+        """Test that the module is imported if its `__version__` can't be read statically."""
+        self._write("blah/__init__.py", "")
+        path = self._write("blah/about.py", '__version__ = "-".join(["1.0.0", "rc1"])\n')
+
+        with patch("subprocess.run", wraps=subprocess.run) as mock_run:
+            version = _get_current_version(path, "about.py")
+
+        self.assertEqual(version, "1.0.0-rc1")
+        self.assertEqual(mock_run.call_args.args[0][-2:], [self.directory, "blah.about"])
@@ -0,0 +1,145 @@
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from check_semantic_version import cli, fleet
+from check_semantic_version.cat_file import CAT_FILE_POOL
+from check_semantic_version.check_semantic_version import check_versions_match
+from check_semantic_version.fleet import Repository, check_fleet, read_fleet_manifest, write_fleet_report
+from tests.base import create_repository, git
+
+
+def _check_versions_match_or_die(path, *args, repository_path=".", **kwargs):
+    """Check the versions match unless the repository is called "dies", in which case kill the process.
+
+    :return bool:
+    """
+    if os.path.basename(repository_path) == "dies":
+        os._exit(1)
+
+    return check_versions_match(path, *args, repository_path=repository_path, **kwargs)
+
+
+class TestFleet(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.fleet_path = self.temporary_directory.name
+
+        for name, version in (("passes", "1.0.1"), ("fails", "2.0.0"), ("dies", "1.0.1")):
+            repository_path = os.path.join(self.fleet_path, name)
+            create_repository(repository_path, [{"commit": "Initial commit"}, {"tag": "1.0.0"}])
+
+            with open(os.path.join(repository_path, "package.json"), "w") as f:
+                json.dump({"name": name, "version": version}, f)
+
+            git(repository_path, "add", "package.json")
+            git(repository_path, "commit", "--quiet", "-m", "FIX: Fix a bug")
+
+        self.manifest_path = os.path.join(self.fleet_path, "manifest.txt")
+
+        with open(self.manifest_path, "w") as f:
+            f.write("# The repositories to check.\n\npasses package.json\nfails 'package.json,tag_prefix='\n")
+            f.write("errors setup.py\n")
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_read_fleet_manifest(self):
+        """Test that repository paths are made relative to the manifest and that comments and blank lines are
+        ignored.
+        """
+        self.assertEqual(
+            read_fleet_manifest(self.manifest_path),
+            [
+                Repository(path=os.path.join(self.fleet_path, "passes"), version_sources=("package.json",)),
+                Repository(path=os.path.join(self.fleet_path, "fails"), version_sources=("package.json,tag_prefix=",)),
+                Repository(path=os.path.join(self.fleet_path, "errors"), version_sources=("setup.py",)),
+            ],
+        )
+
+    def test_repositories_checked_in_isolation(self):
+        """Test that each repository is checked in its own directory without changing the working directory and that
+        a repository that can't be checked doesn't affect the others.
+        """
+        original_working_directory = os.getcwd()
+        results = check_fleet(read_fleet_manifest(self.manifest_path), max_workers=2)
+        self.assertEqual(os.getcwd(), original_working_directory)
+
+        self.assertEqual([result.passed for result in results], [True, False, None])
+        self.assertIn("VERSION PASSED CHECKS", results[0].output)
+        self.assertIn("The current version (2.0.0) is different", results[1].output)
+        self.assertIn("Error", results[2].error)
+        self.assertTrue(all(result.duration > 0 for result in results))
+
+        report = io.StringIO()
+        summary = write_fleet_report(results, report)
+        self.assertEqual((summary["passed"], summary["failed"], summary["errored"]), (1, 1, 1))
+        self.assertIn("1 passed, 1 failed, and 1 errored of 3 repositories", report.getvalue())
+
+        report = io.StringIO()
+        write_fleet_report(results, report, "json")
+        self.assertEqual(len(json.loads(report.getvalue())["results"]), 3)
+
+    def test_cat_file_processes_closed_after_each_repository(self):
+        """Test that the `git cat-file` processes are shut down after checking each repository, including if the check
+        raises an error.
+        """
+        for name in ("passes", "errors"):
+            with self.subTest(name=name):
+                repository = Repository(path=os.path.join(self.fleet_path, name), version_sources=("package.json",))
+
+                with patch.object(CAT_FILE_POOL, "close") as mock_close:
+                    fleet._check_repository(repository, "major")
+
+                mock_close.assert_called_once()
+
+    def test_setup_py_reading_relative_file(self):
+        """Test that a `setup.py` file reading a file relative to the working directory is executed in its repository
+        rather than in the worker process's working directory.
+        """
+        repository_path = os.path.join(self.fleet_path, "reads-file")
+        create_repository(repository_path, [{"commit": "Initial commit"}, {"tag": "1.0.0"}])
+
+        with open(os.path.join(repository_path, "version.txt"), "w") as f:
+            f.write("1.0.1\n")
+
+        with open(os.path.join(repository_path, "setup.py"), "w") as f:
+            f.write(
+                "from setuptools import setup\n\n"
+                'with open("version.txt") as f:\n    version = f.read().strip()\n\n'
+                'setup(name="reads-file", version=version)\n'
+            )
+
+        git(repository_path, "add", "setup.py", "version.txt")
+        git(repository_path, "commit", "--quiet", "-m", "FIX: Fix a bug")
+
+        results = check_fleet([Repository(path=repository_path, version_sources=("setup.py",))], max_workers=1)
+        self.assertEqual((results[0].passed, results[0].error), (True, None))
+
+    @unittest.skipUnless(multiprocessing.get_start_method() == "fork", "Patches only reach forked worker processes.")
+    def test_dead_worker_process_only_fails_its_repository(self):
+        """Test that a worker process dying only fails the repository it was checking."""
+        repositories = [
+            Repository(path=os.path.join(self.fleet_path, name), version_sources=("package.json",))
+            for name in ("passes", "dies", "fails")
+        ]
+
+        with patch("check_semantic_version.fleet.check_versions_match", _check_versions_match_or_die):
+            results = check_fleet(repositories, max_workers=2)
+
+        self.assertEqual([result.passed for result in results], [True, None, False])
+        self.assertEqual(results[1].error, "The process checking the repository died.")
+
+    def test_cli(self):
+        """Test that the fleet subcommand exits with an exit code of 1 if any repository doesn't pass."""
+        with patch("sys.stdout") as mock_stdout:
+            with self.assertRaises(SystemExit) as e:
+                cli.main(["fleet", self.manifest_path, "--workers", "2"])
+
+        self.assertEqual(e.exception.code, 1)
+        output = "".join(call.args[0] for call in mock_stdout.write.call_args_list)
+        self.assertIn("1 passed, 1 failed, and 1 errored of 3 repositories", output)
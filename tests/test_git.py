@@ -0,0 +1,57 @@
+import tempfile
+import unittest
+
+from check_semantic_version.exceptions import CalledProcessError
+from check_semantic_version.git import iter_commits, iter_git_records
+from tests.base import create_repository
+
+
+class TestIterCommits(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.temporary_directory = tempfile.TemporaryDirectory()
+        cls.repository_path = cls.temporary_directory.name
+
+        create_repository(
+            cls.repository_path,
+            [
+                {"commit": "Initial commit"},
+                {"tag": "0.1.0"},
+                {"tag": "latest"},
+                {"commit": "FEA: Add a feature\n\nWith a body."},
+                {"commit": "FIX: Fix a bug"},
+            ],
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temporary_directory.cleanup()
+
+    def test_iter_commits(self):
+        """Test that commits are yielded newest-first with their full messages and tags."""
+        commits = list(iter_commits(repository_path=self.repository_path))
+
+        self.assertEqual(
+            [commit.message for commit in commits],
+            ["FIX: Fix a bug\n", "FEA: Add a feature\n\nWith a body.\n", "Initial commit\n"],
+        )
+
+        self.assertEqual([set(commit.tags) for commit in commits], [set(), set(), {"0.1.0", "latest"}])
+
+    def test_iter_commits_with_revision_range(self):
+        """Test that only the commits in the revision range are yielded."""
+        commits = list(iter_commits("0.1.0..HEAD", repository_path=self.repository_path))
+        self.assertEqual(len(commits), 2)
+
+    def test_error_raised_for_invalid_revision(self):
+        """Test that an error including git's stderr output is raised if the git command fails."""
+        with self.assertRaises(CalledProcessError) as context:
+            list(iter_commits("non-existent-revision", repository_path=self.repository_path))
+
+        self.assertIn("non-existent-revision", str(context.exception))
+
+    def test_stopping_early_terminates_git(self):
+        """Test that closing the generator early doesn't raise an error."""
+        records = iter_git_records(["log", "-z", "--format=%H"], repository_path=self.repository_path)
+        next(records)
+        records.close()
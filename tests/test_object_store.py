@@ -0,0 +1,182 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from check_semantic_version.cat_file import CatFile
+from check_semantic_version.object_store import ObjectStore, find_git_directories, get_git_backend
+from check_semantic_version.tag_index import TagIndex
+from tests.base import create_repository, git
+
+HISTORY = [
+    {"write": "setup.py"},
+    {"write": "package/module.py"},
+    {"commit": "Initial commit"},
+    {"tag": "0.1.0"},
+    {"branch": "feature"},
+    {"write": "package/module.py"},
+    {"commit": "FEA: Add a feature"},
+    {"write": "package/module.py"},
+    {"commit": "FIX: Fix the feature"},
+    {"checkout": "main"},
+    {"write": "setup.py"},
+    {"commit": "DOC: Update the documentation"},
+    {"merge": "feature"},
+    {"tag": "v0.2.0"},
+    {"write": "package/other.py"},
+    {"commit": "FEA: Add another feature\n\nWith a body."},
+]
+
+
+class TestObjectStore(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.repository_path = self.temporary_directory.name
+        create_repository(self.repository_path, HISTORY)
+
+        # Make the files big enough for `git` to store their later versions as deltas once packed.
+        for index in range(20):
+            with open(os.path.join(self.repository_path, "package", "module.py"), "a") as f:
+                f.write("".join(f"line = {index * 100 + line}\n" for line in range(100)))
+
+            git(self.repository_path, "commit", "--quiet", "-am", f"REF: Change {index}")
+
+        git(self.repository_path, "tag", "-a", "1.0.0", "-m", "Release 1.0.0")
+        git(self.repository_path, "tag", "-a", "1.0.0-annotated-again", "-m", "Tag a tag", "1.0.0")
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def _assert_same_as_git(self):
+        """Check that every object, ref, and commit range is read the same as with the `git` binary.
+
+        :return None:
+        """
+        shas = git(self.repository_path, "cat-file", "--batch-all-objects", "--batch-check=%(objectname)").split()
+        names = [*shas, "HEAD", "refs/tags/1.0.0", "1.0.0", "main", "0" * 40]
+
+        with CatFile(self.repository_path) as cat_file, ObjectStore(self.repository_path) as object_store:
+            self.assertEqual(list(object_store.read_many(names)), list(cat_file.read_many(names)))
+
+            refs = [f"{sha} {peeled or ''} {name}" for name, sha, peeled in object_store.iter_refs("refs/")]
+
+            self.assertEqual(
+                refs,
+                git(self.repository_path, "for-each-ref", "--format=%(objectname) %(*objectname) %(refname)").split(
+                    "\n"
+                ),
+            )
+
+            for exclude in ([], ["0.1.0"], ["v0.2.0"], ["feature"], ["0.1.0", "feature"]):
+                with self.subTest(exclude=exclude):
+                    commits = object_store.iter_commits(
+                        object_store.resolve_ref("HEAD"),
+                        exclude=[object_store.resolve_ref(name) for name in exclude],
+                    )
+
+                    self.assertEqual(
+                        [commit.sha for commit in commits],
+                        git(self.repository_path, "rev-list", "HEAD", *(f"^{name}" for name in exclude)).split(),
+                    )
+
+            head = object_store.resolve_ref("HEAD")
+            self.assertTrue(object_store.is_ancestor(object_store.resolve_ref("feature"), head))
+            self.assertFalse(object_store.is_ancestor(head, object_store.resolve_ref("feature")))
+
+        git_tag_index = TagIndex(self.repository_path, use_cache=False)
+
+        with ObjectStore(self.repository_path) as object_store:
+            python_tag_index = TagIndex(self.repository_path, use_cache=False, object_store=object_store)
+            self.assertEqual(python_tag_index.get_last_reachable_tag(), git_tag_index.get_last_reachable_tag())
+
+        self.assertEqual(python_tag_index.tags, git_tag_index.tags)
+        self.assertEqual(python_tag_index.digest, git_tag_index.digest)
+
+    def test_loose_objects_and_refs(self):
+        """Test that loose objects and refs are read the same as with `git`."""
+        self._assert_same_as_git()
+
+    def test_packed_objects_and_refs(self):
+        """Test that packed objects (including ones stored as offset deltas) and packed refs are read the same as with
+        `git`.
+        """
+        git(self.repository_path, "repack", "-a", "-d", "-f", "--quiet")
+        git(self.repository_path, "pack-refs", "--all")
+        self.assertIn("delta", git(self.repository_path, "verify-pack", "-v", *self._get_pack_indexes()))
+        self._assert_same_as_git()
+
+    def test_packed_objects_stored_as_ref_deltas(self):
+        """Test that packed objects stored as deltas of bases named by their sha are read the same as with `git`."""
+        git(self.repository_path, "-c", "repack.useDeltaBaseOffset=false", "repack", "-a", "-d", "-f", "--quiet")
+        self._assert_same_as_git()
+
+    def test_loose_and_packed_objects_and_refs_mixed(self):
+        """Test that a mixture of loose and packed objects and refs, including loose refs overriding packed ones, are
+        read the same as with `git`.
+        """
+        git(self.repository_path, "repack", "-a", "-d", "--quiet")
+        git(self.repository_path, "pack-refs", "--all")
+        git(self.repository_path, "commit", "--quiet", "--allow-empty", "-m", "FIX: A loose commit")
+        git(self.repository_path, "tag", "--force", "0.1.0")
+        self._assert_same_as_git()
+
+    def test_shallow_clone(self):
+        """Test that the commits at the boundary of a shallow clone are treated as having no parents, as with `git`."""
+        clone_path = os.path.join(self.repository_path, "clone")
+        git(self.repository_path, "clone", "--quiet", "--depth=2", f"file://{self.repository_path}", clone_path)
+        self.assertEqual(git(clone_path, "rev-parse", "--is-shallow-repository"), "true")
+
+        with ObjectStore(clone_path) as object_store:
+            head = object_store.resolve_ref("HEAD")
+            commits = [commit.sha for commit in object_store.iter_commits(head)]
+            self.assertEqual(commits, git(clone_path, "rev-list", "HEAD").split())
+            self.assertEqual(object_store.shallow_commits, {commits[-1]})
+            self.assertTrue(object_store.is_ancestor(commits[-1], head))
+            self.assertFalse(object_store.is_ancestor(git(self.repository_path, "rev-parse", "0.1.0"), head))
+
+        with ObjectStore(clone_path) as object_store:
+            python_tag_index = TagIndex(clone_path, use_cache=False, object_store=object_store)
+            self.assertEqual(
+                python_tag_index.get_last_reachable_tag(),
+                TagIndex(clone_path, use_cache=False).get_last_reachable_tag(),
+            )
+
+    def _get_pack_indexes(self):
+        """Get the paths of the test repository's pack indexes.
+
+        :return list(str):
+        """
+        pack_directory = os.path.join(self.repository_path, ".git", "objects", "pack")
+        return [os.path.join(pack_directory, name) for name in os.listdir(pack_directory) if name.endswith(".idx")]
+
+
+class TestFindGitDirectories(unittest.TestCase):
+    def test_worktree(self):
+        """Test that the git directory and common git directory of a linked worktree are found from a subdirectory."""
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            repository_path = os.path.join(temporary_directory, "repository")
+            worktree_path = os.path.join(temporary_directory, "worktree")
+            create_repository(repository_path, [{"write": "package/module.py"}, {"commit": "Initial commit"}])
+            git(repository_path, "worktree", "add", "--quiet", worktree_path)
+
+            git_directory, common_directory = find_git_directories(os.path.join(worktree_path, "package"))
+
+            self.assertEqual(git_directory, git(worktree_path, "rev-parse", "--absolute-git-dir"))
+            self.assertEqual(common_directory, os.path.join(repository_path, ".git"))
+
+            with ObjectStore(worktree_path) as object_store:
+                self.assertEqual(object_store.resolve_ref("HEAD"), git(worktree_path, "rev-parse", "HEAD"))
+
+
+class TestGetGitBackend(unittest.TestCase):
+    def test_get_git_backend(self):
+        """Test that the git backend defaults to "git", can be set with an environment variable, and is validated."""
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(get_git_backend(), "git")
+
+        with patch.dict(os.environ, {"CHECK_SEMANTIC_VERSION_GIT_BACKEND": "python"}):
+            self.assertEqual(get_git_backend(), "python")
+            self.assertEqual(get_git_backend("git"), "git")
+
+        with self.assertRaises(ValueError):
+            get_git_backend("libgit2")
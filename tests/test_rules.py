@@ -0,0 +1,118 @@
+import itertools
+import re
+import unittest
+
+from check_semantic_version.configuration import Configuration
+from check_semantic_version.rules import ACTION_PRECEDENCE, CommitMessageRules, _get_literal_prefix
+
+
+def get_action_naively(message, actions):
+    """Get the highest-precedence action matching a commit message by searching for each pattern separately.
+
+    :param str message: the commit message
+    :param list(tuple(str, str)) actions: the patterns and their actions
+    :return str|None:
+    """
+    matching_actions = [action for pattern, action in actions if re.search(pattern, message)]
+
+    if not matching_actions:
+        return None
+
+    return max(matching_actions, key=ACTION_PRECEDENCE.get)
+
+
+class TestCommitMessageRules(unittest.TestCase):
+    def setUp(self):
+        configuration = Configuration(version_source_type="setup.py")
+        configuration.generate()
+        self.rules = CommitMessageRules(configuration.commit_message_actions)
+
+    def test_generated_actions_take_precedence_over_defaults(self):
+        """Test that configured actions replace default actions with the same pattern."""
+        configuration = Configuration(version_source_type="setup.py", breaking_change_indicated_by="minor")
+        configuration.generate()
+        rules = CommitMessageRules(configuration.commit_message_actions)
+        self.assertEqual(rules.get_action("REF: Rename\n\nBREAKING CHANGE: The old name is gone."), "IncrementMinor")
+
+    def test_get_action(self):
+        """Test that the highest-precedence matching action is returned."""
+        self.assertIsNone(self.rules.get_action("DOC: Update the documentation"))
+        self.assertEqual(self.rules.get_action("FEA: Add a feature"), "IncrementMinor")
+        self.assertEqual(self.rules.get_action("FEA: Add a feature\n\nBREAKING-CHANGE: Remove one"), "IncrementMajor")
+        self.assertEqual(self.rules.get_action("fix(cli): Fix an option"), "IncrementPatch")
+
+    def test_overlapping_matches_are_found(self):
+        """Test that a higher-precedence match inside a lower-precedence match is still found."""
+        message = "fix(a): BREAKING CHANGE (b): Remove an option"
+        self.assertEqual(self.rules.get_action(message), "IncrementMajor")
+
+    def test_same_result_as_searching_for_each_pattern(self):
+        """Test that the compiled rules give the same results as searching for each pattern separately for many
+        combinations of message fragments.
+        """
+        fragments = ["FEA: x", "feat(y)!: z", "fix: a", "BREAKING-CHANGE", "prefix: b", "minor(c):", "DOC: d", ""]
+
+        for parts in itertools.product(fragments, repeat=3):
+            message = "\n".join(parts)
+
+            with self.subTest(message=message):
+                self.assertEqual(self.rules.get_action(message), get_action_naively(message, self.rules.actions))
+
+    def test_same_result_as_searching_for_each_pattern_with_unprefixed_patterns(self):
+        """Test that patterns without a literal prefix give the same results as searching for each pattern separately."""
+        rules = CommitMessageRules(
+            [
+                {"pattern": "BREAKING CHANGE|BREAKING-CHANGE", "action": "IncrementMajor"},
+                {"pattern": "^(FEA|ENH):", "action": "IncrementMinor"},
+                {"pattern": "[Ff]ix:", "action": "IncrementPatch"},
+                {"pattern": "WIP", "action": "NoIncrement"},
+            ]
+        )
+
+        fragments = ["FEA: x", "ENH: y", "Fix: z", "fix: a", "BREAKING-CHANGE", "WIP", "b"]
+
+        for parts in itertools.product(fragments, repeat=2):
+            message = " ".join(parts)
+
+            with self.subTest(message=message):
+                self.assertEqual(rules.get_action(message), get_action_naively(message, rules.actions))
+
+    def test_error_raised_for_fail_action(self):
+        """Test that an error is raised if a message matches a pattern with the "Fail" action, even if it also matches
+        patterns that would otherwise be the highest-precedence.
+        """
+        rules = CommitMessageRules([{"pattern": "WIP", "action": "Fail"}])
+        self.assertEqual(rules.highest_action, "Fail")
+
+        with self.assertRaises(ValueError):
+            rules.get_action("feat!: Remove a feature (WIP)")
+
+    def test_error_raised_for_unknown_action(self):
+        """Test that an error is raised if a commit message action is unknown."""
+        with self.assertRaises(ValueError):
+            CommitMessageRules([{"pattern": "FEA:", "action": "IncrementEverything"}])
+
+    def test_patterns_with_numbered_backreferences_are_matched_separately(self):
+        """Test that patterns that can't be combined are still matched correctly."""
+        rules = CommitMessageRules([{"pattern": r"(ab)\1", "action": "IncrementMajor"}])
+        self.assertEqual(rules.get_action("ababc"), "IncrementMajor")
+        self.assertIsNone(rules.get_action("abc"))
+
+
+class TestGetLiteralPrefix(unittest.TestCase):
+    def test_get_literal_prefix(self):
+        """Test that the literal text every match must start with is extracted from patterns."""
+        for pattern, prefix in (
+            ("FEA:", "FEA:"),
+            (r"feat(\(.+\))?!:", "feat"),
+            (r"BREAKING\-CHANGE", "BREAKING-CHANGE"),
+            ("fixe?s", "fix"),
+            ("ab+c", "ab"),
+            (r"a\d", "a"),
+            ("BREAKING CHANGE|BREAKING-CHANGE", ""),
+            ("^FEA:", ""),
+            ("(?i)fea:", ""),
+            ("[Ff]ix", ""),
+        ):
+            with self.subTest(pattern=pattern):
+                self.assertEqual(_get_literal_prefix(pattern), prefix)
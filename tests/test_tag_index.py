@@ -0,0 +1,85 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from check_semantic_version.git import run_git
+from check_semantic_version.tag_index import TagIndex
+from check_semantic_version.version import Version
+from tests.base import create_repository, git
+
+
+class TestTagIndex(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.repository_path = self.temporary_directory.name
+
+        create_repository(
+            self.repository_path,
+            [
+                {"commit": "Initial commit"},
+                {"tag": "v0.9.0"},
+                {"tag": "1.0.0"},
+                {"commit": "FEA: Add a feature"},
+                {"tag": "v0.10.0"},
+                {"tag": "nightly-2024-01-01"},
+                {"branch": "other"},
+                {"commit": "FEA: Add another feature"},
+                {"tag": "v2.0.0"},
+                {"checkout": "main"},
+            ],
+        )
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_tags_sorted_by_version(self):
+        """Test that only tags with the prefix are indexed and that they're sorted from the highest version (not the
+        highest string) to the lowest.
+        """
+        tag_index = TagIndex(self.repository_path, tag_prefix="v", use_cache=False)
+        self.assertEqual([tag.name for tag in tag_index.tags], ["v2.0.0", "v0.10.0", "v0.9.0"])
+        self.assertEqual(tag_index.tags[0].version, Version(2, 0, 0))
+        self.assertEqual(tag_index.tags[0].commit, git(self.repository_path, "rev-parse", "other"))
+
+    def test_annotated_tags_peeled(self):
+        """Test that annotated tags are indexed with the commit they point to rather than the tag object."""
+        git(self.repository_path, "tag", "-a", "v3.0.0", "-m", "Release 3.0.0")
+        tag_index = TagIndex(self.repository_path, tag_prefix="v", use_cache=False)
+        self.assertEqual(tag_index.tags[0].name, "v3.0.0")
+        self.assertEqual(tag_index.tags[0].commit, git(self.repository_path, "rev-parse", "HEAD"))
+
+    def test_get_last_reachable_tag(self):
+        """Test that higher version tags that aren't reachable from the revision are skipped."""
+        tag_index = TagIndex(self.repository_path, tag_prefix="v", use_cache=False)
+        self.assertEqual(tag_index.get_last_reachable_tag().name, "v0.10.0")
+        self.assertEqual(tag_index.get_last_reachable_tag("other").name, "v2.0.0")
+        self.assertIsNone(
+            TagIndex(self.repository_path, tag_prefix="release-", use_cache=False).get_last_reachable_tag()
+        )
+
+    def test_cached_index_used_until_tags_change(self):
+        """Test that the index is loaded from the cache until a tag is added."""
+        with patch("check_semantic_version.tag_index.RACY_REFS_INTERVAL", 0):
+            TagIndex(self.repository_path, tag_prefix="v")
+
+            with patch("check_semantic_version.tag_index.run_git", wraps=run_git) as mock_run_git:
+                tag_index = TagIndex(self.repository_path, tag_prefix="v")
+
+            self.assertEqual([tag.name for tag in tag_index.tags], ["v2.0.0", "v0.10.0", "v0.9.0"])
+            self.assertNotIn("for-each-ref", [call.args[0][0] for call in mock_run_git.call_args_list])
+
+            git(self.repository_path, "tag", "v0.11.0")
+            tag_index = TagIndex(self.repository_path, tag_prefix="v")
+
+        self.assertEqual([tag.name for tag in tag_index.tags], ["v2.0.0", "v0.11.0", "v0.10.0", "v0.9.0"])
+
+    def test_recently_changed_refs_not_cached(self):
+        """Test that the index isn't cached if the tags were changed too recently for their modification times to be
+        relied on.
+        """
+        TagIndex(self.repository_path, tag_prefix="v")
+
+        with patch("check_semantic_version.tag_index.run_git", wraps=run_git) as mock_run_git:
+            TagIndex(self.repository_path, tag_prefix="v")
+
+        self.assertIn("for-each-ref", [call.args[0][0] for call in mock_run_git.call_args_list])
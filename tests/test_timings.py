@@ -0,0 +1,179 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from check_semantic_version import cli
+from check_semantic_version.check_semantic_version import check_versions_match
+from check_semantic_version.timings import TimingsRecorder, add_span_hook, remove_span_hook, span
+from tests.base import create_repository, git
+
+
+class TestSpan(unittest.TestCase):
+    def test_nothing_timed_without_hooks(self):
+        """Test that spans aren't timed if there aren't any span hooks."""
+        with patch("time.perf_counter") as mock_perf_counter:
+            with span("stage"):
+                pass
+
+        mock_perf_counter.assert_not_called()
+
+    def test_nested_spans(self):
+        """Test that nested spans are given to hooks with their parents, attributes, and errors."""
+        with TimingsRecorder() as recorder:
+            with span("outer", path="setup.py"):
+                with span("inner"):
+                    pass
+
+                with self.assertRaises(ValueError):
+                    with span("failing"):
+                        raise ValueError("Oh no.")
+
+        inner, failing, outer = recorder.spans
+        self.assertEqual([inner.name, failing.name, outer.name], ["inner", "failing", "outer"])
+        self.assertEqual(outer.attributes, {"path": "setup.py"})
+        self.assertIsNone(outer.parent_id)
+        self.assertEqual(inner.parent_id, outer.id)
+        self.assertEqual(failing.parent_id, outer.id)
+        self.assertEqual(failing.error, "ValueError('Oh no.')")
+        self.assertIsNone(inner.error)
+        self.assertGreaterEqual(outer.duration, inner.duration)
+
+    def test_spans_in_other_threads_have_no_parent(self):
+        """Test that spans started in other threads aren't given the span open in the starting thread as a parent."""
+
+        def run_in_thread():
+            with span("in thread"):
+                pass
+
+        with TimingsRecorder() as recorder:
+            with span("outer"):
+                thread = threading.Thread(target=run_in_thread)
+                thread.start()
+                thread.join()
+
+        (in_thread_span,) = [recorded_span for recorded_span in recorder.spans if recorded_span.name == "in thread"]
+        self.assertIsNone(in_thread_span.parent_id)
+
+    def test_hook_errors_ignored(self):
+        """Test that errors raised by span hooks don't affect the code being timed or the other hooks."""
+
+        def failing_hook(finished_span):
+            raise RuntimeError("Broken hook.")
+
+        add_span_hook(failing_hook)
+
+        try:
+            with TimingsRecorder() as recorder:
+                with span("stage"):
+                    pass
+        finally:
+            remove_span_hook(failing_hook)
+
+        self.assertEqual([recorded_span.name for recorded_span in recorder.spans], ["stage"])
+
+    def test_report(self):
+        """Test that the report gives the spans in the order they started and totals for each span name."""
+        with TimingsRecorder() as recorder:
+            for _ in range(2):
+                with span("subprocess", command=["git", "status"]):
+                    pass
+
+            with span("stage"):
+                pass
+
+        report_file = io.StringIO()
+        recorder.write_report(report_file)
+        report = json.loads(report_file.getvalue())
+
+        self.assertEqual([recorded_span["name"] for recorded_span in report["spans"]], ["subprocess"] * 2 + ["stage"])
+        self.assertEqual(report["spans"][0]["attributes"], {"command": ["git", "status"]})
+        self.assertEqual(report["totals"]["subprocess"]["count"], 2)
+        self.assertEqual(report["totals"]["stage"]["count"], 1)
+
+        for recorded_span in report["spans"]:
+            self.assertGreaterEqual(recorded_span["start"], 0)
+            self.assertLessEqual(recorded_span["start"] + recorded_span["duration"], report["total_duration"])
+
+
+class TestCheckTimings(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.repository_path = self.temporary_directory.name
+
+        create_repository(self.repository_path, [{"commit": "Initial commit"}, {"tag": "0.1.0"}])
+
+        with open(os.path.join(self.repository_path, "package.json"), "w") as f:
+            json.dump({"name": "package", "version": "0.1.1"}, f)
+
+        git(self.repository_path, "add", "package.json")
+        git(self.repository_path, "commit", "--quiet", "-m", "FIX: Fix a bug")
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_check_stages_timed(self):
+        """Test that each stage of a check and the git subprocesses it runs are timed."""
+        with TimingsRecorder() as recorder:
+            with patch("sys.stdout"):
+                self.assertTrue(check_versions_match(["package.json"], repository_path=self.repository_path))
+
+        names = {recorded_span.name for recorded_span in recorder.spans}
+
+        for name in (
+            "version extraction",
+            "configuration generation",
+            "expected version calculation",
+            "current version lookup",
+            "expected version lookup",
+            "subprocess",
+        ):
+            self.assertIn(name, names)
+
+        subprocess_spans = [recorded_span for recorded_span in recorder.spans if recorded_span.name == "subprocess"]
+        self.assertTrue(all(recorded_span.attributes["command"][0] == "git" for recorded_span in subprocess_spans))
+
+    def test_cli_timings_report(self):
+        """Test that the `--timings` option writes a JSON timings report to the given path."""
+        original_working_directory = os.getcwd()
+        report_path = os.path.join(self.repository_path, "timings.json")
+
+        try:
+            os.chdir(self.repository_path)
+
+            with patch("sys.stdout"):
+                with self.assertRaises(SystemExit) as e:
+                    cli.main(["package.json", "--timings", report_path])
+
+        finally:
+            os.chdir(original_working_directory)
+
+        self.assertEqual(e.exception.code, 0)
+
+        with open(report_path) as f:
+            report = json.load(f)
+
+        self.assertIn("expected version calculation", report["totals"])
+        self.assertGreater(report["total_duration"], 0)
+
+    def test_cli_timings_report_without_path(self):
+        """Test that the `--timings` option writes a JSON timings report to standard error if no path is given so it
+        isn't mixed up with the logs and the result on standard output.
+        """
+        process = subprocess.run(
+            [sys.executable, "-m", "check_semantic_version.cli", "package.json", "--timings"],
+            cwd=self.repository_path,
+            capture_output=True,
+            text=True,
+        )
+
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertIn("VERSION PASSED CHECKS", process.stdout)
+
+        report = json.loads(process.stderr)
+        self.assertIn("expected version calculation", report["totals"])
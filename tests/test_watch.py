@@ -0,0 +1,205 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from check_semantic_version.check_semantic_version import Package, _get_current_version, _get_expected_semantic_version
+from check_semantic_version.watch import CURRENT_VERSION_STAGE, EXPECTED_VERSION_STAGE, VersionWatcher, _PollingMonitor
+from tests.base import create_repository, git
+
+MONITORS = ["polling"] + (["inotify"] if sys.platform.startswith("linux") else [])
+
+
+class TestVersionWatcher(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.repository_path = self.temporary_directory.name
+
+        create_repository(self.repository_path, [{"commit": "Initial commit"}, {"tag": "0.1.0"}])
+        self._write_version("0.1.1")
+        git(self.repository_path, "add", "package.json")
+        git(self.repository_path, "commit", "--quiet", "-m", "FIX: Fix a bug")
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def _write_version(self, version):
+        """Write a `package.json` file with the given version to the repository.
+
+        :param str version: the version
+        :return None:
+        """
+        with open(os.path.join(self.repository_path, "package.json"), "w") as f:
+            json.dump({"name": "package", "version": version}, f)
+
+    def _create_watcher(self, monitor, path="package.json"):
+        """Create a watcher for one of the repository's version source files with the given kind of monitor.
+
+        :param str monitor: "inotify" or "polling"
+        :param str path: the path of the version source file relative to the repository
+        :return check_semantic_version.watch.VersionWatcher:
+        """
+        if monitor == "inotify":
+            return VersionWatcher(Package(path=path), repository_path=self.repository_path)
+
+        with patch("check_semantic_version.watch._InotifyMonitor", side_effect=OSError("Unavailable.")):
+            watcher = VersionWatcher(Package(path=path), repository_path=self.repository_path)
+
+        self.assertIsInstance(watcher._monitor, _PollingMonitor)
+        return watcher
+
+    def test_changes_mapped_to_affected_lookups(self):
+        """Test that editing the version source file only affects the current version lookup and that commits, tags,
+        new branches, and `mkver.conf` files only affect the expected version lookup.
+        """
+        changes = [
+            (lambda: self._write_version("0.1.10"), {CURRENT_VERSION_STAGE}),
+            (
+                lambda: git(self.repository_path, "commit", "--quiet", "--allow-empty", "-m", "FEA: Add a feature"),
+                {EXPECTED_VERSION_STAGE},
+            ),
+            (
+                lambda: git(self.repository_path, "commit", "--quiet", "--amend", "--allow-empty", "-m", "FIX: Fix it"),
+                {EXPECTED_VERSION_STAGE},
+            ),
+            (lambda: git(self.repository_path, "tag", "0.2.0"), {EXPECTED_VERSION_STAGE}),
+            (lambda: git(self.repository_path, "branch", "feature/new"), {EXPECTED_VERSION_STAGE}),
+            (lambda: open(os.path.join(self.repository_path, "mkver.conf"), "w").close(), {EXPECTED_VERSION_STAGE}),
+        ]
+
+        for monitor in MONITORS:
+            with self.subTest(monitor=monitor):
+                with self._create_watcher(monitor) as watcher:
+                    self.assertEqual(watcher.wait_for_changes(timeout=0), set())
+
+                    for make_change, expected_stages in changes:
+                        make_change()
+                        self.assertEqual(watcher.wait_for_changes(timeout=5), expected_stages)
+
+                os.remove(os.path.join(self.repository_path, "mkver.conf"))
+                git(self.repository_path, "tag", "--delete", "0.2.0")
+                git(self.repository_path, "branch", "--delete", "feature/new")
+
+    def test_modules_version_imported_from_watched(self):
+        """Test that editing the module a `setup.py` file imports its version from affects the current version lookup,
+        including after the `setup.py` file is changed to import it from a different module.
+        """
+        os.makedirs(os.path.join(self.repository_path, "package"))
+        setup_py_path = os.path.join(self.repository_path, "setup.py")
+
+        for module in ("__init__", "_version"):
+            with open(os.path.join(self.repository_path, "package", f"{module}.py"), "w") as f:
+                f.write('__version__ = "0.1.1"\n')
+
+        for monitor in MONITORS:
+            with self.subTest(monitor=monitor):
+                with open(setup_py_path, "w") as f:
+                    f.write(
+                        "from setuptools import setup\nfrom package import __version__\nsetup(version=__version__)\n"
+                    )
+
+                with self._create_watcher(monitor, "setup.py") as watcher:
+                    with open(os.path.join(self.repository_path, "package", "__init__.py"), "a") as f:
+                        f.write("\n")
+
+                    self.assertEqual(watcher.wait_for_changes(timeout=5), {CURRENT_VERSION_STAGE})
+
+                    with open(setup_py_path, "w") as f:
+                        f.write(
+                            "from setuptools import setup\nfrom package._version import __version__\n"
+                            "setup(version=__version__)\n"
+                        )
+
+                    self.assertEqual(watcher.wait_for_changes(timeout=5), {CURRENT_VERSION_STAGE})
+
+                    with patch("sys.stdout"):
+                        watcher.check({CURRENT_VERSION_STAGE})
+
+                    with open(os.path.join(self.repository_path, "package", "_version.py"), "a") as f:
+                        f.write("\n")
+
+                    self.assertEqual(watcher.wait_for_changes(timeout=5), {CURRENT_VERSION_STAGE})
+
+    def test_bursts_of_changes_debounced(self):
+        """Test that a burst of changes is reported once."""
+        for monitor in MONITORS:
+            with self.subTest(monitor=monitor):
+                with self._create_watcher(monitor) as watcher:
+                    for version in ("0.1.2", "0.1.30", "0.1.400"):
+                        self._write_version(version)
+
+                    git(self.repository_path, "commit", "--quiet", "--allow-empty", "-m", "DOC: Update the docs")
+
+                    self.assertEqual(
+                        watcher.wait_for_changes(timeout=5),
+                        {CURRENT_VERSION_STAGE, EXPECTED_VERSION_STAGE},
+                    )
+
+                    self.assertEqual(watcher.wait_for_changes(timeout=0.3), set())
+
+    def test_only_affected_lookups_rerun(self):
+        """Test that re-checking only re-runs the given lookups and keeps the results of the others."""
+        with self._create_watcher(MONITORS[-1]) as watcher:
+            with patch("sys.stdout"):
+                self.assertTrue(watcher.check())
+
+            with patch(
+                "check_semantic_version.watch._get_expected_semantic_version",
+                wraps=_get_expected_semantic_version,
+            ) as mock_get_expected_semantic_version:
+                with patch(
+                    "check_semantic_version.watch._get_current_version",
+                    wraps=_get_current_version,
+                ) as mock_get_current_version:
+                    self._write_version("0.2.0")
+
+                    with patch("sys.stdout"):
+                        self.assertFalse(watcher.check({CURRENT_VERSION_STAGE}))
+
+                    git(self.repository_path, "commit", "--quiet", "--allow-empty", "-m", "FEA: Add a feature")
+
+                    with patch("sys.stdout"):
+                        self.assertTrue(watcher.check({EXPECTED_VERSION_STAGE}))
+
+            self.assertEqual(mock_get_current_version.call_count, 1)
+            self.assertEqual(mock_get_expected_semantic_version.call_count, 1)
+            self.assertEqual((watcher.current_version, watcher.expected_semantic_version), ("0.2.0", "0.2.0"))
+
+    def test_run(self):
+        """Test that running the watcher checks the versions and re-checks them after changes until it's stopped."""
+        stop_event = threading.Event()
+
+        with self._create_watcher(MONITORS[-1]) as watcher:
+            with patch.object(watcher, "check", wraps=watcher.check) as mock_check:
+                with patch("sys.stdout"):
+                    thread = threading.Thread(target=watcher.run, kwargs={"stop_event": stop_event})
+                    thread.start()
+
+                    try:
+                        self._wait_for(lambda: mock_check.call_count == 1)
+                        self._write_version("0.1.2")
+                        self._wait_for(lambda: mock_check.call_count == 2)
+                    finally:
+                        stop_event.set()
+                        thread.join()
+
+        self.assertEqual(mock_check.call_args_list[1].args, ({CURRENT_VERSION_STAGE},))
+
+    def _wait_for(self, condition, timeout=10):
+        """Wait for a condition to become true.
+
+        :param callable condition: a function returning whether the condition is true
+        :param float timeout: the longest time to wait in seconds
+        :return None:
+        """
+        for _ in range(int(timeout / 0.05)):
+            if condition():
+                return
+
+            time.sleep(0.05)
+
+        self.fail("The condition didn't become true in time.")